@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+
+# Program:          API server
+# Associated file:  api_server.py
+# Purpose:          Local HTTP/JSON API over the models, for scripts and other front ends:
+#
+#                       python -m collectionmanager serve --port 8765
+#                       curl -u bob:secret http://127.0.0.1:8765/items?collection=Coins
+#
+#                   Requests are handled on one asyncio event loop. Reads run on a small thread pool that
+#                   borrows connections from db.ConnectionPool; every write goes to db.SingleWriter, so
+#                   concurrent clients never fight over SQLite's write lock. GET responses carry an ETag and
+#                   a client sending it back gets 304 Not Modified without a query while the database
+#                   files are unchanged. Every request except /health logs in with HTTP Basic
+#                   authentication against the User table. Credentials travel in plain HTTP, so the
+#                   server only binds to a loopback address unless allow_remote (--allow-remote) is set.
+#
+#   GET   /health
+#   GET   /items?collection=&status=&source=&location=&include_inactive=1&limit=&offset=
+#   GET   /items/<id>
+#   POST  /items                  {"ItemName", "Collection", "Source", "PricePaid", ...}
+#   PATCH /items/<id>             {"Status": "Inactive", "CurrentValue": 12.5, ...}
+#                                 (amounts are sent as dollars, "PricePaid": "12.50", or as integer
+#                                 cents, "PricePaidCents": 1250; items come back with the cents columns)
+#   GET   /collections            POST /collections   {"CollectionName"}
+#   GET   /sources                POST /sources       {"BusinessName", "FirstName", "Phone", "Email", ...}
+#   GET   /search?q=&limit=
+#   GET   /items/<id>/history?period=month&since=&until=
+#   GET   /history?collection=&include_inactive=1&period=month&since=&until=
+#                                 (value over time, one point per day/week/month/year; see valuation.py)
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import db
+from item_filters import ItemFilter, item_query
+from models import ChangeEvent, Collection, INSERT, Item, STATUS, Source, UPDATE, publish, tracked_insert, tracked_write
+from money import MAX_CENTS, MONEY_COLUMNS, to_cents
+from valuation import DEFAULT_PERIOD, PERIODS, check_date, filter_value_series, item_value_series
+
+DEFAULT_HOST = "127.0.0.1"
+LOOPBACK_NAMES = ("localhost",)
+DEFAULT_PORT = 8765
+
+# rows per list response unless ?limit= asks for fewer or more (up to MAX_LIMIT)
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# largest request body accepted
+MAX_BODY = 1024 * 1024
+
+# cached GET responses kept for ETag checks
+RESPONSE_CACHE_SIZE = 256
+
+# file timestamps only move every few milliseconds, so a stamp this fresh can't prove nothing changed
+STAMP_SETTLE_NS = 20_000_000
+
+# columns a PATCH /items/<id> may change
+ITEM_EDITABLE = ("ItemName", "Source", "Status", "Description", "PricePaidCents", "CurrentValueCents",
+                 "Location", "Notes", "PricePaid", "CurrentValue")
+# dollar field -> cents column it is stored in
+DOLLAR_FIELDS = {external: column for column, external in MONEY_COLUMNS.items()}
+STATUSES = ("Active", "Inactive")
+
+REASONS = {
+    200: "OK", 201: "Created", 304: "Not Modified", 400: "Bad Request", 401: "Unauthorized",
+    403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+    413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """Ends a request with an error status; the message is returned as {"error": message}."""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class Request:
+    def __init__(self, method, target, headers, body):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = unquote(parts.path).rstrip("/") or "/"
+        self.raw_query = parts.query
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+        self.user = None
+        self.admin = False
+
+    def json(self):
+        try:
+            data = json.loads(self.body or b"{}")
+        except (ValueError, RecursionError):   # includes bad UTF-8; RecursionError for absurd nesting
+            raise HTTPError(400, "The request body is not valid JSON.")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "The request body must be a JSON object.")
+        return data
+
+    def int_arg(self, name, default, maximum=None):
+        try:
+            value = int(self.query.get(name, default))
+        except ValueError:
+            raise HTTPError(400, f"'{name}' must be a whole number.")
+        if value < 0:
+            raise HTTPError(400, f"'{name}' cannot be negative.")
+        return min(value, maximum) if maximum else value
+
+
+def is_loopback(host):
+    if host in LOOPBACK_NAMES:
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def basic_credentials(header):
+    """(username, password) from an "Authorization: Basic ..." header, or (None, None)."""
+    scheme, _, encoded = (header or "").partition(" ")
+    if scheme.lower() != "basic":
+        return None, None
+    try:
+        username, separator, password = base64.b64decode(encoded.strip(), validate=True).decode("utf-8").partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        return None, None
+    return (username, password) if separator and username else (None, None)
+
+
+def rows_to_dicts(rows):
+    return [dict(row) for row in rows]
+
+
+def clean_fields(data, allowed):
+    """Keeps the allowed keys, converts the money columns and checks Status (raises HTTPError)."""
+    unknown = sorted(set(data) - set(allowed))
+    if unknown:
+        raise HTTPError(400, f"Unknown or read-only field(s): {', '.join(unknown)}.")
+    values = dict(data)
+    for external, column in DOLLAR_FIELDS.items():
+        if external in values and column in values:
+            raise HTTPError(400, f"Send either {external} or {column}, not both.")
+        try:
+            if external in values:
+                values[column] = to_cents(values.pop(external), external)
+            elif values.get(column) is not None:
+                if isinstance(values[column], bool) or not isinstance(values[column], int):
+                    raise ValueError(f"{column} must be a whole number of cents.")
+                if abs(values[column]) >= MAX_CENTS:
+                    raise ValueError(f"{column} is too large.")
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+    if "Status" in values and values["Status"] not in STATUSES:
+        raise HTTPError(400, f"Status must be one of: {', '.join(STATUSES)}.")
+    return values
+
+
+class ApiServer:
+    """The HTTP front end. Handlers are coroutines returning (status, payload)."""
+
+    def __init__(self, database=None, host=DEFAULT_HOST, port=DEFAULT_PORT, pool_size=4, allow_remote=False):
+        if not is_loopback(host) and not allow_remote:
+            raise ValueError(f"Refusing to serve on {host}: logins travel unencrypted, so the API only binds "
+                             f"to a loopback address unless remote access is allowed explicitly.")
+        self.database = database or db.DATABASE
+        self.host = host
+        self.port = port
+        self.pool = db.get_pool(self.database, pool_size)
+        self.writer = db.get_writer(self.database)
+        self.readers = ThreadPoolExecutor(pool_size, thread_name_prefix="api-reader")
+        self.responses = {}   # (path, query, user) -> (stamp, etag, body)
+        self.writes = 0       # bumped by every write made through this server
+        self.server = None
+        self.routes = [
+            ("GET", r"/health", self.health),
+            ("GET", r"/items", self.list_items),
+            ("POST", r"/items", self.create_item),
+            ("GET", r"/items/(\d+)", self.get_item),
+            ("PATCH", r"/items/(\d+)", self.update_item),
+            ("GET", r"/collections", self.list_collections),
+            ("POST", r"/collections", self.create_collection),
+            ("GET", r"/sources", self.list_sources),
+            ("POST", r"/sources", self.create_source),
+            ("GET", r"/search", self.search),
+            ("GET", r"/items/(\d+)/history", self.item_history),
+            ("GET", r"/history", self.history),
+        ]
+        self.routes = [(method, re.compile(pattern + "$"), handler) for method, pattern, handler in self.routes]
+
+    ##### DATABASE ACCESS #####
+
+    def _read(self, job, args):
+        with self.pool.connection() as conn:
+            return job(conn, *args)
+
+    async def read(self, job, *args):
+        """Runs job(conn, *args) on a reader thread with a pooled connection."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.readers, self._read, job, args)
+
+    async def write(self, job, *args, alone=False):
+        """Runs job(conn, *args) on the single writer thread, batched with other clients' writes unless
+        alone (for jobs that commit themselves)."""
+        submit = self.writer.submit_alone if alone else self.writer.submit
+        try:
+            return await asyncio.wrap_future(submit(job, *args))
+        finally:
+            self.writes += 1
+
+    def data_stamp(self):
+        """Changes whenever the database (or its write-ahead log) is written, by us or anyone else."""
+        stamp = [self.writes]
+        for path in (self.database, self.database + "-wal"):
+            try:
+                info = os.stat(path)
+            except OSError:
+                stamp += [0, 0]
+                continue
+            if time.time_ns() - info.st_mtime_ns < STAMP_SETTLE_NS:
+                return None  # written a moment ago; don't trust it for a 304
+            stamp += [info.st_mtime_ns, info.st_size]
+        return tuple(stamp)
+
+    ##### AUTHENTICATION #####
+
+    async def authenticate(self, request):
+        username, password = basic_credentials(request.headers.get("authorization"))
+        challenge = {"WWW-Authenticate": 'Basic realm="collections", charset="UTF-8"'}
+        if username is None:
+            raise HTTPError(401, "Log in with HTTP Basic authentication (username and password).", challenge)
+        row = await self.read(
+            lambda conn: conn.execute("SELECT Password, Role, Status FROM User WHERE Username = ?", (username,)).fetchone()
+        )
+        stored = row["Password"] if row is not None and row["Password"] is not None else ""
+        matches = hmac.compare_digest(stored.encode(), password.encode())
+        if row is None or not matches:
+            raise HTTPError(401, "Wrong username or password.", challenge)
+        if row["Status"] == "Inactive":
+            raise HTTPError(403, f"The account '{username}' is inactive.")
+        request.user = username
+        request.admin = db.is_admin(username)
+
+    ##### HANDLERS #####
+
+    async def health(self, request):
+        return 200, {"status": "ok", "database": os.path.basename(self.database)}
+
+    async def list_items(self, request):
+        status = request.query.get("status")
+        if status and status not in STATUSES:
+            raise HTTPError(400, f"status must be one of: {', '.join(STATUSES)}.")
+        item_filter = ItemFilter(
+            collection=request.query.get("collection"),
+            user=None if request.admin else request.user,
+            show_inactive=request.query.get("include_inactive") in ("1", "true", "yes"),
+            status=status,
+            source=request.query.get("source"),
+            location=request.query.get("location"),
+        )
+        limit = request.int_arg("limit", DEFAULT_LIMIT, MAX_LIMIT)
+        offset = request.int_arg("offset", 0)
+
+        def job(conn):
+            query, params = item_query(item_filter)
+            total = conn.execute(f"SELECT COUNT(*) FROM ({query})", params).fetchone()[0]
+            rows = conn.execute(f"{query} ORDER BY ItemID LIMIT ? OFFSET ?", params + (limit, offset)).fetchall()
+            return total, rows_to_dicts(rows)
+
+        total, items = await self.read(job)
+        return 200, {"total": total, "offset": offset, "limit": limit, "items": items}
+
+    async def fetch_item(self, request, item_id):
+        row = await self.read(lambda conn: conn.execute("SELECT * FROM Item WHERE ItemID = ?", (item_id,)).fetchone())
+        if row is None or (not request.admin and row["User"] != request.user):
+            raise HTTPError(404, f"Item {item_id} not found.")
+        return dict(row)
+
+    async def get_item(self, request, item_id):
+        return 200, await self.fetch_item(request, int(item_id))
+
+    async def create_item(self, request):
+        data = request.json()
+        values = clean_fields(data, ("ItemName", "Collection", "Source", "Status") + ITEM_EDITABLE)
+        for column in ("ItemName", "Collection"):
+            if not values.get(column):
+                raise HTTPError(400, f"{column} cannot be empty.")
+
+        def job(conn):
+            collection = conn.execute(
+                "SELECT CollectionName, User FROM Collection WHERE CollectionName = ?", (values["Collection"],)
+            ).fetchone()
+            if collection is None or (not request.admin and collection["User"] != request.user):
+                raise HTTPError(404, f"Collection '{values['Collection']}' not found.")
+            if values.get("Source") and conn.execute(
+                    "SELECT 1 FROM Source WHERE BusinessName = ?", (values["Source"],)).fetchone() is None:
+                raise HTTPError(400, f"Source '{values['Source']}' does not exist.")
+            item = Item(User=collection["User"], Source=values.pop("Source", None) or "", **values)
+            sql, params = item.insert_statement()
+            item.ItemID, rows = tracked_insert(conn, "Item", sql, params)
+            return item, rows
+
+        item, rows = await self.write(job)
+        publish(ChangeEvent("Item", item.ItemID, INSERT, rows=rows))
+        return 201, await self.fetch_item(request, item.ItemID)
+
+    async def update_item(self, request, item_id):
+        item_id = int(item_id)
+        values = clean_fields(request.json(), ITEM_EDITABLE)
+        if not values:
+            raise HTTPError(400, "Nothing to update.")
+        if "ItemName" in values and not values["ItemName"]:
+            raise HTTPError(400, "ItemName cannot be empty.")
+        owner_clause, owner_params = db.ownership_filter(("User",), request.user, request.admin)
+
+        def job(conn):
+            assignments = ", ".join(f"{column} = ?" for column in values)
+            where = "ItemID = ?" + (f" AND {owner_clause}" if owner_clause else "")
+            key = (item_id,) + owner_params
+            rows = tracked_write(conn, "Item", where, key,
+                                 lambda: conn.execute(f"UPDATE Item SET {assignments} WHERE {where}",
+                                                      tuple(values.values()) + key))
+            if not rows:
+                raise HTTPError(404, f"Item {item_id} not found.")
+            return rows
+
+        rows = await self.write(job)
+        if "Status" in values:
+            # the row change is carried by the UPDATE event below, so it isn't applied twice
+            publish(ChangeEvent("Item", item_id, STATUS, values["Status"], rows=()))
+        publish(ChangeEvent("Item", item_id, UPDATE, rows=rows))
+        return 200, await self.fetch_item(request, item_id)
+
+    async def list_collections(self, request):
+        owner_clause, params = db.ownership_filter(("User",), request.user, request.admin)
+        where = f" WHERE {owner_clause}" if owner_clause else ""
+        rows = await self.read(lambda conn: conn.execute(
+            f"SELECT User, CollectionName, Status FROM Collection{where} ORDER BY CollectionName", params
+        ).fetchall())
+        return 200, {"collections": rows_to_dicts(rows)}
+
+    async def create_collection(self, request):
+        data = request.json()
+        name = str(data.get("CollectionName") or "").strip()
+        if not name:
+            raise HTTPError(400, "CollectionName cannot be empty.")
+        owner = data.get("User") or request.user
+        if owner != request.user and not request.admin:
+            raise HTTPError(403, "Only admins can create collections for other users.")
+
+        def job(conn):
+            if conn.execute("SELECT 1 FROM Collection WHERE CollectionName = ?", (name,)).fetchone():
+                raise HTTPError(409, f"Collection '{name}' already exists.")
+            sql, params = Collection(User=owner, CollectionName=name).insert_statement()
+            conn.execute(sql, params)
+
+        await self.write(job)
+        publish(ChangeEvent("Collection", name, INSERT))
+        return 201, {"User": owner, "CollectionName": name, "Status": "Active"}
+
+    async def list_sources(self, request):
+        rows = await self.read(lambda conn: conn.execute(
+            "SELECT SourceID, BusinessName, FirstName, LastName, Phone, Address, City, State, Zip, Email, Status "
+            "FROM Source ORDER BY BusinessName"
+        ).fetchall())
+        return 200, {"sources": rows_to_dicts(rows)}
+
+    async def create_source(self, request):
+        data = request.json()
+        fields = ("BusinessName", "FirstName", "LastName", "Phone", "Address", "City", "State", "Zip", "Email")
+        unknown = sorted(set(data) - set(fields))
+        if unknown:
+            raise HTTPError(400, f"Unknown or read-only field(s): {', '.join(unknown)}.")
+        values = {column: str(data.get(column) or "").strip() for column in fields}
+        if not values["BusinessName"]:
+            raise HTTPError(400, "BusinessName cannot be empty.")
+
+        def job(conn):
+            if conn.execute("SELECT 1 FROM Source WHERE BusinessName = ?", (values["BusinessName"],)).fetchone():
+                raise HTTPError(409, f"Source '{values['BusinessName']}' already exists.")
+            sql, params = Source(**values).insert_statement()
+            return conn.execute(sql, params).lastrowid
+
+        source_id = await self.write(job)
+        publish(ChangeEvent("Source", values["BusinessName"], INSERT))
+        return 201, dict(values, SourceID=source_id, Status="Active")
+
+    async def search(self, request):
+        from search import ensure_search_index, search_group, visible_groups
+
+        text = request.query.get("q", "").strip()
+        if not text:
+            raise HTTPError(400, "Pass the text to search for as ?q=.")
+        limit = request.int_arg("limit", 10, MAX_LIMIT)
+
+        def job(conn):
+            results = {}
+            for name in visible_groups(request.admin):
+                rows = search_group(conn, name, text, request.user, request.admin, limit=limit)
+                results[name] = [{"id": row_id, "title": title, "detail": detail} for row_id, title, detail in rows]
+            return results
+
+        if not getattr(self, "_search_ready", False):
+            await self.write(ensure_search_index, alone=True)
+            self._search_ready = True
+        return 200, await self.read(job)
+
+    def history_args(self, request):
+        """(period, since, until) from the query string (raises HTTPError)."""
+        period = request.query.get("period", DEFAULT_PERIOD)
+        if period not in PERIODS:
+            raise HTTPError(400, f"period must be one of: {', '.join(PERIODS)}.")
+        try:
+            return period, check_date(request.query.get("since"), "since"), check_date(request.query.get("until"), "until")
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+    async def item_history(self, request, item_id):
+        item_id = int(item_id)
+        period, since, until = self.history_args(request)
+        await self.fetch_item(request, item_id)  # 404 unless it exists and is the caller's
+        points = await self.read(item_value_series, item_id, period, since, until)
+        return 200, {"item": item_id, "period": period,
+                     "points": [{"period": start, "cents": cents} for start, cents in points]}
+
+    async def history(self, request):
+        period, since, until = self.history_args(request)
+        item_filter = ItemFilter(
+            collection=request.query.get("collection"),
+            user=None if request.admin else request.user,
+            show_inactive=request.query.get("include_inactive") in ("1", "true", "yes"),
+        )
+        points = await self.read(filter_value_series, item_filter, period, since, until)
+        return 200, {"collection": item_filter.collection, "period": period,
+                     "points": [{"period": start, "cents": cents} for start, cents in points]}
+
+    ##### HTTP #####
+
+    async def dispatch(self, request):
+        """Returns (status, extra headers, body bytes) for one request."""
+        allowed = []
+        for method, pattern, handler in self.routes:
+            match = pattern.match(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                allowed.append(method)
+                continue
+            if handler != self.health:
+                await self.authenticate(request)
+            if method != "GET":
+                status, payload = await handler(request, *match.groups())
+                return status, {}, json.dumps(payload).encode()
+            return await self.cached_get(request, handler, match.groups())
+        if allowed:
+            raise HTTPError(405, f"Use {', '.join(allowed)} for {request.path}.")
+        raise HTTPError(404, f"No such endpoint: {request.path}")
+
+    async def cached_get(self, request, handler, groups):
+        """Answers a GET, short-circuiting to 304 when the client's ETag is still current."""
+        key = (request.path, request.raw_query, request.user)
+        client_etag = request.headers.get("if-none-match")
+        stamp = self.data_stamp()
+        cached = self.responses.get(key)
+        if cached and stamp is not None and cached[0] == stamp:
+            if client_etag == cached[1]:
+                return 304, {"ETag": cached[1]}, b""
+            return 200, {"ETag": cached[1]}, cached[2]
+
+        status, payload = await handler(request, *groups)
+        body = json.dumps(payload).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        if stamp is not None:
+            self.responses[key] = (stamp, etag, body)
+            while len(self.responses) > RESPONSE_CACHE_SIZE:
+                self.responses.pop(next(iter(self.responses)))
+        if client_etag == etag:
+            return 304, {"ETag": etag}, b""
+        return status, {"ETag": etag}, body
+
+    async def read_request(self, reader):
+        """Parses one HTTP/1.1 request; returns None when the client has closed the connection."""
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line.")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "Content-Length must be a whole number.")
+        if length < 0:
+            raise HTTPError(400, "Content-Length cannot be negative.")
+        if length > MAX_BODY:
+            raise HTTPError(413, "The request body is too large.")
+        body = await reader.readexactly(length) if length else b""
+        request = Request(method.upper(), target, headers, body)
+        request.keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        return request
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self.read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = request.keep_alive
+                    status, headers, body = await self.dispatch(request)
+                except HTTPError as e:
+                    status, headers, body = e.status, dict(e.headers), json.dumps({"error": e.message}).encode()
+                except sqlite3.IntegrityError as e:
+                    status, headers, body = 409, {}, json.dumps({"error": str(e)}).encode()
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    # anything else still gets an answer instead of a dropped connection
+                    print(f"[API Error] {type(e).__name__}: {e}")
+                    status, headers, body = 500, {}, json.dumps({"error": str(e)}).encode()
+
+                head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+                headers.setdefault("Content-Type", "application/json")
+                headers["Content-Length"] = str(len(body))
+                headers["Cache-Control"] = "no-cache"
+                headers["Connection"] = "keep-alive" if keep_alive else "close"
+                head += [f"{name}: {value}" for name, value in headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        await self.write(db.migrate, alone=True)  # Item.DateAdded
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]  # the real port when 0 was asked for
+        return self.server
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Serving {self.database} on http://{self.host}:{self.port} (Ctrl+C to stop)")
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.readers.shutdown(wait=False)
+
+
+def serve(database=None, host=DEFAULT_HOST, port=DEFAULT_PORT, pool_size=4, allow_remote=False):
+    """Runs the API server until interrupted."""
+    server = ApiServer(database, host, port, pool_size, allow_remote)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+
+# Program:          benchmark suite
+# Associated file:  benchmarks.py
+# Purpose:          This module times the code paths users wait on (model CRUD, log(), loading a collection
+#                   into the grid, search, export and import) against a copy of a database, usually one
+#                   made by datagen.py, and saves the numbers as JSON so two commits can be compared:
+#
+#                       python -m collectionmanager --database bench-100k.sqlite benchmark --json before.json
+#                       python -m collectionmanager --database bench-100k.sqlite benchmark --compare before.json
+#
+#                   The models open "collections.sqlite" in the working directory, so the suite copies the
+#                   database into a scratch folder under that name and runs there. The original file is
+#                   never written to, and every run starts from the same data.
+
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+import db
+import export
+import importer
+import grid_model
+import item_filters
+import paging
+import search
+import valuation
+from log import log
+from models import Collection, Item, Source
+
+# bumped when the JSON layout changes
+RESULTS_VERSION = 1
+
+# a benchmark whose median grows by more than this share is reported as a regression
+DEFAULT_THRESHOLD = 0.25
+
+# name -> Benchmark, in registration order
+BENCHMARKS = {}
+
+
+@dataclass
+class Benchmark:
+    name: str
+    function: object        # function(context, prepared) -> None
+    repeat: int = 5
+    operations: int = 1     # calls made per run, for the per-operation figure
+    setup: object = None    # setup(context, run) -> prepared, untimed
+
+
+def benchmark(name, repeat=5, operations=1, setup=None):
+    """Registers the decorated function as a benchmark."""
+    def register(function):
+        BENCHMARKS[name] = Benchmark(name, function, repeat, operations, setup)
+        return function
+    return register
+
+
+@dataclass
+class Context:
+    """The scratch copy and the sample rows every benchmark works with (picked deterministically)."""
+    folder: str
+    database: str
+    user: str
+    admin_user: str
+    collection: str
+    item_names: list
+    search_text: str
+
+    @classmethod
+    def load(cls, folder, search_text):
+        database = os.path.join(folder, db.DATABASE)
+        conn = sqlite3.connect(database)
+        row = conn.execute("""
+            SELECT Collection, User FROM Item GROUP BY Collection ORDER BY COUNT(*) DESC, Collection LIMIT 1
+        """).fetchone()
+        if row is None:
+            conn.close()
+            raise ValueError("The database has no items to benchmark; create one with 'generate'.")
+        collection, user = row
+        admin = conn.execute("SELECT Username FROM User WHERE Role = 'Admin' ORDER BY UserID LIMIT 1").fetchone()
+        count = conn.execute("SELECT COUNT(*) FROM Item").fetchone()[0]
+        names = [name for (name,) in conn.execute(
+            "SELECT ItemName FROM Item ORDER BY ItemID LIMIT 50 OFFSET ?", (count // 2,))]
+        conn.close()
+        return cls(folder, database, user, admin[0] if admin else user, collection, names, search_text)
+
+
+@dataclass
+class Result:
+    name: str
+    runs: int
+    operations: int
+    min_ms: float
+    median_ms: float
+    mean_ms: float
+    max_ms: float
+
+    @property
+    def per_operation_ms(self):
+        return self.median_ms / self.operations
+
+
+##### BENCHMARKS #####
+
+@benchmark("models.Item.save", operations=20, setup=lambda context, run: run)
+def bench_item_save(context, run):
+    for number in range(20):
+        Item(Collection=context.collection, User=context.user, ItemName=f"Benchmark item {run}-{number}",
+             Source="", PricePaidCents=100, CurrentValueCents=200).save()
+
+
+@benchmark("models.Source.get_all")
+def bench_source_get_all(context, prepared):
+    Source.get_all()
+
+
+@benchmark("models.Collection.get_all")
+def bench_collection_get_all(context, prepared):
+    Collection.get_all(User=context.user)
+
+
+@benchmark("models.Item.get_by_identifier", operations=50)
+def bench_item_get_by_identifier(context, prepared):
+    for name in context.item_names:
+        Item.get_by_identifier("ItemName", name)
+
+
+@benchmark("log", operations=20)
+def bench_log(context, prepared):
+    for number in range(20):
+        log(f"Benchmark message {number}", context.user)
+
+
+def collection_filter(context):
+    return item_filters.ItemFilter(collection=context.collection, user=context.user)
+
+
+def clear_item_caches():
+    for cache in (item_filters.result_cache, item_filters.facet_cache, item_filters.totals_cache):
+        cache.clear()
+
+
+@benchmark("items.load_collection", setup=lambda context, run: clear_item_caches())
+def bench_load_collection(context, prepared):
+    # what TabViewer.load_items_for_collection asks for: first page, facets and footer totals
+    item_filter = collection_filter(context)
+    source = item_filters.page_source_for(item_filter)
+    source.set_order([("ItemName", False)])
+    source.rows(0, 50)
+    for column in item_filters.FACET_COLUMNS:
+        item_filters.facet_counts(item_filter, column)
+    item_filters.item_totals(item_filter)
+
+
+@benchmark("items.resort_price_desc", setup=lambda context, run: clear_item_caches())
+def bench_resort(context, prepared):
+    source = item_filters.page_source_for(collection_filter(context))
+    source.set_order([("PricePaidCents", True)])
+    source.rows(0, 50)
+
+
+@benchmark("items.scroll_deep_page", setup=lambda context, run: clear_item_caches())
+def bench_scroll(context, prepared):
+    source = item_filters.page_source_for(item_filters.ItemFilter(show_inactive=True))
+    source.set_order([("ItemName", False)])
+    middle = source.count() // 2
+    source.rows(middle, middle + 50)
+
+
+def loaded_grid(context, order_by=(("ItemName", False),)):
+    """A grid showing the largest collection, 40 rows tall, as TabViewer's My Items tab would."""
+    clear_item_caches()
+    grid = grid_model.GridViewModel(item_filters.ITEM_COLUMNS, ("ItemID",), visible_rows=40)
+    grid.set_filter(collection_filter(context))
+    grid.sort_by(list(order_by))
+    return grid
+
+
+@benchmark("grid.page_fetch", setup=lambda context, run: clear_item_caches())
+def bench_grid_page_fetch(context, prepared):
+    grid = grid_model.GridViewModel(item_filters.ITEM_COLUMNS, ("ItemID",), visible_rows=40)
+    grid.set_filter(collection_filter(context))
+
+
+@benchmark("grid.resort", setup=lambda context, run: loaded_grid(context))
+def bench_grid_resort(context, grid):
+    grid.sort_by([("PricePaidCents", True), ("ItemName", False)])
+
+
+@benchmark("grid.scroll", operations=50, setup=lambda context, run: loaded_grid(context))
+def bench_grid_scroll(context, grid):
+    # page-sized steps, then jumps across the whole result
+    for step in range(25):
+        grid.scroll_to(step * grid.visible_rows)
+    for step in range(25):
+        grid.scroll_fraction((step * 0.37) % 1)
+
+
+def edit_visible_row(context, run):
+    grid = loaded_grid(context)
+    item_id = grid.shown[len(grid.shown) // 2]
+    conn = sqlite3.connect(context.database)
+    with conn:
+        conn.execute("UPDATE Item SET CurrentValueCents = CurrentValueCents + 1 WHERE ItemID = ?", (item_id,))
+    conn.close()
+    return grid
+
+
+@benchmark("grid.incremental_refresh", setup=edit_visible_row)
+def bench_grid_refresh(context, grid):
+    window = grid.reload()
+    if window.changes != 1:
+        raise RuntimeError(f"refresh after editing one row made {window.changes} changes")
+
+
+@benchmark("search.items")
+def bench_search_items(context, prepared):
+    conn = sqlite3.connect(context.database)
+    search.search_group(conn, "Items", context.search_text, admin=True)
+    conn.close()
+
+
+@benchmark("search.all_groups_user")
+def bench_search_user(context, prepared):
+    conn = sqlite3.connect(context.database)
+    for name in search.visible_groups(False):
+        search.search_group(conn, name, context.search_text, context.user, admin=False)
+    conn.close()
+
+
+@benchmark("valuation.collection_monthly")
+def bench_valuation_collection(context, prepared):
+    conn = sqlite3.connect(context.database)
+    valuation.filter_value_series(conn, item_filters.ItemFilter(collection=context.collection, user=context.user))
+    conn.close()
+
+
+@benchmark("valuation.user_weekly")
+def bench_valuation_user(context, prepared):
+    conn = sqlite3.connect(context.database)
+    valuation.filter_value_series(conn, item_filters.ItemFilter(user=context.user, show_inactive=True), "week")
+    conn.close()
+
+
+@benchmark("export.user_items_csv", repeat=3)
+def bench_export(context, prepared):
+    path = os.path.join(context.folder, "export.csv")
+    export.export_items(item_filters.ItemFilter(user=context.user, show_inactive=True), path)
+
+
+def write_import_file(context, run):
+    path = os.path.join(context.folder, f"import-{run}.csv")
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["ItemName", "Collection", "PricePaid", "CurrentValue", "Location"])
+        writer.writerows(
+            (f"Imported item {run}-{number}", context.collection, "9.99", "12.50", "Shelf A")
+            for number in range(1_000)
+        )
+    return path
+
+
+@benchmark("import.items_csv_1000", repeat=3, operations=1_000, setup=write_import_file)
+def bench_import(context, path):
+    result = importer.import_items(path, context.user, notify=False)
+    if result.skipped:
+        raise RuntimeError(f"import rejected {result.skipped} rows: {result.errors[0].message}")
+
+
+##### RUNNING #####
+
+@contextlib.contextmanager
+def scratch_copy(database):
+    """Copies database (consistently, via the backup API) into a temp folder as collections.sqlite and
+    makes that folder the working directory for the duration."""
+    folder = tempfile.mkdtemp(prefix="collections-bench-")
+    source = sqlite3.connect(database)
+    target = sqlite3.connect(os.path.join(folder, db.DATABASE))
+    source.backup(target)
+    source.close()
+    target.close()
+
+    previous = os.getcwd()
+    db.close_db()
+    paging._affinity_cache.clear()
+    os.chdir(folder)
+    try:
+        yield folder
+    finally:
+        db.close_db()
+        clear_item_caches()  # their page sources hold connections to the copy
+        paging._affinity_cache.clear()
+        os.chdir(previous)
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def run_benchmark(bench, context, repeat=None):
+    """Times one benchmark (one untimed warm-up run first) and returns its Result."""
+    runs = repeat or bench.repeat
+    timings = []
+    for run in range(runs + 1):
+        prepared = bench.setup(context, run) if bench.setup else None
+        # the code under test prints a lot; keep the console out of the timings
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            bench.function(context, prepared)
+            elapsed = (time.perf_counter() - started) * 1000
+        if run:
+            timings.append(elapsed)
+    return Result(
+        bench.name, runs, bench.operations,
+        round(min(timings), 3), round(statistics.median(timings), 3),
+        round(statistics.fmean(timings), 3), round(max(timings), 3),
+    )
+
+
+def dataset_summary(database):
+    conn = sqlite3.connect(database)
+    counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+              for table in ("User", "Source", "Collection", "Item", "Log")}
+    conn.close()
+    counts["bytes"] = os.path.getsize(database)
+    return counts
+
+
+def git_commit():
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def run_suite(database, only=None, repeat=None, search_text="item", progress=None):
+    """Runs the registered benchmarks (those whose names start with one of only, if given) against a
+    scratch copy of database. Returns a JSON-ready dict; progress(result) is called after each."""
+    selected = [bench for name, bench in BENCHMARKS.items() if not only or name.startswith(tuple(only))]
+    if not selected:
+        raise ValueError(f"No benchmark matches {', '.join(only)}. Available: {', '.join(BENCHMARKS)}.")
+
+    results = []
+    with scratch_copy(database) as folder:
+        db.migrate()  # older files lack Item.DateAdded, which the models write
+        context = Context.load(folder, search_text)
+        for bench in selected:
+            result = run_benchmark(bench, context, repeat)
+            results.append(result)
+            if progress:
+                progress(result)
+
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "database": os.path.basename(database),
+        "dataset": dataset_summary(database),
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": {result.name: asdict(result) for result in results},
+    }
+
+
+def save_results(results, path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+        file.write("\n")
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as file:
+        results = json.load(file)
+    if results.get("version") != RESULTS_VERSION:
+        raise ValueError(f"'{path}' was written by a different version of the benchmark suite.")
+    return results
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Returns [(name, baseline median, current median, change, regressed)] for benchmarks in both."""
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        change = (result["median_ms"] - before["median_ms"]) / before["median_ms"] if before["median_ms"] else 0.0
+        rows.append((name, before["median_ms"], result["median_ms"], change, change > threshold))
+    return rows
+
+
+def print_result(result, file=sys.stdout):
+    print(f"  {result.name:<34} {result.median_ms:10.2f} ms  (min {result.min_ms:.2f}, "
+          f"{result.per_operation_ms:.3f} ms/op, {result.runs} runs)", file=file)
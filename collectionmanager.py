@@ -0,0 +1,687 @@
+#!/usr/bin/env python3
+
+# Program:          command-line interface
+# Associated file:  collectionmanager.py
+# Purpose:          Headless entry point for batch jobs (cron, servers, scripts):
+#
+#                       python -m collectionmanager import items items.csv --user bob
+#                       python -m collectionmanager export items items.jsonl --user bob --collection Coins
+#                       python -m collectionmanager report report.pdf --user admin
+#                       python -m collectionmanager search "penny" --user bob
+#                       python -m collectionmanager history --user bob --collection Coins --period month
+#                       python -m collectionmanager migrate
+#                       python -m collectionmanager reindex
+#                       python -m collectionmanager vacuum
+#                       python -m collectionmanager maintain --budget 2
+#                       python -m collectionmanager backup --every 24
+#                       python -m collectionmanager generate bench.sqlite --scale 100k
+#                       python -m collectionmanager --database bench.sqlite benchmark --json results.json
+#                       python -m collectionmanager stress --processes 4 --seconds 5
+#                       python -m collectionmanager serve --port 8765
+#
+#                   Only the data modules are imported, never gui.py, so it starts quickly and runs without
+#                   a display. Commands that touch user data act as a user (--user) and check that user's
+#                   password, read from $COLLECTIONS_PASSWORD (for cron and scripts) or asked for on the
+#                   terminal; admins see every user's data. Maintenance commands (reindex, vacuum,
+#                   maintain, backup) need only access to the database file.
+
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import db
+from log import log
+
+# export target -> (query, owner column or None, admin only)
+EXPORT_TABLES = {
+    "collections": ("SELECT User, CollectionName, Status FROM Collection", "User", False),
+    "sources": ("SELECT BusinessName, FirstName, LastName, Phone, Address, City, State, Zip, Email, Status "
+                "FROM Source", None, False),
+    "users": ("SELECT Username, Role, Status FROM User", None, True),  # never exports passwords
+    "log": ("SELECT User, Message, Timestamp FROM Log ORDER BY Timestamp", None, True),
+}
+
+
+# environment variable holding the --user password for unattended runs
+PASSWORD_VARIABLE = "COLLECTIONS_PASSWORD"
+
+
+class CommandError(Exception):
+    """A problem with the command line or its inputs; printed without a traceback."""
+
+
+def account_password(username):
+    """The password for --user: $COLLECTIONS_PASSWORD if set, otherwise asked for on the terminal."""
+    password = os.environ.get(PASSWORD_VARIABLE)
+    if password is not None:
+        return password
+    if not sys.stdin.isatty():
+        raise CommandError(f"Set {PASSWORD_VARIABLE} to the password of '{username}' (no terminal to ask on).")
+    import getpass  # imported here: only needed when prompting
+    return getpass.getpass(f"Password for {username}: ")
+
+
+def acting_user(args):
+    """Checks --user's password and returns (user, admin); commands that touch user data require it."""
+    import hmac  # imported here: only commands acting as a user check passwords
+    conn = sqlite3.connect(args.database)
+    row = conn.execute("SELECT Password, Status FROM User WHERE Username = ?", (args.user,)).fetchone()
+    conn.close()
+    if row is None:
+        raise CommandError(f"Unknown user '{args.user}'. Pass an existing username with --user.")
+    stored = row[0] if row[0] is not None else ""
+    if not hmac.compare_digest(stored.encode(), account_password(args.user).encode()):
+        raise CommandError(f"Wrong password for '{args.user}'.")
+    if row[1] == "Inactive":
+        raise CommandError(f"The account '{args.user}' is inactive.")
+    return args.user, db.is_admin(args.user)
+
+
+def prepare_schema(database, schema):
+    """Gets the database schema ready for a command.
+
+    schema is "migrate" for commands that write (the schema is brought up to date first), "check"
+    for read-only commands (an out-of-date schema is reported, never changed) and None for commands
+    that work on the file as it is or migrate it themselves.
+    """
+    if schema is None:
+        return
+    conn = sqlite3.connect(database)
+    try:
+        if schema == "migrate":
+            db.migrate(conn)
+            return
+        pending = db.pending_migrations(conn)
+    finally:
+        conn.close()
+    if pending:
+        raise CommandError(f"The database schema is out of date ({'; '.join(pending)}). "
+                           f"Run 'collectionmanager migrate' first.")
+
+
+def progress_printer(label):
+    """Prints a single updating progress line on stderr when it is a terminal."""
+    if not sys.stderr.isatty():
+        return None
+
+    def show(done, total=None):
+        suffix = f" of {total:,}" if total else ""
+        print(f"\r{label}: {done:,}{suffix}", end="", file=sys.stderr, flush=True)
+    return show
+
+
+##### COMMANDS #####
+
+def cmd_import(args):
+    import importer
+
+    user, admin = acting_user(args)
+    show = progress_printer("Imported")
+    progress = (lambda inserted, skipped: show(inserted)) if show else None
+    if args.kind == "items":
+        result = importer.import_items(args.file, user, admin, database=args.database, progress=progress)
+    else:
+        result = importer.import_sources(args.file, database=args.database, progress=progress)
+    if show:
+        print(file=sys.stderr)
+
+    print(result.summary())
+    for error in result.errors[:args.show_errors]:
+        print(f"  line {error.line}: {error.message}")
+    if result.skipped > args.show_errors:
+        print(f"  ... and {result.skipped - args.show_errors} more.")
+    if result.errors and args.errors:
+        importer.write_error_report(result, args.errors)
+        print(f"Rejected rows written to {args.errors}.")
+
+    log(f"{user} imported {os.path.basename(args.file)} (CLI): {result.summary()}", user, args.database)
+    return 1 if result.errors and args.strict else 0
+
+
+def export_query_for(args, user, admin):
+    if args.table == "items":
+        from item_filters import ItemFilter, item_export_query
+        item_filter = ItemFilter(
+            collection=args.collection,
+            user=None if admin else user,
+            show_inactive=args.include_inactive,
+        )
+        return item_export_query(item_filter)
+
+    query, owner, admin_only = EXPORT_TABLES[args.table]
+    if admin_only and not admin:
+        raise CommandError(f"Only admins can export {args.table}.")
+    condition, params = db.ownership_filter((owner,) if owner else (), user, admin)
+    if condition:
+        query = f"SELECT * FROM ({query}) WHERE {condition}"
+    return query, params
+
+
+def cmd_export(args):
+    from export import export_query
+
+    user, admin = acting_user(args)
+    query, params = export_query_for(args, user, admin)
+    show = progress_printer("Exported")
+    started = time.perf_counter()
+    written = export_query(query, params, args.file, progress=show, database=args.database)
+    if show:
+        print(file=sys.stderr)
+    print(f"Exported {written:,} rows to {args.file} in {time.perf_counter() - started:.2f} s.")
+    return 0
+
+
+def cmd_report(args):
+    import reports
+
+    user, admin = acting_user(args)
+    started = time.perf_counter()
+    report = reports.write_report(
+        args.file, user, admin, collections=args.collection or None,
+        include_inactive=args.include_inactive, database=args.database, workers=args.workers,
+    )
+    print(f"Wrote {len(report.sections)} collection section(s), {report.totals.items:,} items, "
+          f"to {args.file} in {time.perf_counter() - started:.2f} s.")
+    return 0
+
+
+def cmd_search(args):
+    from search import ensure_search_index, search_group, visible_groups
+
+    user, admin = acting_user(args)
+    conn = sqlite3.connect(args.database)
+    ensure_search_index(conn)  # first run on a database the GUI never opened
+    found = 0
+    for name in visible_groups(admin):
+        rows = search_group(conn, name, args.text, user, admin, limit=args.limit)
+        if not rows:
+            continue
+        found += len(rows)
+        print(f"{name} ({len(rows)})")
+        for row_id, title, detail in rows:
+            print(f"  {title}" + (f"  [{detail}]" if detail not in (None, "") else ""))
+    conn.close()
+    if not found:
+        print("No matches.")
+    return 0
+
+
+def cmd_history(args):
+    import valuation
+    from item_filters import ItemFilter
+    from money import format_money, format_signed
+
+    user, admin = acting_user(args)
+    conn = sqlite3.connect(args.database)
+    try:
+        if args.item is not None:
+            row = conn.execute("SELECT User FROM Item WHERE ItemID = ?", (args.item,)).fetchone()
+            if row is None or (not admin and row[0] != user):
+                raise CommandError(f"Item {args.item} not found.")
+            points = valuation.item_value_series(conn, args.item, args.period, args.since, args.until)
+        else:
+            item_filter = ItemFilter(collection=args.collection, user=None if admin else user,
+                                     show_inactive=args.include_inactive)
+            points = valuation.filter_value_series(conn, item_filter, args.period, args.since, args.until)
+    finally:
+        conn.close()
+
+    if not points:
+        print("No valuation history.")
+        return 0
+    previous = None
+    for period, cents in points:
+        change = "" if previous is None else format_signed(cents - previous)
+        print(f"{period}  {format_money(cents):>18}  {change:>16}")
+        previous = cents
+    return 0
+
+
+def cmd_migrate(args):
+    conn = sqlite3.connect(args.database)
+    try:
+        pending = db.pending_migrations(conn)
+        if not pending:
+            print("The database schema is up to date.")
+            return 0
+        started = time.perf_counter()
+        db.migrate(conn)
+    finally:
+        conn.close()
+    print(f"Migrated {args.database} in {time.perf_counter() - started:.2f} s: {'; '.join(pending)}.")
+    return 0
+
+
+def cmd_reindex(args):
+    from search import ensure_search_index
+
+    conn = sqlite3.connect(args.database)
+    started = time.perf_counter()
+    db.migrate(conn)
+    indexes = db.ensure_indexes(conn)
+    conn.execute("REINDEX")
+    ensure_search_index(conn, rebuild=True)
+    conn.execute("PRAGMA optimize")
+    conn.close()
+    print(f"Rebuilt all indexes ({len(indexes)} app indexes checked) and the search index "
+          f"in {time.perf_counter() - started:.2f} s.")
+    return 0
+
+
+def cmd_vacuum(args):
+    from search import ensure_search_index
+
+    before = os.path.getsize(args.database)
+    conn = sqlite3.connect(args.database)
+    started = time.perf_counter()
+    # from now on free pages can be given back a few at a time (see maintenance.step_vacuum)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    # VACUUM may renumber the implicit rowids the Collection and Log search indexes point at
+    ensure_search_index(conn, rebuild=True)
+    conn.execute("ANALYZE")
+    conn.close()
+    after = os.path.getsize(args.database)
+    print(f"Vacuumed {args.database}: {before:,} -> {after:,} bytes in {time.perf_counter() - started:.2f} s.")
+    return 0
+
+
+def cmd_maintain(args):
+    import maintenance
+
+    for result in maintenance.run_all(args.database, args.budget, args.step):
+        state = "done" if result.finished else "incomplete"
+        print(f"{result.step:<10} {result.seconds * 1000:8.0f} ms  {state:<10} {result.detail}")
+    return 0
+
+
+def cmd_backup(args):
+    import backup
+
+    if args.verify:
+        status = 0
+        for path in args.verify:
+            errors = backup.verify_backup(path)
+            print(f"{path}: {'ok' if not errors else '; '.join(errors[:5])}")
+            status = status or (1 if errors else 0)
+        return status
+
+    options = dict(folder=args.folder, keep=args.keep, compress=not args.no_compress)
+    while True:
+        show = progress_printer("Pages")
+        if args.every and not backup.backup_due(args.database, args.folder, args.every):
+            result = None
+        else:
+            try:
+                result = backup.backup_database(args.database, progress=show, **options)
+            except backup.BackupError as e:
+                if not args.every:
+                    raise CommandError(str(e))
+                print(f"Error: {e}", file=sys.stderr)
+                result = None
+        if result is not None:
+            if show:
+                print(file=sys.stderr)
+            restarts = f", restarted {result.restarts}x by writers" if result.restarts else ""
+            print(f"{result.taken}: backed up {result.database_bytes:,} bytes to {result.path} "
+                  f"({result.bytes:,} bytes, verified, {result.seconds:.2f} s{restarts}).")
+            for path in result.removed:
+                print(f"  removed old backup {path}")
+        if not args.every:
+            return 0
+        # wake up often enough to notice a backup made by someone else in the meantime
+        time.sleep(min(args.every * 3600, 600))
+
+
+def cmd_generate(args):
+    import datagen
+
+    items = args.items or datagen.SCALES[args.scale]
+    spec = datagen.DatasetSpec.for_items(items, seed=args.seed, users=args.users, sources=args.sources,
+                                         log_rows=args.log_rows)
+    print(f"Generating {args.file}: {spec.items:,} items, {spec.users:,} users, {spec.sources:,} sources, "
+          f"{spec.log_rows:,} log rows (seed {spec.seed})")
+    summary = datagen.generate(args.file, spec, search_index=not args.no_search_index,
+                               progress=progress_printer("rows"))
+    if sys.stderr.isatty():
+        print(file=sys.stderr)
+    print(f"Wrote {summary['bytes']:,} bytes in {summary['seconds']:.1f} s.")
+    return 0
+
+
+def cmd_benchmark(args):
+    import benchmarks
+
+    print(f"{args.database}: running against a scratch copy")
+    results = benchmarks.run_suite(args.database, only=args.only, repeat=args.repeat,
+                                   search_text=args.search_text, progress=benchmarks.print_result)
+    print(f"  ({results['dataset']['Item']:,} items, {results['dataset']['Log']:,} log rows)")
+    if args.json:
+        benchmarks.save_results(results, args.json)
+        print(f"Results written to {args.json}.")
+
+    status = 0
+    if args.compare:
+        baseline = benchmarks.load_results(args.compare)
+        if baseline["dataset"] != results["dataset"]:
+            print("Warning: the baseline was measured on a different dataset.")
+        print(f"Compared with {args.compare} (commit {baseline.get('commit') or 'unknown'}):")
+        for name, before, after, change, regressed in benchmarks.compare(baseline, results, args.threshold):
+            flag = "  REGRESSION" if regressed else ""
+            print(f"  {name:<34} {before:10.2f} -> {after:10.2f} ms  {change:+7.1%}{flag}")
+            if regressed:
+                status = 1
+
+    if not args.only and not check_core_imports(args.import_budget_ms):
+        status = 1
+    return status
+
+
+# the data layer every front end (GUI, CLI, workers) builds on
+CORE_MODULES = ("models", "db", "log")
+
+# modules the data layer must never pull in
+GUI_MODULES = ("tkinter", "ttkbootstrap", "gui", "gui2")
+
+
+# import-time budget for CORE_MODULES (best of several fresh interpreters, bytecode cached); the
+# sqlite3 extension module alone accounts for about half of it
+CORE_IMPORT_BUDGET_MS = 25
+
+
+def core_import_time(runs=5):
+    """Imports the data layer in fresh interpreters; returns (best time in ms, GUI modules it loaded)."""
+    script = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        f"import {', '.join(CORE_MODULES)}\n"
+        "elapsed = (time.perf_counter() - started) * 1000\n"
+        f"print(elapsed, ' '.join(m for m in {GUI_MODULES!r} if m in sys.modules))\n"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # measure loading the modules, not compiling them
+    timings = []
+    for _ in range(runs + 1):
+        output = subprocess.run([sys.executable, "-c", script], cwd=here, env=env,
+                                capture_output=True, text=True, check=True)
+        elapsed, _, gui_modules = output.stdout.strip().partition(" ")
+        timings.append(float(elapsed))
+    # the first run may have written the .pyc files
+    return min(timings[1:]), gui_modules.split()
+
+
+def check_core_imports(budget_ms):
+    """Fails if importing the data layer is over budget or imports a GUI module."""
+    elapsed, gui_modules = core_import_time()
+
+    print(f"  {'import ' + ', '.join(CORE_MODULES):<40} {elapsed:9.1f} ms (budget {budget_ms:g} ms)")
+    if gui_modules:
+        print(f"FAIL: the data layer imports GUI modules: {' '.join(gui_modules)}")
+        return False
+    if elapsed > budget_ms:
+        print("FAIL: the data layer is over its import-time budget.")
+        return False
+    return True
+
+
+# write paths compared by the stress command
+STRESS_MODES = ("plain", "retry", "writer")
+
+
+def stress_worker(database, mode, worker, seconds, threads):
+    """One stress process: writes to the scratch table for `seconds`; returns (commits, errors, retried).
+
+    plain  - a connection and implicit transaction per write, no retry (how the forms used to write)
+    retry  - db.run_write(): busy_timeout, BEGIN IMMEDIATE and jittered backoff
+    writer - `threads` threads in this process sharing one db.SingleWriter, batched transactions
+    """
+    import threading
+    from concurrent.futures import wait
+
+    sql = "INSERT INTO StressTest (Worker, Counter, Payload) VALUES (?, ?, ?)"
+    counts = {"commits": 0, "errors": 0}
+    deadline = time.perf_counter() + seconds
+
+    def insert(conn, counter):
+        # read then write, like the forms' duplicate checks before a save
+        conn.execute("SELECT COUNT(*) FROM StressTest WHERE Worker = ?", (worker,)).fetchone()
+        conn.execute(sql, (worker, counter, "x" * 100))
+
+    if mode == "writer":
+        writer = db.SingleWriter(database)
+        lock = threading.Lock()
+
+        def client(number):
+            counter = 0
+            while time.perf_counter() < deadline:
+                futures = [writer.submit(insert, number * 1_000_000 + counter + i) for i in range(10)]
+                counter += 10
+                wait(futures)
+                failed = sum(1 for future in futures if future.exception() is not None)
+                with lock:
+                    counts["commits"] += len(futures) - failed
+                    counts["errors"] += failed
+
+        clients = [threading.Thread(target=client, args=(number,)) for number in range(threads)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        writer.close()
+        return counts["commits"], counts["errors"], writer.batches
+
+    counter = 0
+    while time.perf_counter() < deadline:
+        counter += 1
+        try:
+            if mode == "retry":
+                db.run_write(insert, counter, database=database)
+            else:
+                conn = sqlite3.connect(database)
+                try:
+                    conn.execute("BEGIN")
+                    insert(conn, counter)
+                    conn.commit()
+                finally:
+                    conn.close()
+            counts["commits"] += 1
+        except sqlite3.OperationalError as e:
+            if not db.is_busy(e):
+                raise
+            counts["errors"] += 1
+    return counts["commits"], counts["errors"], counts["commits"]
+
+
+def create_stress_table(database, journal="delete"):
+    """Creates the StressTest scratch table the stress workers write to."""
+    conn = sqlite3.connect(database)
+    try:
+        conn.execute(f"PRAGMA journal_mode = {journal}")
+        conn.execute("CREATE TABLE StressTest (ID INTEGER PRIMARY KEY, Worker INTEGER, Counter INTEGER, Payload TEXT)")
+        conn.execute("CREATE INDEX idx_stress_worker ON StressTest (Worker)")
+    finally:
+        conn.close()
+
+
+def cmd_stress(args):
+    import multiprocessing
+    import shutil
+    import tempfile
+
+    # a scratch database, so the stress test never touches real data
+    folder = tempfile.mkdtemp(prefix="collections-stress-")
+    database = os.path.join(folder, "stress.sqlite")
+    create_stress_table(database, args.journal)
+
+    print(f"{args.processes} processes x {args.seconds:g} s, journal_mode={args.journal}")
+    print(f"  {'mode':<8} {'commits':>9} {'commits/s':>10} {'errors':>7} {'error rate':>10} {'transactions':>13}")
+    context = multiprocessing.get_context("spawn")
+    failed = False
+    try:
+        for mode in args.mode or STRESS_MODES:
+            with context.Pool(args.processes) as pool:
+                started = time.perf_counter()
+                results = pool.starmap(stress_worker, [
+                    (database, mode, worker, args.seconds, args.threads) for worker in range(args.processes)
+                ])
+                elapsed = time.perf_counter() - started
+            commits = sum(result[0] for result in results)
+            errors = sum(result[1] for result in results)
+            transactions = sum(result[2] for result in results)
+            rate = errors / (commits + errors) if commits + errors else 0.0
+            print(f"  {mode:<8} {commits:>9,} {commits / elapsed:>10,.0f} {errors:>7,} {rate:>10.2%} {transactions:>13,}")
+            failed = failed or (mode != "plain" and errors > 0)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    # lock errors are expected in plain mode; the retrying write paths must not surface any
+    return 1 if failed else 0
+
+
+def cmd_serve(args):
+    from api_server import serve
+
+    try:
+        serve(args.database, args.host, args.port, args.pool_size, args.allow_remote)
+    except ValueError as e:
+        raise CommandError(str(e))
+    return 0
+
+
+##### ARGUMENTS #####
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="collectionmanager", description="Collection Manager batch tools.")
+    parser.add_argument("--database", default=db.DATABASE, help="SQLite database file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("import", help="bulk-load items or sources from CSV")
+    command.add_argument("kind", choices=("items", "sources"))
+    command.add_argument("file")
+    command.add_argument("--user", required=True, help="owner of the imported items")
+    command.add_argument("--errors", help="write rejected rows to this CSV file")
+    command.add_argument("--show-errors", type=int, default=20, help="rejected rows to print (default: %(default)s)")
+    command.add_argument("--strict", action="store_true", help="exit with status 1 if any row was rejected")
+    command.set_defaults(handler=cmd_import, schema="migrate")
+
+    command = commands.add_parser("export", help="stream a table to CSV or JSON Lines (.csv / .jsonl)")
+    command.add_argument("table", choices=("items",) + tuple(EXPORT_TABLES))
+    command.add_argument("file")
+    command.add_argument("--user", required=True)
+    command.add_argument("--collection", help="items only: limit to one collection")
+    command.add_argument("--include-inactive", action="store_true", help="items only: include inactive items")
+    command.set_defaults(handler=cmd_export)
+
+    command = commands.add_parser("report", help="write an HTML or PDF collection report (.html / .pdf)")
+    command.add_argument("file")
+    command.add_argument("--user", required=True)
+    command.add_argument("--collection", action="append", help="limit to a collection (repeatable)")
+    command.add_argument("--include-inactive", action="store_true")
+    command.add_argument("--workers", type=int, help="render processes (default: one per CPU)")
+    command.set_defaults(handler=cmd_report)
+
+    command = commands.add_parser("search", help="substring search across items, collections and sources")
+    command.add_argument("text")
+    command.add_argument("--user", required=True)
+    command.add_argument("--limit", type=int, default=10, help="results per group (default: %(default)s)")
+    command.set_defaults(handler=cmd_search)
+
+    command = commands.add_parser("history", help="value of an item, a collection or all your items over time")
+    command.add_argument("--user", required=True)
+    scope = command.add_mutually_exclusive_group()
+    scope.add_argument("--collection")
+    scope.add_argument("--item", type=int, metavar="ITEM_ID")
+    command.add_argument("--period", choices=("day", "week", "month", "year"), default="month",
+                         help="one point per (default: %(default)s)")
+    command.add_argument("--since", metavar="YYYY-MM-DD")
+    command.add_argument("--until", metavar="YYYY-MM-DD")
+    command.add_argument("--include-inactive", action="store_true")
+    command.set_defaults(handler=cmd_history)
+
+    command = commands.add_parser("migrate", help="bring an older database up to the current schema")
+    command.set_defaults(handler=cmd_migrate, schema=None)
+
+    command = commands.add_parser("reindex", help="migrate, create missing indexes and rebuild the search index")
+    command.set_defaults(handler=cmd_reindex, schema=None)
+
+    command = commands.add_parser("vacuum", help="compact the database and rebuild the search index")
+    command.set_defaults(handler=cmd_vacuum, schema=None)
+
+    command = commands.add_parser("maintain", help="checkpoint, incremental vacuum, ANALYZE and optimize (for cron)")
+    command.add_argument("--budget", type=float, default=2.0, help="seconds per step (default: %(default)s)")
+    command.add_argument("--step", action="append", choices=("checkpoint", "vacuum", "analyze", "optimize"),
+                         help="step to run (repeatable; default: all)")
+    command.set_defaults(handler=cmd_maintain, schema=None)
+
+    command = commands.add_parser("backup", help="online backup with verify, rotation and gzip (see backup.py)")
+    command.add_argument("--folder", help="where backups go (default: a backups folder next to the database)")
+    command.add_argument("--keep", type=int, default=14, help="backups kept, older ones are deleted (default: %(default)s)")
+    command.add_argument("--no-compress", action="store_true", help="write plain .sqlite files instead of .sqlite.gz")
+    command.add_argument("--every", type=float, metavar="HOURS",
+                         help="keep running and back up whenever the newest backup is this old")
+    command.add_argument("--verify", nargs="+", metavar="BACKUP",
+                         help="only run integrity_check on existing backup files")
+    command.set_defaults(handler=cmd_backup, schema=None)
+
+    command = commands.add_parser("generate", help="create a synthetic database for benchmarking")
+    command.add_argument("file", help="new database file (must not exist)")
+    command.add_argument("--scale", choices=("1k", "10k", "100k", "1m"), default="10k", help="item count preset")
+    command.add_argument("--items", type=int, help="exact item count (overrides --scale)")
+    command.add_argument("--users", type=int)
+    command.add_argument("--sources", type=int)
+    command.add_argument("--log-rows", type=int)
+    command.add_argument("--seed", type=int, default=0, help="same seed, same data (default: %(default)s)")
+    command.add_argument("--no-search-index", action="store_true", help="skip building the FTS search index")
+    command.set_defaults(handler=cmd_generate, needs_database=False)
+
+    command = commands.add_parser("benchmark", help="time CRUD, search, grid loading, export and import")
+    command.add_argument("--search-text", default="item")
+    command.add_argument("--only", action="append", help="run benchmarks whose names start with this (repeatable)")
+    command.add_argument("--repeat", type=int, help="timed runs per benchmark (default: per benchmark)")
+    command.add_argument("--json", help="write the results to this JSON file")
+    command.add_argument("--compare", help="compare with results saved by an earlier --json run")
+    command.add_argument("--threshold", type=float, default=0.25,
+                         help="median slowdown reported as a regression (default: %(default)s)")
+    command.add_argument("--import-budget-ms", type=float, default=CORE_IMPORT_BUDGET_MS,
+                         help="fail if importing models/db/log takes longer (default: %(default)s)")
+    command.set_defaults(handler=cmd_benchmark, schema=None)  # migrates its scratch copy
+
+    command = commands.add_parser("stress", help="measure write throughput and lock errors with several processes")
+    command.add_argument("--processes", type=int, default=4, help="(default: %(default)s)")
+    command.add_argument("--seconds", type=float, default=5, help="per mode (default: %(default)s)")
+    command.add_argument("--threads", type=int, default=4, help="writer mode: client threads per process (default: %(default)s)")
+    command.add_argument("--mode", action="append", choices=STRESS_MODES, help="mode to run (repeatable; default: all)")
+    command.add_argument("--journal", choices=("delete", "wal"), default="delete",
+                         help="journal mode of the scratch database (default: %(default)s)")
+    command.set_defaults(handler=cmd_stress, needs_database=False)
+
+    command = commands.add_parser("serve", help="run the local HTTP/JSON API (see api_server.py)")
+    command.add_argument("--host", default="127.0.0.1", help="address to bind (default: %(default)s)")
+    command.add_argument("--port", type=int, default=8765, help="(default: %(default)s)")
+    command.add_argument("--pool-size", type=int, default=4, help="read connections and threads (default: %(default)s)")
+    command.add_argument("--allow-remote", action="store_true",
+                         help="allow a non-loopback --host (passwords are sent unencrypted)")
+    command.set_defaults(handler=cmd_serve, schema=None)  # ApiServer.start migrates
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, "needs_database", True) and not os.path.exists(args.database):
+        print(f"Database '{args.database}' not found.", file=sys.stderr)
+        return 1
+    try:
+        if getattr(args, "needs_database", True):
+            prepare_schema(args.database, getattr(args, "schema", "check"))
+        return args.handler(args)
+    except (CommandError, ValueError, OSError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1230 @@
+# Program:          CRUD windows module
+# Associated file:  crud_windows.py
+# Purpose:          The add/update/deactivate/reactivate/delete forms for items, users, collections and
+#                   sources. They are opened rarely, so main_window.py imports this module the first time
+#                   one of them is needed.
+
+import tkinter as tk  # Ensure tkinter is imported as tk
+from tkinter import ttk, messagebox
+from models import User, Item, Source, Collection, ChangeEvent, STATUS, UPDATE, publish, tracked_write
+from money import cents_to_text, format_money, to_cents
+from db import get_logged_in_user, is_admin, run_write
+from log import log
+import metrics
+from lookup_cache import cache
+from gui import FormWindow
+
+##### CRUD OPERATION WINDOWS #####
+### ITEMS ###
+
+# COMPLETED
+class AddItemWindow(FormWindow):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master, title="Add Item")
+        self.refresh_callback = refresh_callback
+
+        # Set fixed size and minimum size
+        self.geometry("450x450")
+        self.minsize(450, 450)
+
+        # --- FORM FIELDS ---
+
+        # Field: Item Name (simple text entry)
+        self.itemname_entry = self.labeled_entry("Item Name:")
+
+        # Collection Dropdown: Choose a Collection
+        collection_query = "SELECT CollectionName FROM Collection WHERE User = ?"
+        self.collection_dropdown, self.collection_var = self.labeled_dropdown("Collection:", collection_query, (get_logged_in_user(),), map_name="collection")
+
+        # "Add Collection" button below dropdown
+        self.create_button("Add Collection", self.open_add_collection_window)
+
+        # Source Dropdown (populated from database)
+        # Source type-ahead (matches are looked up as the user types)
+        self.source_dropdown, self.source_var = self.labeled_autocomplete(
+            "Select Source:", "Source", "BusinessName", id_column="SourceID"
+        )
+
+        # "Add Source" button below dropdown
+        self.create_button("Add Source", self.open_add_source_window)
+
+        # Price Paid (entry for numeric input)
+        self.pricepaid_entry = self.labeled_entry("Price Paid:")
+
+        # Current Value (entry for numeric input)
+        self.currentvalue_entry = self.labeled_entry("Current Value:")
+
+        # Notes field (multi-line input)
+        self.notes_text = self.labeled_textarea("Notes:")
+
+        # Submit and Cancel buttons
+        self.add_buttons(submit_text="Add Item", cancel_text="Cancel")
+
+        # Optional callback to refresh parent UI
+        if self.refresh_callback:
+            self.refresh_callback()
+
+    # Cancel simply closes the window
+    def cancel(self):
+        self.destroy()
+
+    # Open AddCollectionWindow and refresh the list after it's closed
+    def open_add_collection_window(self):
+        def refresh_collections():
+            collection_query = "SELECT CollectionName FROM Collection WHERE User = ?"
+            self.load_dropdown_data(self.collection_dropdown, collection_query, (get_logged_in_user(),), map_name="collection")
+        AddCollectionWindow(self.master, refresh_callback=refresh_collections).grab_set()
+
+    # Open AddSourceWindow and refresh the list after it's closed
+    def open_add_source_window(self):
+        def refresh_sources():
+            # drop the stale matches; the next keystroke or open re-queries
+            self.source_dropdown.refresh()
+        AddSourceWindow(self.master, refresh_callback=refresh_sources).grab_set()
+
+    # Add Submit and Cancel buttons with specific functions
+        self.add_buttons(submit_text="Update Source", cancel_text="Cancel", 
+                            submit_command=self.submit, cancel_command=self.cancel)
+
+    
+    
+    # Called when user clicks Submit
+    def submit(self):
+        # Collect form input values
+        itemname = self.itemname_entry.get().strip()
+        collection_name = self.collection_var.get().strip()
+        source_name = self.source_dropdown.match() or ""
+        pricepaid = self.pricepaid_entry.get().strip()
+        currentvalue = self.currentvalue_entry.get().strip()
+        notes = self.notes_text.get("1.0", "end").strip()
+        user = get_logged_in_user()
+
+        # Basic validation
+        if not itemname:
+            messagebox.showerror("Input Error", "Item Name cannot be empty.")
+            return
+
+        if not collection_name or not source_name:
+            messagebox.showerror("Input Error", "Please select a collection and a source.")
+            return
+
+        try:
+            # a blank amount is saved as 0, as before
+            pricepaid = to_cents(pricepaid, "Price Paid") or 0
+            currentvalue = to_cents(currentvalue, "Current Value") or 0
+        except ValueError as e:
+            messagebox.showerror("Input Error", str(e))
+            return
+
+        # Confirm with user before saving
+        confirm_message = (
+            f"Is this information correct?\n\n"
+            f"Item Name: {itemname}\n"
+            f"Collection: {collection_name}\n"
+            f"Source: {source_name}\n"
+            f"Price Paid: {format_money(pricepaid)}\n"
+            f"Current Value: {format_money(currentvalue)}\n"
+            f"Notes: {notes or 'N/A'}"
+        )
+        confirm = messagebox.askyesno("Confirm Item Details", confirm_message)
+        if not confirm:
+            return
+
+        try:
+            # Create and save the item without any IDs
+            new_item = Item(
+                ItemName=itemname,
+                Collection=collection_name,
+                Source=source_name,
+                User=user,
+                PricePaidCents=pricepaid,
+                CurrentValueCents=currentvalue,
+                Notes=notes
+            )
+            new_item.save()
+            metrics.incr(metrics.ITEMS_ADDED, user)
+            metrics.observe(metrics.ITEM_PRICE_PAID, pricepaid, user)
+
+            messagebox.showinfo("Success", f"Item '{itemname}' added successfully.")
+
+            if self.refresh_callback:
+                self.refresh_callback()
+
+            self.destroy()
+
+        except Exception as e:
+            messagebox.showerror("Database Error", f"Failed to add item: {e}")
+
+
+class DeactivateItemWindow(FormWindow):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master)
+        self.title("Deactivate Item")
+        self.refresh_callback = refresh_callback
+        self.geometry("400x200")
+        self.minsize(400, 200)
+
+        # Admins can deactivate anyone's items
+        logged_in_username = get_logged_in_user()
+        if is_admin():
+            self.query = "SELECT ItemID, ItemName FROM Item WHERE Status = 'Active'"
+            self.params = None
+        else:
+            self.query = "SELECT ItemID, ItemName FROM Item WHERE Status = 'Active' AND User = ?"
+            self.params = (logged_in_username,)
+
+        # Initialize item_map to store ItemName -> ItemID mapping
+        self.item_map = {}
+
+        # Create dropdown using FormWindow's reusable method
+        self.item_dropdown, self.item_var = self.labeled_dropdown("Select an Item:", self.query, self.params)
+
+        # Add buttons
+        self.add_buttons(submit_text="Deactivate Item", cancel_text="Cancel")
+
+    def load_dropdown_data(self, dropdown, query, params=None, map_name=None):
+        try:
+            # Loading dropdown data and mapping ItemName to ItemID (cached until an Item write)
+            self.item_map = cache.get_map(query, params or ())
+
+            # Clear previous values
+            dropdown.set("")
+            dropdown['values'] = []
+
+            if self.item_map:
+                dropdown['values'] = list(self.item_map.keys())
+
+            # If no items found
+            if not dropdown['values']:
+                dropdown.set("No items available")
+                dropdown.config(state="disabled")
+            else:
+                dropdown.config(state="readonly")
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Error loading dropdown data: {e}")
+            log(f"Error loading dropdown data: {e}")
+
+    def submit(self):
+        selected_name = self.item_var.get().strip()
+        if not selected_name:
+            messagebox.showerror("Input Error", "Please select an item to deactivate.")
+            return
+
+        item_id = self.item_map.get(selected_name)
+        if not item_id:
+            messagebox.showerror("Error", f"Item '{selected_name}' not found.")
+            return
+
+        confirm = messagebox.askyesno("Confirm Deactivation", f"Are you sure you want to deactivate '{selected_name}'?")
+        if not confirm:
+            return
+
+        try:
+            rows = run_write(lambda conn: tracked_write(
+                conn, "Item", "ItemID = ?", (item_id,),
+                lambda: conn.execute("UPDATE Item SET Status = 'Inactive' WHERE ItemID = ?", (item_id,))))
+            publish(ChangeEvent("Item", item_id, STATUS, "Inactive", rows))
+            message = f"Item '{selected_name}' has been deactivated."
+            messagebox.showinfo("Success", message)
+            log(message)
+            metrics.incr(metrics.ITEMS_DEACTIVATED, get_logged_in_user())
+
+            # Reload dropdown with updated values
+            self.load_dropdown_data(self.item_dropdown, self.query, self.params)
+
+            if self.refresh_callback:
+                self.refresh_callback()
+
+            self.cancel()
+
+        except Exception as e:
+            message = f"An error occurred: {e}"
+            messagebox.showerror("Database Error", message)
+            log(message)
+
+    def cancel(self):
+        self.destroy()
+
+
+# TODO: Reactivate Item
+
+# Update Item
+class UpdateItemWindow(FormWindow):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master, title="Update Item")
+        self.refresh_callback = refresh_callback
+        self.item = None
+        self.geometry("400x500")
+        self.minsize(400, 500)
+        self.maxsize(400, 500)
+
+        # Select Item to update
+        self.item_dropdown, self.item_var = self.labeled_autocomplete(
+            "Select Item:", "Item", "ItemName", id_column="ItemID", where="User = ?", params=(get_logged_in_user(),)
+        )
+        self.item_dropdown.bind("<<ComboboxSelected>>", self.prefill_fields)
+
+        # Item Name
+        self.name_entry = self.labeled_entry("Name:")
+
+        # Collection dropdown by name
+        collection_query = "SELECT CollectionName FROM Collection WHERE User = ? ORDER BY CollectionName"
+        self.collection_dropdown, self.collection_var = self.labeled_dropdown(
+            "Collection:", collection_query, (get_logged_in_user(),), map_name="collection"
+        )
+
+        # Source dropdown by business name
+        self.source_dropdown, self.source_var = self.labeled_autocomplete(
+            "Source:", "Source", "BusinessName", id_column="SourceID"
+        )
+
+        # Amounts are typed in dollars and stored as cents
+        self.pricepaid_entry = self.labeled_entry("Price Paid:")
+        self.currentvalue_entry = self.labeled_entry("Current Value:")
+
+        # Description
+        self.description_entry = self.labeled_entry("Description:")
+
+        # Notes
+        self.notes_entry = self.labeled_entry("Notes:")
+
+        # Update + Cancel buttons
+        self.add_buttons(submit_text="Update", cancel_text="Cancel")
+
+    def prefill_fields(self, event=None):
+        name = self.item_var.get()
+        if not name:
+            return
+
+        item = Item.get_by_identifier("ItemName", name)
+        if not item:
+            return
+        self.item = item
+
+        self.name_entry.delete(0, tk.END)
+        self.name_entry.insert(0, item.ItemName)
+
+        self.collection_var.set(item.Collection or "")
+        self.source_var.set(item.Source or "")
+
+        self.pricepaid_entry.delete(0, tk.END)
+        self.pricepaid_entry.insert(0, cents_to_text(item.PricePaidCents))
+
+        self.currentvalue_entry.delete(0, tk.END)
+        self.currentvalue_entry.insert(0, cents_to_text(item.CurrentValueCents))
+
+        self.description_entry.delete(0, tk.END)
+        self.description_entry.insert(0, item.Description or "")
+
+        self.notes_entry.delete(0, tk.END)
+        self.notes_entry.insert(0, item.Notes or "")
+
+    def submit(self):
+        selected_name = self.item_var.get()
+        if not selected_name or self.item is None or self.item.ItemName != selected_name:
+            messagebox.showerror("Input Error", "Please select an item to update.")
+            return
+
+        name = self.name_entry.get().strip()
+        collection = self.collection_var.get().strip()
+        source = self.source_var.get().strip()
+        description = self.description_entry.get().strip()
+        notes = self.notes_entry.get().strip()
+
+        if not name:
+            messagebox.showerror("Input Error", "Item name is required.")
+            return
+
+        try:
+            pricepaid = to_cents(self.pricepaid_entry.get(), "Price Paid")
+            currentvalue = to_cents(self.currentvalue_entry.get(), "Current Value")
+        except ValueError as e:
+            messagebox.showerror("Input Error", str(e))
+            return
+
+        item_id = self.item.ItemID
+
+        def update(conn):
+            # the (before, after) rows let the footer totals apply the edit instead of re-querying
+            key = (item_id, get_logged_in_user())
+            return tracked_write(conn, "Item", "ItemID = ? AND User = ?", key, lambda: conn.execute(
+                "UPDATE Item SET ItemName = ?, Collection = ?, Source = ?, PricePaidCents = ?, "
+                "CurrentValueCents = ?, Description = ?, Notes = ? WHERE ItemID = ? AND User = ?",
+                (name, collection, source, pricepaid, currentvalue, description, notes) + key,
+            ))
+
+        try:
+            rows = run_write(update)
+            if not rows:
+                messagebox.showerror("Database Error", f"Item '{selected_name}' no longer exists.")
+                return
+            publish(ChangeEvent("Item", item_id, UPDATE, rows=rows))
+
+            messagebox.showinfo("Success", f"Item '{selected_name}' updated successfully.")
+            if self.refresh_callback:
+                self.refresh_callback()
+            self.destroy()
+
+        except Exception as e:
+            messagebox.showerror("Database Error", f"Failed to update item: {e}")
+
+    def cancel(self):
+        self.destroy()
+
+
+### USER ###
+
+class AddUserWindow(FormWindow):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master, title="Add User")
+        self.refresh_callback = refresh_callback
+
+        self.geometry("400x350")
+        self.minsize(350, 350)
+        self.maxsize(350, 350)
+
+        # Username
+        self.username_entry = self.labeled_entry("Username:")
+
+        # Password
+        self.password_entry = self.labeled_entry("Password:")
+        self.password_entry.config(show="*")
+
+        # Confirm Password
+        self.confirm_password_entry = self.labeled_entry("Confirm Password:")
+        self.confirm_password_entry.config(show="*")
+
+        # Show/Hide password checkbox
+        self.show_password_var = tk.BooleanVar()
+        self.show_password_check = tk.Checkbutton(
+            self.form_frame,
+            text="Show Password",
+            variable=self.show_password_var,
+            command=self.toggle_password_visibility
+        )
+        row = self.next_row()
+        self.show_password_check.grid(row=row, column=0, columnspan=2, pady=5, sticky="w")
+
+        # Role dropdown
+        self.role_dropdown, self.role_var = self.labeled_static_dropdown("Role:", ("Admin", "User"), default_index=0)
+
+        # Add and Cancel buttons centered
+        self.add_buttons(submit_text="Add User", cancel_text="Cancel")
+
+        if self.refresh_callback:
+            self.refresh_callback()
+
+    def toggle_password_visibility(self):
+        show_char = "" if self.show_password_var.get() else "*"
+        self.password_entry.config(show=show_char)
+        self.confirm_password_entry.config(show=show_char)
+
+    def labeled_dropdown(self, label_text, values, default_index=0):
+        row = self.next_row()
+
+        label = tk.Label(self.form_frame, text=label_text)
+        label.grid(row=row, column=0, sticky="w", pady=5, padx=5)
+
+        var = tk.StringVar()
+        dropdown = ttk.Combobox(self.form_frame, textvariable=var, state="readonly", values=values)
+        dropdown.grid(row=row, column=1, sticky="ew", pady=5, padx=5)
+        dropdown.current(default_index)
+
+        return dropdown, var
+
+    def submit(self):
+        username = self.username_entry.get().strip()
+        password = self.password_entry.get().strip()
+        confirm_password = self.confirm_password_entry.get().strip()
+        role = self.role_var.get().strip()
+
+        if not username or not password or not confirm_password:
+            messagebox.showerror("Input Error", "All fields are required.")
+            return
+
+        if password != confirm_password:
+            messagebox.showerror("Input Error", "Passwords do not match.")
+            return
+
+        try:
+            user = User(Username=username, Password=password, Role=role)
+            user.save()
+            messagebox.showinfo("Success", f"User '{username}' added successfully.")
+
+            if self.refresh_callback:
+                self.refresh_callback()
+            self.destroy()
+
+        except Exception as e:
+            messagebox.showerror("Database Error", f"Failed to add user: {e}")
+
+    def cancel(self):
+        self.destroy()
+
+
+class DeactivateUserWindow(tk.Toplevel):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master)
+        self.title("Deactivate User")
+        self.geometry("320x180")
+        self.refresh_callback = refresh_callback
+
+        # Label
+        tk.Label(self, text="Select User to Deactivate:").grid(row=0, column=0, columnspan=2, pady=(10, 5), padx=10)
+
+        # Dropdown
+        self.user_var = tk.StringVar()
+        self.user_dropdown = ttk.Combobox(self, textvariable=self.user_var, state="readonly")
+        self.user_dropdown.grid(row=1, column=0, columnspan=2, padx=10, sticky="ew")
+
+        # Buttons
+        deactivate_btn = tk.Button(self, text="Deactivate User", command=self.submit)
+        cancel_btn = tk.Button(self, text="Cancel", command=self.destroy)
+
+        deactivate_btn.grid(row=2, column=0, pady=10, padx=10, sticky="e")
+        cancel_btn.grid(row=2, column=1, pady=10, padx=10, sticky="w")
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_columnconfigure(1, weight=1)
+
+        self.load_users()
+
+    def load_users(self):
+        try:
+            current_user = get_logged_in_user()
+            # Other active users only
+            filtered = cache.get_values(
+                "SELECT Username FROM User WHERE Username != ? AND Status = 'Active'", (current_user,)
+            )
+
+            if not filtered:
+                self.user_dropdown['values'] = []
+                self.user_dropdown.set("No users available")
+                messagebox.showwarning("No Users", "No other active users found.")
+            else:
+                self.user_dropdown['values'] = filtered
+        except Exception as e:
+            message = f"Failed to load users: {e}"
+            messagebox.showerror("Error", message)
+            log(message)
+
+    def submit(self):
+        selected_user = self.user_var.get().strip()
+        if not selected_user:
+            messagebox.showerror("Input Error", "Please select a user to deactivate.")
+            return
+
+        confirm = messagebox.askyesno("Confirm Deactivation", f"Are you sure you want to deactivate '{selected_user}'?")
+        if not confirm:
+            return
+
+        try:
+            user = User.get_by_identifier(selected_user)
+            if not user:
+                messagebox.showerror("Error", "User not found.")
+                return
+
+            user.update_status("Inactive")
+            message = f"User '{selected_user}' deactivated."
+            messagebox.showinfo("Success", message)
+            log(message)
+            metrics.incr(metrics.USERS_DEACTIVATED, get_logged_in_user())
+            self.load_users()
+            if self.refresh_callback:
+                self.refresh_callback()
+
+        except Exception as e:
+            message = f"An error occurred: {e}"
+            messagebox.showerror("Database Error", message)
+            log(message)
+
+class ReactivateUserWindow(tk.Toplevel):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master)
+        self.title("Reactivate User")
+        self.geometry("320x180")
+        self.refresh_callback = refresh_callback
+
+        # Label
+        tk.Label(self, text="Select User to Reactivate:").grid(row=0, column=0, columnspan=2, pady=(10, 5), padx=10)
+
+        # Dropdown
+        self.user_var = tk.StringVar()
+        self.user_dropdown = ttk.Combobox(self, textvariable=self.user_var, state="readonly")
+        self.user_dropdown.grid(row=1, column=0, columnspan=2, padx=10, sticky="ew")
+
+        # Buttons
+        reactivate_btn = tk.Button(self, text="Reactivate User", command=self.submit)
+        cancel_btn = tk.Button(self, text="Cancel", command=self.destroy)
+
+        reactivate_btn.grid(row=2, column=0, pady=10, padx=10, sticky="e")
+        cancel_btn.grid(row=2, column=1, pady=10, padx=10, sticky="w")
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_columnconfigure(1, weight=1)
+
+        self.load_users()
+
+    def load_users(self):
+        try:
+            current_user = get_logged_in_user()
+            # Only inactive users, excluding the current user
+            filtered = cache.get_values(
+                "SELECT Username FROM User WHERE Username != ? AND Status = 'Inactive'", (current_user,)
+            )
+
+            if not filtered:
+                self.user_dropdown['values'] = []
+                self.user_dropdown.set("No users available")
+                messagebox.showwarning("No Users", "No inactive users found.")
+            else:
+                self.user_dropdown['values'] = filtered
+                self.user_dropdown.set("Select a user")
+
+        except Exception as e:
+            message = f"Failed to load users: {e}"
+            messagebox.showerror("Error", message)
+            log(message)
+
+    def submit(self):
+        selected_user = self.user_var.get().strip()
+        if not selected_user:
+            messagebox.showerror("Input Error", "Please select a user to reactivate.")
+            return
+
+        confirm = messagebox.askyesno("Confirm Reactivation", f"Are you sure you want to reactivate '{selected_user}'?")
+        if not confirm:
+            return
+
+        try:
+            user = User.get_by_identifier(selected_user)
+            if not user:
+                messagebox.showerror("Error", "User not found.")
+                return
+
+            user.update_status("Active")
+            message = f"User '{selected_user}' has been reactivated."
+            messagebox.showinfo("Success", message)
+            log(message)
+            metrics.incr(metrics.USERS_REACTIVATED, get_logged_in_user())
+            self.load_users()
+            if self.refresh_callback:
+                self.refresh_callback()
+            self.destroy()
+
+        except Exception as e:
+            message = f"An error occurred: {e}"
+            messagebox.showerror("Database Error", message)
+            log(message)
+
+class DeleteUserWindow(tk.Toplevel):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master)
+        self.title("Delete User")
+        self.refresh_callback = refresh_callback
+        self.geometry("300x150")
+        self.minsize(300, 150)
+
+        # Label
+        self.user_label = tk.Label(self, text="Select User to Delete:")
+        self.user_label.pack()
+
+        # Dropdown
+        self.user_var = tk.StringVar()
+        self.user_dropdown = ttk.Combobox(self, textvariable=self.user_var, state="readonly")
+        self.user_dropdown.pack()
+
+        # Buttons
+        self.submit_button = tk.Button(self, text="Delete User", command=self.submit)
+        self.submit_button.pack(pady=10)
+
+        self.cancel_button = tk.Button(self, text="Cancel", command=self.cancel)
+        self.cancel_button.pack()
+
+        self.load_users()  # 🔁 Populate dropdown
+
+    def load_users(self):
+        logged_in_user = get_logged_in_user()
+        query = "SELECT Username FROM User WHERE Username != ? "
+        users = cache.get_values(query, (logged_in_user,))
+
+        if not users:
+            self.user_dropdown['values'] = []
+            self.user_dropdown.set("No users available")
+            self.user_dropdown.config(state="disabled")
+        else:
+            self.user_dropdown.config(state="readonly")
+            self.user_dropdown['values'] = users
+            self.user_dropdown.set(users[0])
+
+    def submit(self):
+        selected_user = self.user_var.get().strip()
+        if not selected_user:
+            messagebox.showerror("Input Error", "Please select a user to delete.")
+            return
+
+        confirm = messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete '{selected_user}'?")
+        if not confirm:
+            return
+
+        try:
+            user = User.get_by_identifier(selected_user)
+            if user:
+                user.delete()
+                message=f"User '{selected_user}' has been deleted."
+                messagebox.showinfo("Success", message)
+                log(message)
+                self.load_users()  # 🔁 Refresh dropdown
+                if self.refresh_callback:
+                    self.refresh_callback()
+            else:
+                messagebox.showerror("Error", f"User '{selected_user}' not found.")
+        except Exception as e:
+            message=f"An error occurred: {e}"
+            messagebox.showerror("Database Error", message)
+            log(message)
+
+    def cancel(self):
+        self.destroy()
+
+
+class UpdateUserWindow(FormWindow):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master, title="Edit User")
+        self.refresh_callback = refresh_callback
+
+        self.geometry("400x400")
+        self.minsize(350, 400)
+        self.maxsize(400, 400)
+
+        # Dropdown to select existing user
+        self.user_dropdown, self.user_var = self.labeled_dropdown(
+            "Select User:",
+            query="SELECT Username FROM User"
+        )
+        self.user_dropdown.bind("<<ComboboxSelected>>", self.prefill_fields)
+
+        # Username
+        self.username_entry = self.labeled_entry("Username:")
+
+        # Password
+        self.password_entry = self.labeled_entry("Password:")
+        self.password_entry.config(show="*")
+
+        # Confirm Password
+        self.confirm_password_entry = self.labeled_entry("Confirm Password:")
+        self.confirm_password_entry.config(show="*")
+
+        # Show/Hide password checkbox
+        self.show_password_var = tk.BooleanVar()
+        self.show_password_check = tk.Checkbutton(
+            self.form_frame,
+            text="Show Password",
+            variable=self.show_password_var,
+            command=self.toggle_password_visibility
+        )
+        row = self.next_row()
+        self.show_password_check.grid(row=row, column=0, columnspan=2, pady=5, sticky="w")
+
+        # Role dropdown (Admin/User)
+        self.role_dropdown, self.role_var = self.labeled_static_dropdown("Role:", ("Admin", "User"), default_index=1)
+
+        # Buttons
+        self.add_buttons(submit_text="Update User", cancel_text="Cancel")
+
+    def toggle_password_visibility(self):
+        show_char = "" if self.show_password_var.get() else "*"
+        self.password_entry.config(show=show_char)
+        self.confirm_password_entry.config(show=show_char)
+
+    def prefill_fields(self, event=None):
+        username = self.user_var.get().strip()
+        if not username:
+            return
+
+        user = User.get_by_identifier(username)
+        if not user:
+            messagebox.showerror("Error", f"User '{username}' not found.")
+            return
+
+        self.username_entry.delete(0, tk.END)
+        self.username_entry.insert(0, user.Username)
+
+        self.password_entry.delete(0, tk.END)
+        self.confirm_password_entry.delete(0, tk.END)
+
+        self.role_var.set(user.Role or "User")
+
+    def submit(self):
+        selected_username = self.user_var.get().strip()
+        new_username = self.username_entry.get().strip()
+        password = self.password_entry.get().strip()
+        confirm_password = self.confirm_password_entry.get().strip()
+        role = self.role_var.get().strip()
+
+        if not selected_username or not new_username:
+            messagebox.showerror("Input Error", "Username is required.")
+            return
+
+        if password and password != confirm_password:
+            messagebox.showerror("Input Error", "Passwords do not match.")
+            return
+
+        try:
+            user = User.get_by_identifier(selected_username)
+            if not user:
+                messagebox.showerror("Error", f"User '{selected_username}' not found.")
+                return
+
+            user.Username = new_username
+            if password:
+                user.Password = password
+            user.Role = role
+
+            user.update()  # Assuming your User class has an .update() method
+
+            messagebox.showinfo("Success", f"User '{new_username}' updated successfully.")
+            if self.refresh_callback:
+                self.refresh_callback()
+            self.destroy()
+
+        except Exception as e:
+            messagebox.showerror("Database Error", f"Failed to update user: {e}")
+
+    def cancel(self):
+        self.destroy()
+
+### Collections ###
+
+class AddCollectionWindow(FormWindow):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master, title="Add Collection")
+        self.refresh_callback = refresh_callback
+
+        # Set fixed size and minimum size
+        self.geometry("300x150")
+        self.minsize(450, 150)
+
+        # Field: Collection Name (remove key argument)
+        self.collectionname_entry = self.labeled_entry("Collection Name")
+
+        # Submit and Cancel buttons at the bottom
+        self.add_buttons(submit_text="Submit", cancel_text="Cancel")
+
+        # Optional callback for refreshing the view
+        if self.refresh_callback:
+            self.refresh_callback()
+
+    def submit(self):
+        # Retrieve input values
+        collectionname = self.collectionname_entry.get().strip()
+        user = get_logged_in_user()
+
+        # Validate collection name
+        if not collectionname:
+            messagebox.showerror("Input Error", "Collection Name cannot be empty.")
+            return
+
+        # Check if a collection with the same name exists for the user
+        collections = Collection.get_all(CollectionName=collectionname, User=user)
+        if collections:
+            messagebox.showerror(
+                "Duplicate Collection",
+                f"You already have a collection named '{collectionname}'."
+            )
+            return
+
+        # Create and save the new collection
+        try:
+            new_collection = Collection(
+                CollectionName=collectionname,
+                User=user
+            )
+            new_collection.save()
+            message = f"Collection '{collectionname}' added successfully."
+            messagebox.showinfo("Success", message)
+            log(message)
+            metrics.incr(metrics.COLLECTIONS_ADDED, user)
+
+            if self.refresh_callback:
+                self.refresh_callback()
+
+            self.destroy()
+        except Exception as e:
+            messagebox.showerror("Database Error", f"Failed to add collection: {e}")
+
+class DeactivateCollectionWindow(tk.Toplevel):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master)
+        self.title("Deactivate Collection")
+        self.geometry("320x180")
+        self.refresh_callback = refresh_callback
+
+        # Label
+        tk.Label(self, text="Select Collection to Deactivate:").pack(pady=(10, 5))
+
+        # Dropdown
+        self.collection_var = tk.StringVar()
+        self.collection_dropdown = ttk.Combobox(self, textvariable=self.collection_var, state="readonly")
+        self.collection_dropdown.pack()
+
+        # Buttons
+        tk.Button(self, text="Deactivate Collection", command=self.submit).pack(pady=10)
+        tk.Button(self, text="Cancel", command=self.destroy).pack()
+
+        self.load_collections()
+
+    def load_collections(self):
+        user = get_logged_in_user()
+        collections = cache.get_values("SELECT CollectionName FROM Collection WHERE User = ?", (user,))
+        if not collections:
+            messagebox.showwarning("No Collections", "No collections found for the logged-in user.")
+            self.collection_dropdown['values'] = []
+            self.collection_dropdown.set("No collections available")
+        else:
+            self.collection_dropdown['values'] = collections
+
+    def submit(self):
+        selected_name = self.collection_var.get().strip()
+        if not selected_name:
+            messagebox.showerror("Input Error", "Please select a collection.")
+            return
+
+        # Extra warning prompt
+        confirm = messagebox.askyesno(
+            "Confirm Deactivation",
+            f"Are you sure you want to deactivate the collection '{selected_name}'?\n\n"
+            "This will deactivate every item in this collection. Continue?"
+        )
+        if not confirm:
+            return
+
+        try:
+            # Get and deactivate the collection
+            collection = Collection.get_by_identifier(selected_name)
+            if not collection:
+                messagebox.showerror("Error", "Collection not found.")
+                return
+
+            collection.update_status("Inactive")
+            collection.update_all_items_status("Inactive")
+            message=f"Collection '{selected_name}' and all its items have been deactivated."
+            messagebox.showinfo("Success", message)
+            log(message)
+            metrics.incr(metrics.COLLECTION_STATUS_CHANGES, get_logged_in_user())
+            self.load_collections()
+            if self.refresh_callback:
+                self.refresh_callback()
+
+        except Exception as e:
+            message=f"An error occurred: {e}"
+            messagebox.showerror("Database Error", message)
+            log(message)
+
+class ReactivateCollectionWindow(tk.Toplevel):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master)
+        self.title("Reactivate Collection")
+        self.geometry("320x180")
+        self.refresh_callback = refresh_callback
+
+        # Label
+        tk.Label(self, text="Select Collection to Reactivate:").pack(pady=(10, 5))
+
+        # Dropdown
+        self.collection_var = tk.StringVar()
+        self.collection_dropdown = ttk.Combobox(self, textvariable=self.collection_var, state="readonly")
+        self.collection_dropdown.pack()
+
+        # Buttons
+        tk.Button(self, text="Reactivate Collection", command=self.submit).pack(pady=10)
+        tk.Button(self, text="Cancel", command=self.destroy).pack()
+
+        self.load_collections()
+
+    def load_collections(self):
+        collections = cache.get_values("SELECT CollectionName FROM Collection WHERE Status = 'Inactive'")
+
+        if collections:
+            self.collection_dropdown['values'] = collections
+            self.collection_dropdown.set(collections[0])
+        else:
+            self.collection_dropdown['values'] = []
+            self.collection_dropdown.set("No active collections")
+            self.collection_dropdown.config(state="disabled")
+
+    def submit(self):
+        selected_name = self.collection_var.get().strip()
+        if not selected_name:
+            messagebox.showerror("Input Error", "Please select a collection.")
+            return
+
+        # Extra warning prompt
+        confirm = messagebox.askyesno(
+            "Confirm Reactivation",
+            f"Are you sure you want to reactivate the collection '{selected_name}'?\n\n"
+            "This will activate every item in this collection. Continue?"
+        )
+        if not confirm:
+            return
+
+        try:
+            # Get and deactivate the collection
+            collection = Collection.get_by_identifier(selected_name)
+            if not collection:
+                messagebox.showerror("Error", "Collection not found.")
+                return
+
+            collection.update_status("Active")
+            collection.update_all_items_status("Active")
+            message=f"Collection '{selected_name}' and all its items have been reactivated."
+            messagebox.showinfo("Success", message)
+            log(message)
+            metrics.incr(metrics.COLLECTION_STATUS_CHANGES, get_logged_in_user())
+            self.load_collections()
+            if self.refresh_callback:
+                self.refresh_callback()
+
+        except Exception as e:
+            message=f"An error occurred: {e}"
+            messagebox.showerror("Database Error", message)
+            log(message)
+
+class DeleteCollectionWindow(tk.Toplevel):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master)
+        self.title("Delete Collection")
+        self.refresh_callback = refresh_callback
+        self.geometry("300x150")
+        self.minsize(300, 150)
+
+        # Label
+        self.collection_label = tk.Label(self, text="Select Collection to Delete:")
+        self.collection_label.pack()
+
+        # Dropdown
+        self.collection_var = tk.StringVar()
+        self.collection_dropdown = ttk.Combobox(self, textvariable=self.collection_var, state="readonly")
+        self.collection_dropdown.pack()
+
+        # Buttons
+        self.submit_button = tk.Button(self, text="Delete Collection", command=self.submit)
+        self.submit_button.pack(pady=10)
+
+        self.cancel_button = tk.Button(self, text="Cancel", command=self.cancel)
+        self.cancel_button.pack()
+
+        self.load_collections()  # 🔁 Populate dropdown
+
+    def load_collections(self):
+        logged_in_user = get_logged_in_user()
+        query = "SELECT CollectionName FROM Collection WHERE User = ?"
+        collections = cache.get_values(query, (logged_in_user,))
+
+        if not collections:
+            self.collection_dropdown['values'] = []
+            self.collection_dropdown.set("No collections available")
+            self.collection_dropdown.config(state="disabled")
+        else:
+            self.collection_dropdown.config(state="readonly")
+            self.collection_dropdown['values'] = collections
+            self.collection_dropdown.set(collections[0])
+
+    def submit(self):
+        selected_collection = self.collection_var.get().strip()
+        if not selected_collection:
+            messagebox.showerror("Input Error", "Please select a collection to delete.")
+            return
+
+        confirm = messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete collection '{selected_collection}'?")
+        if not confirm:
+            return
+
+        try:
+            collection = Collection.get_by_identifier(selected_collection)
+            if collection:
+                collection.delete()
+                message=f"Collection '{selected_collection}' has been deleted."
+                messagebox.showinfo("Success", message)
+                log(message)
+                self.load_collections()  # 🔁 Refresh dropdown
+                if self.refresh_callback:
+                    self.refresh_callback()
+            else:
+                messagebox.showerror("Error", f"Collection '{selected_collection}' not found.")
+        except Exception as e:
+            message=f"An error occurred: {e}"
+            messagebox.showerror("Database Error", message)
+            log(message)
+
+    def cancel(self):
+        self.destroy()
+
+# TODO:EditCollectionWindow(FormWindow)
+
+
+
+
+
+
+
+
+# TODO:ReactivateItemWindow(FormWindow)
+
+
+### SOURCE ###
+
+# TODO: AddSourceWindow(FormWindow)
+
+class AddSourceWindow(FormWindow):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master, title="Add Source")
+        self.refresh_callback = refresh_callback
+
+        self.geometry("400x500")
+        self.minsize(400, 500)
+        self.maxsize(400, 500)
+
+        # Define field names and their labels
+        self.fields = {
+            "BusinessName": "Business Name",
+            "FirstName": "First Name",
+            "LastName": "Last Name",
+            "Email": "Email",
+            "Phone": "Phone",
+            "Address": "Address",
+            "City": "City",
+            "State": "State",
+            "Zip": "ZIP"
+        }
+
+        # Dictionary to store Entry widgets
+        self.entries = {}
+
+        # Create label + entry for each field using grid
+        for key, label in self.fields.items():
+            row = self.next_row()
+
+            lbl = tk.Label(self.form_frame, text=f"{label}:")
+            lbl.grid(row=row, column=0, sticky="w", pady=5, padx=5)
+
+            entry = tk.Entry(self.form_frame)
+            entry.grid(row=row, column=1, sticky="ew", pady=5, padx=5)
+
+            self.entries[key] = entry
+
+        # Submit and Cancel buttons
+        self.add_buttons(submit_text="Add Source", cancel_text="Cancel")
+
+        if self.refresh_callback:
+            self.refresh_callback()
+
+    def submit(self):
+        # Extract and strip data from entries
+        data = {key: entry.get().strip() for key, entry in self.entries.items()}
+
+        # Basic validation
+        if not data["BusinessName"]:
+            messagebox.showerror("Input Error", "Business Name cannot be empty.")
+            return
+
+        confirm_message = "Is this information correct?\n\n" + "\n".join(
+            f"{self.fields[key]}: {data.get(key) or 'N/A'}" for key in self.fields
+        )
+
+        if not messagebox.askyesno("Confirm Source Details", confirm_message):
+            return
+
+        try:
+            new_source = Source(**data)
+            new_source.save()
+            message = f"Source '{data['BusinessName']}' added successfully."
+            messagebox.showinfo("Success", message)
+
+            if self.refresh_callback:
+                self.refresh_callback()
+            self.destroy()
+        except Exception as e:
+            messagebox.showerror("Database Error", f"Failed to add source: {e}")
+
+    def cancel(self):
+        self.destroy()
+
+
+
+class UpdateSourceWindow(FormWindow):
+    def __init__(self, master=None, refresh_callback=None):
+        super().__init__(master, title="Update Source")
+        self.refresh_callback = refresh_callback
+        self.geometry("400x550")
+        self.minsize(400, 550)
+        self.maxsize(400, 550)
+
+        # Dropdown to select the source
+        self.source_dropdown, self.source_var = self.labeled_autocomplete(
+            "Select Source:", "Source", "BusinessName", id_column="SourceID"
+        )
+        self.source_dropdown.bind("<<ComboboxSelected>>", self.prefill_fields)
+
+        # Fields to update
+        self.fields = {
+            "BusinessName": "Business Name",
+            "FirstName": "First Name",
+            "LastName": "Last Name",
+            "Email": "Email",
+            "Phone": "Phone",
+            "Address": "Address",
+            "City": "City",
+            "State": "State",
+            "Zip": "ZIP"
+        }
+
+        self.entries = {}
+        for key, label in self.fields.items():
+            row = self.next_row()
+            tk.Label(self.form_frame, text=f"{label}:").grid(row=row, column=0, sticky="w", pady=5, padx=5)
+            entry = tk.Entry(self.form_frame)
+            entry.grid(row=row, column=1, sticky="ew", pady=5, padx=5)
+            self.entries[key] = entry
+
+        # Buttons
+        self.add_buttons(submit_text="Update Source", cancel_text="Cancel")
+
+    def prefill_fields(self, event=None):
+        identifier = self.source_var.get()
+        if not identifier:
+            return
+        source = Source.get_by_identifier("BusinessName", identifier)
+        if not source:
+            return
+
+        for key in self.fields:
+            self.entries[key].delete(0, tk.END)
+            self.entries[key].insert(0, getattr(source, key, ""))
+
+    def submit(self):
+        selected_source = self.source_var.get()
+        if not selected_source:
+            messagebox.showerror("Input Error", "Please select a source to update.")
+            return
+
+        data = {key: entry.get().strip() for key, entry in self.entries.items()}
+
+        if not data["BusinessName"]:
+            messagebox.showerror("Input Error", "Business Name cannot be empty.")
+            return
+
+        try:
+            updated_source = Source(**data)
+            updated_source.update("BusinessName", selected_source)
+            messagebox.showinfo("Success", f"Source '{selected_source}' updated successfully.")
+
+            if self.refresh_callback:
+                self.refresh_callback()
+            self.destroy()
+        except Exception as e:
+            messagebox.showerror("Database Error", f"Failed to update source: {e}")
+
+    def cancel(self):
+        self.destroy()
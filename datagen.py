@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+
+# Program:          synthetic data generator
+# Associated file:  datagen.py
+# Purpose:          This module seeds new databases with the same schema as collections.sqlite and a
+#                   realistic spread of users, collections, sources, items and log rows, so performance can
+#                   be measured at sizes nobody has typed in by hand:
+#
+#                       python -m collectionmanager generate bench-100k.sqlite --scale 100k
+#
+#                   The data is a pure function of the scale and the seed, so two runs produce identical
+#                   files and benchmark numbers from different commits stay comparable.
+
+import os
+import random
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+from db import ensure_indexes
+from valuation import ensure_value_history
+
+# preset item counts
+SCALES = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+# rows per executemany() call
+CHUNK_SIZE = 10_000
+
+# the tables as collections.sqlite has them (see the schema notes at the top of db.py)
+SCHEMA = """
+CREATE TABLE "Collection" (
+    "User" TEXT NOT NULL,
+    "CollectionName" TEXT NOT NULL,
+    "Status" TEXT NOT NULL
+);
+CREATE TABLE "Item" (
+    "ItemID" INTEGER NOT NULL,
+    "Collection" TEXT,
+    "User" TEXT,
+    "ItemName" TEXT NOT NULL UNIQUE,
+    "Source" TEXT,
+    "Status" TEXT,
+    "Description" TEXT,
+    "PricePaidCents" INTEGER,
+    "CurrentValueCents" INTEGER,
+    "Location" TEXT,
+    "Notes" TEXT,
+    "DateAdded" TEXT,
+    PRIMARY KEY("ItemID" AUTOINCREMENT)
+);
+CREATE TABLE "Source" (
+    "SourceID" INTEGER,
+    "BusinessName" TEXT,
+    "FirstName" TEXT,
+    "LastName" TEXT,
+    "Phone" TEXT,
+    "Address" TEXT,
+    "City" TEXT,
+    "State" TEXT,
+    "Zip" TEXT,
+    "Email" TEXT,
+    "Status" TEXT,
+    PRIMARY KEY("SourceID" AUTOINCREMENT)
+);
+CREATE TABLE "User" (
+    "UserID" INTEGER,
+    "Username" TEXT,
+    "Password" TEXT,
+    "Role" TEXT,
+    "Status" TEXT DEFAULT "Active",
+    PRIMARY KEY("UserID" AUTOINCREMENT)
+);
+CREATE TABLE "Log" (
+    "User" TEXT,
+    "Message" TEXT,
+    "Timestamp" TEXT
+);
+"""
+
+# word lists the names are built from
+KINDS = ("Coin", "Stamp", "Card", "Comic", "Record", "Watch", "Figure", "Poster", "Bottle", "Book",
+         "Pin", "Lego Set", "Camera", "Guitar Pedal", "Map", "Postcard", "Toy Car", "Badge")
+ADJECTIVES = ("Rare", "Vintage", "Mint", "Signed", "Limited", "First Edition", "Proof", "Antique",
+              "Graded", "Sealed", "Misprint", "Promo", "Original", "Restored", "Foreign", "Gold")
+THEMES = ("Coins", "Stamps", "Trading Cards", "Comics", "Vinyl", "Watches", "Action Figures",
+          "Posters", "Bottles", "Books", "Pins", "Lego", "Cameras", "Pedals", "Maps", "Postcards")
+LOCATIONS = ("Shelf A", "Shelf B", "Shelf C", "Safe", "Binder 1", "Binder 2", "Attic", "Basement",
+             "Display Case", "Storage Unit", "Office", "Garage")
+FIRST_NAMES = ("Ada", "Ben", "Cleo", "Dev", "Eli", "Fay", "Gus", "Hana", "Ivan", "Jo", "Kai", "Lena",
+               "Milo", "Nia", "Omar", "Pia", "Quinn", "Rosa", "Sam", "Tess", "Uma", "Vic", "Wes", "Yara")
+LAST_NAMES = ("Adams", "Baker", "Chen", "Diaz", "Evans", "Fox", "Garcia", "Hill", "Ito", "Jones",
+              "Khan", "Lopez", "Moore", "Nguyen", "Ortiz", "Patel", "Reed", "Smith", "Tran", "Wu")
+CITIES = (("Springfield", "IL"), ("Portland", "OR"), ("Austin", "TX"), ("Columbus", "OH"),
+          ("Denver", "CO"), ("Raleigh", "NC"), ("Madison", "WI"), ("Tucson", "AZ"))
+SHOP_WORDS = ("Antiques", "Collectibles", "Trading Post", "Auctions", "Curios", "Exchange", "Emporium",
+              "Finds", "Treasures", "Outlet")
+LOG_ACTIONS = ("Item '{}' has been added.", "Item '{}' has been updated.", "Item '{}' has been deactivated.",
+               "Item '{}' has been reactivated.")
+
+# the generated data spans this many days before GENERATED_UNTIL
+HISTORY_DAYS = 5 * 365
+GENERATED_UNTIL = datetime(2025, 1, 1)
+
+
+@dataclass
+class DatasetSpec:
+    """How much of everything to generate. Derived from the item count unless set explicitly."""
+    items: int
+    users: int
+    sources: int
+    collections_per_user: int
+    log_rows: int
+    value_points: int = 4       # average valuation history rows per item
+    inactive_share: float = 0.1
+    seed: int = 0
+
+    @classmethod
+    def for_items(cls, items, seed=0, **overrides):
+        """Proportions seen in real databases: a few thousand items per user, many log rows per item."""
+        spec = cls(
+            items=items,
+            users=max(2, items // 2_000),
+            sources=max(10, items // 200),
+            collections_per_user=8,
+            log_rows=items * 2,
+            seed=seed,
+        )
+        for name, value in overrides.items():
+            if value is not None:
+                setattr(spec, name, value)
+        return spec
+
+
+def chunks(rows, size=CHUNK_SIZE):
+    """Splits an iterator of rows into lists of at most size rows."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def timestamp(rng, seconds_back=None):
+    if seconds_back is None:
+        seconds_back = rng.randrange(HISTORY_DAYS * 86_400)
+    return (GENERATED_UNTIL - timedelta(seconds=seconds_back)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def user_rows(spec):
+    yield ("admin", "admin", "Admin", "Active")
+    for number in range(1, spec.users):
+        yield (f"user{number:05d}", "password", "User", "Active")
+
+
+def source_rows(spec, rng):
+    for number in range(spec.sources):
+        city, state = rng.choice(CITIES)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        name = f"{last} {rng.choice(SHOP_WORDS)} {number + 1}"
+        yield (
+            name, first, last, f"555-{rng.randrange(10_000):04d}", f"{rng.randrange(1, 9_999)} Main St",
+            city, state, f"{rng.randrange(10_000, 99_999)}", f"{first.lower()}.{last.lower()}{number}@example.com",
+            "Inactive" if rng.random() < spec.inactive_share else "Active",
+        )
+
+
+def collection_rows(spec, users):
+    for user in users:
+        for number in range(spec.collections_per_user):
+            yield (user, f"{user} {THEMES[number % len(THEMES)]} {number + 1}", "Active")
+
+
+def item_rows(spec, rng, collections, sources):
+    # collection sizes are skewed: a few big collections and a long tail of small ones
+    weights = [1 / (rank + 1) for rank in range(len(collections))]
+    picks = rng.choices(collections, weights=weights, k=spec.items)
+    for number, (user, collection) in enumerate(picks, start=1):
+        kind = rng.choice(KINDS)
+        adjective = rng.choice(ADJECTIVES)
+        price = round(rng.uniform(1, 500) * 100)   # cents
+        yield (
+            collection, user, f"{adjective} {kind} #{number}", rng.choice(sources),
+            "Inactive" if rng.random() < spec.inactive_share else "Active",
+            f"{adjective} {kind.lower()} in {rng.choice(('good', 'fine', 'very fine', 'mint'))} condition",
+            price, round(price * rng.uniform(0.5, 3.0)),
+            rng.choice(LOCATIONS), rng.choice(("", "", "", "gift", "needs appraisal", "duplicate")),
+            timestamp(rng),
+        )
+
+
+def log_rows(spec, rng, users, item_count):
+    # oldest first, like a real log; sorting plain ints keeps memory down at millions of rows
+    offsets = sorted((rng.randrange(HISTORY_DAYS * 86_400) for _ in range(spec.log_rows)), reverse=True)
+    for offset in offsets:
+        stamp = timestamp(rng, offset)
+        item = rng.randrange(1, item_count + 1) if item_count else 0
+        message = rng.choice(LOG_ACTIONS).format(f"{rng.choice(ADJECTIVES)} {rng.choice(KINDS)} #{item}")
+        yield (rng.choice(users), message, stamp)
+
+
+def value_rows(spec, rng, items):
+    # each item is valued at its price when added, drifts a few times and ends at its current value
+    until = int(GENERATED_UNTIL.timestamp())
+    for item_id, price, value, added in items:
+        start = int(datetime.strptime(added, '%Y-%m-%d %H:%M:%S').timestamp())
+        middle = rng.randint(0, 2 * (spec.value_points - 2))
+        epochs = sorted(rng.sample(range(start + 1, until), middle)) if until - start > middle + 1 else []
+        if start < until:
+            yield (item_id, start, price)
+        for step, epoch in enumerate(epochs, start=1):
+            target = price + (value - price) * step // (len(epochs) + 1)
+            yield (item_id, epoch, max(1, round(target * rng.uniform(0.8, 1.2))))
+        yield (item_id, until, value)
+
+
+def generate(path, spec, search_index=True, progress=None):
+    """Creates a new database at path filled according to spec; returns a summary dict.
+
+    progress(table, rows) is called after each chunk. An existing file is never overwritten.
+    """
+    if os.path.exists(path):
+        raise FileExistsError(f"'{path}' already exists; pick a new file name.")
+    rng = random.Random(spec.seed)
+    started = time.perf_counter()
+
+    conn = sqlite3.connect(path)
+    try:
+        # nothing to protect until the file is finished
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+
+        def insert(table, columns, rows):
+            sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+            count = 0
+            for chunk in chunks(rows):
+                with conn:
+                    conn.executemany(sql, chunk)
+                count += len(chunk)
+                if progress:
+                    progress(table, count)
+            return count
+
+        users = [row[0] for row in user_rows(spec)]
+        insert("User", ("Username", "Password", "Role", "Status"), user_rows(spec))
+        sources = list(source_rows(spec, rng))
+        insert("Source", ("BusinessName", "FirstName", "LastName", "Phone", "Address", "City", "State", "Zip",
+                          "Email", "Status"), sources)
+        sources = [row[0] for row in sources]
+        collections = [(row[0], row[1]) for row in collection_rows(spec, users)]
+        insert("Collection", ("User", "CollectionName", "Status"), collection_rows(spec, users))
+        insert("Item", ("Collection", "User", "ItemName", "Source", "Status", "Description",
+                        "PricePaidCents", "CurrentValueCents", "Location", "Notes", "DateAdded"),
+               item_rows(spec, rng, collections, sources))
+        insert("Log", ("User", "Message", "Timestamp"), log_rows(spec, rng, users, spec.items))
+        ensure_value_history(conn, seed=False)
+        items = conn.execute("SELECT ItemID, PricePaidCents, CurrentValueCents, DateAdded FROM Item ORDER BY ItemID")
+        insert("ItemValue", ("ItemID", "Epoch", "Cents"), value_rows(spec, rng, items))
+
+        ensure_indexes(conn)
+        if search_index:
+            from search import ensure_search_index
+            ensure_search_index(conn)
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA journal_mode = DELETE")  # what the app's own file uses
+    except BaseException:
+        conn.close()
+        os.remove(path)
+        raise
+    conn.close()
+
+    summary = asdict(spec)
+    summary.update(
+        collections=len(collections),
+        bytes=os.path.getsize(path),
+        seconds=round(time.perf_counter() - started, 2),
+    )
+    return summary
@@ -23,10 +23,11 @@
 # 	"ItemName"	TEXT NOT NULL UNIQUE,
 # 	"Source"	TEXT,
 # 	"Description"	TEXT,
-# 	"PricePaid"	NUMERIC,
-# 	"CurrentValue"	NUMERIC,
+# 	"PricePaidCents"	NUMERIC,          -- integer cents; was "PricePaid" (dollars) before migrate()
+# 	"CurrentValueCents"	NUMERIC,       -- integer cents; was "CurrentValue" (dollars)
 # 	"Location"	TEXT,
 # 	"Notes"	TEXT,
+# 	"DateAdded"	TEXT,                      -- added by migrate(); '%Y-%m-%d %H:%M:%S'
 # 	PRIMARY KEY("ItemID" AUTOINCREMENT),
 # 	FOREIGN KEY("Collection") REFERENCES "Collection"("CollectionName"),
 # 	FOREIGN KEY("Source") REFERENCES "Source"("BusinessName"),
@@ -57,9 +58,17 @@
 # 	PRIMARY KEY("UserID" AUTOINCREMENT)
 # )
 
-import os
+# CREATE TABLE "ItemValue" (               -- created by migrate(), filled by triggers on Item; see valuation.py
+# 	"ItemID"	INTEGER NOT NULL,
+# 	"Epoch"	INTEGER NOT NULL,
+# 	"Cents"	INTEGER,
+# 	PRIMARY KEY("ItemID", "Epoch")
+# ) WITHOUT ROWID
+
 import sqlite3
-from tkinter import messagebox
+import threading
+import time
+from contextlib import contextmanager
 
 # Global variables
 
@@ -84,7 +93,7 @@ DATABASE = "collections.sqlite"
 def connect():
     global conn
     if conn is None:
-        conn = sqlite3.connect(DATABASE)
+        conn = configure(sqlite3.connect(DATABASE))
         conn.row_factory = sqlite3.Row
         print("Connected to collections.sqlite")
     else:
@@ -92,7 +101,7 @@ def connect():
             conn.execute("SELECT 1")  # Ping to test if connection is still valid
         except sqlite3.ProgrammingError:
             print("[DEBUG] Connection was closed. Reconnecting...")
-            conn = sqlite3.connect(DATABASE)
+            conn = configure(sqlite3.connect(DATABASE))
             conn.row_factory = sqlite3.Row
             print("Reconnected to collections.sqlite")
 
@@ -115,6 +124,382 @@ def close_db():
         print("Disconnected from database")
         conn = None  # reset the global conn variable
 
+
+##### WRITE CONTENTION #####
+
+# Several app instances (or the app plus the CLI/API) can share one database file. SQLite allows one
+# writer at a time: a connection that finds the file locked waits up to busy_timeout, and a deferred
+# transaction that read first and then tries to write can fail at once with SQLITE_BUSY, because
+# waiting could deadlock. run_write() starts write transactions with BEGIN IMMEDIATE (take the write
+# lock up front, so the busy handler applies) and retries the whole transaction with jittered
+# exponential backoff if the lock still isn't free.
+
+BUSY_TIMEOUT_MS = 5000      # how long one statement waits for the lock
+RETRY_ATTEMPTS = 5          # tries per transaction before the error is raised
+RETRY_BASE_DELAY = 0.05     # seconds; doubles on each retry
+RETRY_MAX_DELAY = 2.0
+
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+# applies the connection settings every writer needs
+def configure(connection):
+    connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    return connection
+
+# True for the transient "database is locked" / "database table is locked" errors
+def is_busy(error):
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xff in (SQLITE_BUSY, SQLITE_LOCKED)  # includes extended codes
+    return "locked" in str(error) or "busy" in str(error)
+
+# "full jitter" backoff: a random wait up to the exponential step, so waiting writers spread out
+def backoff_delays(attempts=RETRY_ATTEMPTS, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    import random  # imported here, like queue below: `import db` is on every front end's startup path
+    for attempt in range(attempts - 1):
+        yield random.uniform(0, min(cap, base * 2 ** attempt))
+
+# calls operation(*args), retrying it while it fails with a busy error
+def retry_busy(operation, *args, attempts=RETRY_ATTEMPTS):
+    for delay in backoff_delays(attempts):
+        try:
+            return operation(*args)
+        except sqlite3.OperationalError as e:
+            if not is_busy(e):
+                raise
+            print(f"[DB] {e}; retrying in {delay * 1000:.0f} ms")
+            time.sleep(delay)
+    return operation(*args)
+
+# runs job(conn, *args) in one IMMEDIATE transaction on a fresh connection, retrying if the database
+# stays locked; returns job's result. job may run more than once, so it should only touch the database.
+def run_write(job, *args, database=None, attempts=RETRY_ATTEMPTS):
+    def attempt():
+        connection = configure(sqlite3.connect(database or DATABASE))
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            result = job(connection, *args)
+            connection.commit()
+            return result
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+    return retry_busy(attempt, attempts=attempts)
+
+
+##### CONNECTION POOL AND SINGLE WRITER (server / CLI mode) #####
+
+# jobs committed per writer transaction at most
+WRITE_BATCH_SIZE = 200
+
+# The GUI uses the one global connection above. Multi-threaded front ends (the HTTP API) share a
+# pool of read connections and send every write to one writer thread, so writes never contend
+# with each other for SQLite's lock.
+
+class ConnectionPool:
+    """Fixed-size pool of connections that may be used from any thread (one thread at a time)."""
+
+    def __init__(self, database=None, size=4):
+        import queue
+        self.database = database or DATABASE
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        conn = configure(sqlite3.connect(self.database, check_same_thread=False))
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrows a connection, blocking while all of them are in use."""
+        import queue
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            conn = self._open() if create else self._idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self):
+        import queue
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+
+class SingleWriter:
+    """Runs write jobs on a dedicated thread that owns the only writing connection.
+
+    submit(job, *args) calls job(conn, *args) and returns a Future for its result. Jobs that queue up
+    while a transaction is running are committed together (up to batch_size per transaction), each
+    inside its own savepoint, so a job that raises is rolled back without failing the others. Jobs
+    must not commit; ones that manage their own transaction (migrations) go through submit_alone().
+    """
+
+    def __init__(self, database=None, batch_size=WRITE_BATCH_SIZE):
+        import queue
+        self.database = database or DATABASE
+        self.batch_size = batch_size
+        self.batches = 0      # transactions committed
+        self.jobs_done = 0    # jobs completed in them
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, job, *args):
+        return self._put(job, args, True)
+
+    def submit_alone(self, job, *args):
+        """Runs job in a transaction of its own; it may commit or use "with conn:" itself."""
+        return self._put(job, args, False)
+
+    def _put(self, job, args, batchable):
+        # imported here: concurrent.futures pulls in logging, which the GUI's startup path doesn't need
+        from concurrent.futures import Future
+        future = Future()
+        self._jobs.put((future, job, args, batchable))
+        return future
+
+    def _run(self):
+        import queue
+        conn = configure(sqlite3.connect(self.database))
+        conn.row_factory = sqlite3.Row
+        held = None  # a job taken off the queue that couldn't join the last batch
+        while True:
+            item = held if held is not None else self._jobs.get()
+            held = None
+            if item is None:
+                break
+            batch = [item]
+            while item[3] and len(batch) < self.batch_size:
+                try:
+                    item = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None or not item[3]:
+                    held = item
+                    break
+                batch.append(item)
+            jobs = [(future, job, args) for future, job, args, _ in batch if future.set_running_or_notify_cancel()]
+            if batch[0][3]:
+                self._run_batch(conn, jobs)
+            else:
+                self._run_alone(conn, jobs)
+        conn.close()
+
+    def _run_alone(self, conn, jobs):
+        for future, job, args in jobs:
+            def attempt():
+                with conn:
+                    return job(conn, *args)
+            try:
+                future.set_result(retry_busy(attempt))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _run_batch(self, conn, jobs):
+        def attempt():
+            outcomes = []
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for future, job, args in jobs:
+                    conn.execute("SAVEPOINT job")
+                    try:
+                        outcomes.append((future, job(conn, *args), None))
+                    except Exception as e:
+                        if is_busy(e):
+                            raise  # retry the whole batch
+                        conn.execute("ROLLBACK TO job")
+                        outcomes.append((future, None, e))
+                    conn.execute("RELEASE job")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            return outcomes
+
+        try:
+            outcomes = retry_busy(attempt)
+        except Exception as e:
+            for future, _, _ in jobs:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.jobs_done += len(outcomes)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def close(self):
+        self._jobs.put(None)
+        self._thread.join()
+
+
+# one pool and one writer per database file
+_pools = {}
+_writers = {}
+
+def get_pool(database=None, size=4):
+    database = database or DATABASE
+    if database not in _pools:
+        _pools[database] = ConnectionPool(database, size)
+    return _pools[database]
+
+def get_writer(database=None):
+    database = database or DATABASE
+    if database not in _writers:
+        _writers[database] = SingleWriter(database)
+    return _writers[database]
+
+# Indexes backing the sortable grid columns and the My Items filter. Text columns use NOCASE so
+# they match the ORDER BY ... COLLATE NOCASE generated by paging.QueryPageSource.
+INDEXES = {
+    "idx_item_collection_status": "Item (Collection, Status)",
+    "idx_item_collection_source": "Item (Collection, Source)",
+    "idx_item_collection_location": "Item (Collection, Location)",
+    "idx_item_dateadded": "Item (DateAdded)",
+    "idx_item_user": "Item (User)",
+    "idx_item_itemname": "Item (ItemName COLLATE NOCASE)",
+    "idx_item_source": "Item (Source COLLATE NOCASE)",
+    "idx_item_location": "Item (Location COLLATE NOCASE)",
+    "idx_item_pricepaid": "Item (PricePaidCents)",
+    "idx_item_currentvalue": "Item (CurrentValueCents)",
+    "idx_collection_user": "Collection (User)",
+    "idx_collection_name": "Collection (CollectionName COLLATE NOCASE)",
+    "idx_source_businessname": "Source (BusinessName COLLATE NOCASE)",
+    "idx_user_username": "User (Username COLLATE NOCASE)",
+    "idx_log_timestamp": "Log (Timestamp)",
+    "idx_log_user": "Log (User COLLATE NOCASE)",
+}
+
+# columns added after the original schema: table -> {column: type}
+ADDED_COLUMNS = {
+    "Item": {"DateAdded": "TEXT"},
+}
+
+# money columns that were converted from dollars (REAL/NUMERIC) to integer cents:
+# table -> {old column: new column}. The rename marks the conversion as done.
+CENTS_COLUMNS = {
+    "Item": {"PricePaid": "PricePaidCents", "CurrentValue": "CurrentValueCents"},
+}
+
+# adds any missing ADDED_COLUMNS to an existing database and converts money to cents
+def migrate(conn=None):
+    conn = conn or connect()
+    with conn:
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for column, column_type in columns.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+    migrate_cents(conn)
+    from valuation import ensure_value_history
+    ensure_value_history(conn)  # its triggers watch CurrentValueCents
+
+# lists what migrate() would change, without changing anything; empty when the schema is current
+def pending_migrations(conn=None):
+    conn = conn or connect()
+    pending = []
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        pending += [f"add {table}.{column}" for column in columns if column not in existing]
+    for table, columns in CENTS_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        pending += [f"convert {table}.{old} to cents" for old in columns if old in existing]
+    from valuation import value_history_missing
+    if value_history_missing(conn):
+        pending.append("create the ItemValue history table")
+    return pending
+
+def migrate_cents(conn):
+    """Renames each dollar column in CENTS_COLUMNS and converts its values to integer cents.
+
+    Rename and conversion happen in one IMMEDIATE transaction, so a database is either fully
+    converted or untouched even if two processes start at once. Indexes and triggers follow the rename.
+    Text that is not an amount becomes NULL and is kept in the row's Notes; the conversion and every
+    such row are recorded in the Log table once the transaction has committed.
+    """
+    from money import to_cents
+
+    pending = {
+        table: columns for table, columns in CENTS_COLUMNS.items()
+        if set(columns) & {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    }
+    if not pending:
+        return
+    messages = []
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for table, columns in pending.items():
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for old, new in columns.items():
+                if old not in existing or new in existing:
+                    continue  # another process got here first
+                conn.execute(f"ALTER TABLE {table} RENAME COLUMN {old} TO {new}")
+                conn.execute(f"UPDATE {table} SET {new} = CAST(ROUND({new} * 100) AS INTEGER) "
+                             f"WHERE typeof({new}) IN ('integer', 'real')")
+                conn.execute(f"UPDATE {table} SET {new} = NULL WHERE trim({new}) = ''")
+                # text the NUMERIC affinity could not convert, e.g. '$12.50'
+                for rowid, text in conn.execute(f"SELECT rowid, {new} FROM {table} WHERE typeof({new}) = 'text'").fetchall():
+                    try:
+                        conn.execute(f"UPDATE {table} SET {new} = ? WHERE rowid = ?", (to_cents(text), rowid))
+                        continue
+                    except ValueError:
+                        pass
+                    # not an amount: a text value can't stay in an integer-cents column
+                    conn.execute(f"UPDATE {table} SET {new} = NULL WHERE rowid = ?", (rowid,))
+                    if "Notes" in existing:
+                        note = f"{old} before the cents migration: '{text}'"
+                        conn.execute(f"UPDATE {table} SET Notes = CASE WHEN COALESCE(Notes, '') = '' THEN ? "
+                                     f"ELSE Notes || char(10) || ? END WHERE rowid = ?", (note, note, rowid))
+                    messages.append(f"Cents migration: {table}.{old} of row {rowid} was '{text}', "
+                                    f"not an amount; set to NULL")
+                messages.append(f"Cents migration: converted {table}.{old} to integer cents ({new})")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+    # logged after the commit: log() writes through its own connection
+    from log import log
+    database = conn.execute("PRAGMA database_list").fetchone()[2]
+    has_log = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Log'").fetchone()
+    for message in messages:
+        if has_log and database:  # an in-memory database has no file for log() to open
+            log(message, database=database)
+        else:
+            print(f"[DEBUG] {message}")
+
+def ensure_indexes(conn=None):
+    conn = conn or connect()
+    migrate(conn)  # some indexes cover migrated columns
+    with conn:
+        for name, definition in INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+    return list(INDEXES)
+
+
 # validate a username and password input; returns a boolean value
 
 # Login database connection function
@@ -181,9 +566,20 @@ def logout():
 
 # LOGGED IN USER UTILITIES
 
-# return a boolean for whether or not logged in user has an Admin role
-def is_admin() -> bool:
-    return logged_in_user == "admin"
+# return a boolean for whether or not a user (the logged in user by default) is the admin account;
+# the CLI and the API server use this too, so every front end agrees on who is an admin
+def is_admin(username=None) -> bool:
+    return (username if username is not None else logged_in_user) == "admin"
+
+# returns a (condition, params) pair limiting rows to the logged-in user's own unless they are admin;
+# condition is "" when no filtering applies. user/admin can be passed explicitly from worker threads.
+def ownership_filter(columns, user=None, admin=None, alias=None):
+    if admin is None:
+        admin = is_admin()
+    if admin or "User" not in columns:
+        return "", ()
+    column = f"{alias}.User" if alias else "User"
+    return f"{column} = ?", (user if user is not None else get_logged_in_user(),)
 
 # check whether a user is active
 def get_user_status(username):
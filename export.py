@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+# Program:          export module
+# Associated file:  export.py
+# Purpose:          This module streams query results to CSV or JSON Lines files. Rows are read from the
+#                   cursor with fetchmany() and written batch by batch, so memory use stays flat no matter
+#                   how many rows are exported. Exports run on a worker thread with progress callbacks and
+#                   can be cancelled; a cancelled or failed export leaves no partial file behind.
+
+import csv
+import os
+import sqlite3
+import threading
+
+from paging import quote_identifier
+
+DATABASE = "collections.sqlite"
+
+# rows fetched from the cursor and written per batch
+BATCH_SIZE = 5000
+
+# file extension -> format name
+FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+}
+
+
+class ExportCancelled(Exception):
+    """Raised by export_query when the cancel event is set mid-export."""
+
+
+def format_for(path):
+    """Picks the export format from a file name's extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported export format '{extension}'. Use one of: {', '.join(FORMATS)}.")
+    return FORMATS[extension]
+
+
+def count_rows(conn, query, params=()):
+    return conn.execute(f"SELECT COUNT(*) FROM ({query})", tuple(params)).fetchone()[0]
+
+
+def json_query(conn, query, params=()):
+    """Wraps query so each row comes back as one JSON object string keyed by column name."""
+    cursor = conn.execute(f"SELECT * FROM ({query}) LIMIT 0", tuple(params))
+    pairs = ", ".join(
+        "'{0}', {1}".format(column.replace("'", "''"), quote_identifier(column))
+        for column in (description[0] for description in cursor.description)
+    )
+    return f"SELECT json_object({pairs}) FROM ({query})"
+
+
+def export_query(query, params, path, fmt=None, progress=None, cancelled=None, conn=None,
+                 database=None, batch_size=BATCH_SIZE):
+    """Writes every row of query to path and returns the number of rows written.
+
+    progress(written, total) is called after each batch; cancelled is a threading.Event checked between
+    batches. The file is written under a temporary name and only renamed into place once complete.
+    """
+    fmt = fmt or format_for(path)
+    if fmt not in FORMATS.values():
+        raise ValueError(f"Unsupported export format '{fmt}'.")
+
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(database or DATABASE)
+    partial = path + ".part"
+    try:
+        query = query.strip().rstrip(";")
+        total = count_rows(conn, query, params) if progress else None
+        if fmt == "jsonl":
+            # let SQLite build each JSON object; far faster than json.dumps per row
+            query = json_query(conn, query, params)
+        cursor = conn.execute(query, tuple(params))
+        written = 0
+
+        with open(partial, "w", newline="", encoding="utf-8") as file:
+            if fmt == "csv":
+                writer = csv.writer(file)
+                writer.writerow(description[0] for description in cursor.description)
+                write_batch = writer.writerows
+            else:
+                def write_batch(rows):
+                    file.write("\n".join(row[0] for row in rows) + "\n")
+
+            while True:
+                if cancelled is not None and cancelled.is_set():
+                    raise ExportCancelled()
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                write_batch(rows)
+                written += len(rows)
+                if progress:
+                    progress(written, total)
+
+        os.replace(partial, path)
+        return written
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def export_items(item_filter, path, **options):
+    """Exports the items matching an item_filters.ItemFilter (money as exact decimal text)."""
+    from item_filters import item_export_query
+    query, params = item_export_query(item_filter)
+    return export_query(query, params, path, **options)
+
+
+class ExportJob:
+    """Runs one export on a background thread with its own connection."""
+
+    def __init__(self, query, params, path, fmt=None, database=None):
+        self.query = query
+        self.params = tuple(params or ())
+        self.path = path
+        self.fmt = fmt or format_for(path)
+        self.database = database or DATABASE
+        self.cancelled = threading.Event()
+        self.thread = None
+
+    def start(self, on_progress=None, on_done=None):
+        """Starts the export. on_progress(written, total) and on_done(written, error) are called from
+        the worker thread; error is None on success, an ExportCancelled after cancel() and otherwise
+        the exception that stopped the export."""
+        self.thread = threading.Thread(target=self._run, args=(on_progress, on_done), daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _run(self, on_progress, on_done):
+        written, error = 0, None
+        try:
+            written = export_query(
+                self.query, self.params, self.path, self.fmt,
+                progress=on_progress, cancelled=self.cancelled, database=self.database,
+            )
+        except Exception as e:  # anything, so the window waiting on on_done is never left open
+            error = e
+            if not isinstance(e, ExportCancelled):
+                print(f"[Export Error] {e}")
+        finally:
+            if on_done:
+                on_done(written, error)
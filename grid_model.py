@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+
+# Program:          grid view-model module
+# Associated file:  grid_model.py
+# Purpose:          The display-independent half of the data grids in main_window.py. A GridViewModel owns
+#                   the page source (query, filter and sort), the scroll window and the selection, and
+#                   works out which rows have to be inserted, updated, moved or deleted to bring the grid
+#                   up to date. It never touches Tk: VirtualTreeview just applies the RowWindow it gets
+#                   back, so the grid's hot paths can be timed and checked without a display
+#                   (see the grid.* entries in benchmarks.py).
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from db import ownership_filter
+from money import format_money, format_signed
+from paging import QueryPageSource, column_affinities
+
+
+def filtered_query(table, columns, user=None, admin=None):
+    """Returns a (query, params) SELECT of columns, limited to the user's own rows unless admin."""
+    condition, params = ownership_filter(columns, user, admin)
+    query = f"SELECT {', '.join(columns)} FROM {table}"
+    if condition:
+        query += f" WHERE {condition}"
+    return query, params
+
+
+def toggle_sort(order_by, column, extend=False):
+    """The sort order after a heading click.
+
+    A plain click sorts by that column alone (toggling direction if it is already the primary key);
+    with extend=True (shift-click) the column is added to, or toggled within, the sort keys.
+    """
+    order_by = list(order_by)
+    if extend:
+        if column in dict(order_by):
+            return [(c, not d if c == column else d) for c, d in order_by]
+        return order_by + [(column, False)]
+    reverse = bool(order_by) and order_by[0] == (column, False)
+    return [(column, reverse)]
+
+
+def heading_labels(columns, order_by, titles=None):
+    """Heading text per column: ↑ or ↓ on sorted columns, plus the key position for multi-column sorts.
+
+    titles maps a column to the text shown for it (e.g. PricePaidCents -> PricePaid).
+    """
+    positions = {column: (index, reverse) for index, (column, reverse) in enumerate(order_by, start=1)}
+    titles = titles or {}
+    labels = {}
+    for column in columns:
+        text = titles.get(column, column)
+        if column in positions:
+            index, reverse = positions[column]
+            text = f"{text} {'↓' if reverse else '↑'}{index if len(order_by) > 1 else ''}"
+        labels[column] = text
+    return labels
+
+
+def items_footer(totals):
+    """Footer line for an item_filters.ItemTotals (amounts in cents)."""
+    if not totals.count:
+        return "No items match the current filter."
+
+    money = format_money
+    return (
+        f"Items: {totals.count:,}    "
+        f"Price Paid: {money(totals.price_total)} ({money(totals.price_min)} - {money(totals.price_max)})    "
+        f"Current Value: {money(totals.value_total)} ({money(totals.value_min)} - {money(totals.value_max)})    "
+        f"Gain/Loss: {format_signed(totals.gain)}"
+    )
+
+
+@dataclass
+class RowWindow:
+    """The changes that bring a grid from what it shows to the current window of rows.
+
+    Apply in order: delete, reorder the survivors, insert at their positions, update values, then set
+    the selection (None means leave it alone) and the scrollbar.
+    """
+    first: int = 0
+    total: int = 0
+    deleted: List[str] = field(default_factory=list)
+    order: Optional[List[str]] = None       # surviving iids in their new order, when they moved
+    inserted: List[Tuple[int, str, tuple]] = field(default_factory=list)   # (position, iid, values)
+    updated: List[Tuple[str, tuple]] = field(default_factory=list)         # (iid, values)
+    selection: Optional[tuple] = None
+    scroll: Tuple[float, float] = (0, 1)
+
+    @property
+    def changes(self):
+        """Number of row operations; 0 means the grid was already current."""
+        return len(self.deleted) + len(self.order or ()) + len(self.inserted) + len(self.updated)
+
+
+class GridViewModel:
+    """Headless state of one virtual grid.
+
+    When key_columns are given each row's iid is its identity (e.g. ItemID), so a reload only
+    inserts, updates, moves or deletes the rows that actually changed. formatters ({column: function})
+    turn stored values into display text, e.g. integer cents into "$12.50"; sorting still uses the
+    stored values.
+    """
+
+    def __init__(self, columns, key_columns=(), overscan=100, visible_rows=20, formatters=None):
+        self.columns = tuple(columns)
+        self.key_columns = tuple(key_columns)
+        self.key_indexes = [self.columns.index(column) for column in key_columns]
+        self.formatters = [(self.columns.index(column), formatter) for column, formatter in (formatters or {}).items()]
+        self.source = None
+        self.first = 0               # index of the first visible row in the result set
+        self.visible_rows = visible_rows
+        self.overscan = overscan     # rows prefetched above/below the window
+        self.selected_index = None   # absolute index of the selected row
+        self.selected_iid = None     # identity of the selected row
+        self.shown = []              # iids the grid currently shows, in order
+        self.row_values = {}         # iid -> values currently shown, so unchanged rows are skipped
+
+    ##### DATA #####
+
+    def set_source(self, source, keep_position=False):
+        """Swaps in a new page source; scrolls back to the top unless keep_position is set."""
+        if self.source is not None and self.source is not source:
+            if keep_position and self.source.order_by:
+                source.set_order(self.source.order_by)
+            self.source.close()
+        self.source = source
+        if not keep_position:
+            self.first = 0
+            self.selected_index = None
+            self.selected_iid = None
+        return self.render()
+
+    def set_query(self, query, params=(), table=None):
+        """Points the grid at a query, keeping the current sort order."""
+        column_types = column_affinities(table) if table else {}
+        source = QueryPageSource(query, params, column_types=column_types, key_columns=self.key_columns)
+        order_by = self.sort_order()
+        if order_by:
+            source.set_order(order_by)
+        return self.set_source(source)
+
+    def set_filter(self, item_filter):
+        """Points the grid at the items matching an item_filters.ItemFilter (cached per filter)."""
+        import item_filters
+        source = item_filters.page_source_for(item_filter)
+        order_by = self.sort_order()
+        if order_by:
+            source.set_order(order_by)
+        return self.set_source(source)
+
+    def reload(self):
+        """Re-reads the current source, keeping the scroll position and selection."""
+        if self.source is None:
+            return None
+        self.source.invalidate()
+        return self.render()
+
+    def sort_by(self, order_by):
+        """Sorts by a list of (column, descending) pairs; unknown columns raise ValueError."""
+        if self.source is None:
+            return None
+        self.source.set_order(order_by)
+        self.first = 0
+        return self.render()
+
+    def sort_order(self):
+        return list(self.source.order_by) if self.source is not None else []
+
+    def row_count(self):
+        return self.source.count() if self.source is not None else 0
+
+    ##### WINDOW #####
+
+    def row_iids(self, rows):
+        """Builds a stable iid per row from its key columns (slot numbers when there is no key)."""
+        if not self.key_indexes:
+            return [f"slot{slot}" for slot in range(len(rows))]
+
+        iids = []
+        seen = {}
+        for row in rows:
+            iid = "|".join(str(row[index]) for index in self.key_indexes)
+            # keys such as BusinessName are not declared UNIQUE, so disambiguate repeats
+            seen[iid] = seen.get(iid, 0) + 1
+            iids.append(iid if seen[iid] == 1 else f"{iid}#{seen[iid]}")
+        return iids
+
+    def display_row(self, row):
+        row = list(row)
+        for index, formatter in self.formatters:
+            row[index] = formatter(row[index])
+        return tuple(row)
+
+    def render(self):
+        """Diffs the current window against what is shown and returns the RowWindow to apply."""
+        total = self.row_count()
+        self.first = max(0, min(self.first, total - self.visible_rows))
+
+        rows = []
+        if self.source is not None:
+            # read the overscan window so the page cache is warm for the next scroll
+            start = max(0, self.first - self.overscan)
+            window = self.source.rows(start, self.first + self.visible_rows + self.overscan)
+            rows = window[self.first - start:self.first - start + self.visible_rows]
+
+        iids = self.row_iids(rows)
+        if self.formatters:
+            rows = [self.display_row(row) for row in rows]
+        wanted = set(iids)
+        result = RowWindow(first=self.first, total=total)
+
+        # deletes
+        result.deleted = [iid for iid in self.shown if iid not in wanted]
+        for iid in result.deleted:
+            self.row_values.pop(iid, None)
+
+        # moves: only needed when the surviving rows changed relative order (e.g. after a re-sort)
+        surviving = [iid for iid in iids if iid in self.row_values]
+        if [iid for iid in self.shown if iid in wanted] != surviving:
+            result.order = surviving
+
+        # inserts and updates
+        for position, (iid, row) in enumerate(zip(iids, rows)):
+            current = self.row_values.get(iid)
+            if current is None:
+                result.inserted.append((position, iid, row))
+            elif current != row:
+                result.updated.append((iid, row))
+            self.row_values[iid] = row
+        self.shown = iids
+
+        # keep the selection on the same row, following it if it moved within the window
+        if self.selected_iid in wanted:
+            self.selected_index = self.first + iids.index(self.selected_iid)
+            result.selection = (self.selected_iid,)
+        elif self.selected_index is not None and 0 <= self.selected_index - self.first < len(rows) and not self.key_indexes:
+            result.selection = (iids[self.selected_index - self.first],)
+        else:
+            result.selection = ()
+
+        if total:
+            result.scroll = (self.first / total, (self.first + len(rows)) / total)
+        return result
+
+    def scroll_to(self, first):
+        """Moves the window; returns None when it was already there."""
+        first = max(0, min(first, self.row_count() - self.visible_rows))
+        if first == self.first:
+            return None
+        self.first = first
+        return self.render()
+
+    def scroll_fraction(self, fraction):
+        return self.scroll_to(int(float(fraction) * self.row_count()))
+
+    def resize(self, visible_rows):
+        """Sets how many rows fit on screen; returns None when unchanged."""
+        visible_rows = max(1, visible_rows)
+        if visible_rows == self.visible_rows:
+            return None
+        self.visible_rows = visible_rows
+        return self.render()
+
+    ##### SELECTION #####
+
+    def select(self, iid):
+        """Records a selection made in the grid."""
+        if iid in self.shown:
+            self.selected_iid = iid
+            self.selected_index = self.first + self.shown.index(iid)
+
+    def move_selection(self, step):
+        """Keyboard navigation that scrolls the window when the selection leaves it."""
+        total = self.row_count()
+        if not total:
+            return None
+        current = self.first if self.selected_index is None else self.selected_index
+        self.selected_index = max(0, min(total - 1, current + step))
+        if self.selected_index < self.first:
+            self.first = self.selected_index
+        elif self.selected_index >= self.first + self.visible_rows:
+            self.first = self.selected_index - self.visible_rows + 1
+
+        # select by identity once the target row is inside the window
+        self.selected_iid = None
+        result = self.render()
+        slot = self.selected_index - self.first
+        if 0 <= slot < len(self.shown):
+            self.selected_iid = self.shown[slot]
+            result.selection = (self.selected_iid,)
+        return result
+
+    def close(self):
+        if self.source is not None:
+            self.source.close()
+            self.source = None
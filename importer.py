@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+
+# Program:          importer module
+# Associated file:  importer.py
+# Purpose:          This module bulk-loads Items and Sources from CSV files. Rows are streamed from the
+#                   file, validated with the same rules as the entry forms, resolved against in-memory
+#                   lookups of existing collections and sources, checked for duplicate names up front and
+#                   inserted in chunked executemany() transactions. A bad row is reported with its line
+#                   number and skipped; it never aborts the rest of the import.
+
+import csv
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List
+
+from db import migrate
+from models import ChangeEvent, INSERT, publish
+from money import to_cents
+
+DATABASE = "collections.sqlite"
+
+# rows inserted per transaction
+CHUNK_SIZE = 1000
+
+# CSV header -> (column, required). Headers are matched case-insensitively.
+ITEM_FIELDS = {
+    "itemname": ("ItemName", True),
+    "collection": ("Collection", True),
+    "source": ("Source", False),
+    "status": ("Status", False),
+    "description": ("Description", False),
+    "pricepaid": ("PricePaidCents", False),         # dollars in the file, integer cents in the table
+    "currentvalue": ("CurrentValueCents", False),
+    "location": ("Location", False),
+    "notes": ("Notes", False),
+    "user": ("User", False),  # only honoured for admins
+}
+
+SOURCE_FIELDS = {
+    "businessname": ("BusinessName", True),
+    "firstname": ("FirstName", False),
+    "lastname": ("LastName", False),
+    "phone": ("Phone", False),
+    "address": ("Address", False),
+    "city": ("City", False),
+    "state": ("State", False),
+    "zip": ("Zip", False),
+    "email": ("Email", False),
+    "status": ("Status", False),
+}
+
+MONEY_FIELDS = {"PricePaidCents": "Price Paid", "CurrentValueCents": "Current Value"}
+STATUSES = ("Active", "Inactive")
+
+
+@dataclass
+class RowError:
+    line: int       # line number in the CSV file (the header is line 1)
+    name: str       # ItemName / BusinessName of the row, if it had one
+    message: str
+
+
+@dataclass
+class ImportResult:
+    inserted: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+    @property
+    def skipped(self):
+        return len(self.errors)
+
+    def summary(self):
+        return f"{self.inserted} rows imported, {self.skipped} skipped."
+
+
+def read_rows(path, fields):
+    """Yields (line number, {column: value}) for each CSV row, mapping headers through fields."""
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = [fields.get(name.strip().lower(), (None, False))[0] for name in header]
+        missing = [column for column, required in fields.values() if required and column not in columns]
+        if missing:
+            raise ValueError(f"The CSV file is missing required column(s): {', '.join(missing)}.")
+
+        for row in reader:
+            if not any(value.strip() for value in row):
+                continue  # blank line
+            values = {column: value.strip() for column, value in zip(columns, row) if column}
+            yield reader.line_num, values
+
+
+def validate_row(values, fields):
+    """Checks required values, amounts and status; returns the cleaned row (raises ValueError)."""
+    for column, required in fields.values():
+        if required and not values.get(column):
+            raise ValueError(f"{column} cannot be empty.")
+    for column, label in MONEY_FIELDS.items():
+        if column in values:
+            # blank stays NULL, so an exported file imports back unchanged
+            values[column] = to_cents(values[column], label)
+    status = values.get("Status") or "Active"
+    if status.capitalize() not in STATUSES:
+        raise ValueError(f"Status must be one of: {', '.join(STATUSES)}.")
+    values["Status"] = status.capitalize()
+    return values
+
+
+def existing_names(conn, table, column, names):
+    """Returns which of names already exist in table.column (one indexed IN query per call)."""
+    names = list(names)
+    found = set()
+    # stay under SQLite's bound-parameter limit
+    for start in range(0, len(names), 500):
+        batch = names[start:start + 500]
+        placeholders = ", ".join("?" for _ in batch)
+        query = f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})"
+        found.update(row[0] for row in conn.execute(query, batch))
+    return found
+
+
+def insert_chunk(conn, table, columns, chunk, result):
+    """Inserts [(line, name, values), ...] in one transaction; on a constraint failure the chunk is
+    retried row by row so only the offending rows are reported."""
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    try:
+        with conn:
+            conn.executemany(sql, [[values.get(column) for column in columns] for _, _, values in chunk])
+        result.inserted += len(chunk)
+    except sqlite3.IntegrityError:
+        for line, name, values in chunk:
+            try:
+                with conn:
+                    conn.execute(sql, [values.get(column) for column in columns])
+                result.inserted += 1
+            except sqlite3.IntegrityError as e:
+                result.errors.append(RowError(line, name, str(e)))
+
+
+def run_import(path, table, fields, name_column, resolve, database=None, chunk_size=CHUNK_SIZE,
+               progress=None, cancelled=None):
+    """Shared pipeline: stream, validate, resolve, dedupe, insert in chunks.
+
+    resolve(values) fills in or checks foreign keys and raises ValueError for rows it rejects.
+    """
+    result = ImportResult()
+    columns = [column for column, _ in fields.values()]
+    if table == "Item":
+        columns.append("DateAdded")
+    added = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    conn = sqlite3.connect(database or DATABASE)
+    migrate(conn)  # Item.DateAdded
+    try:
+        seen = set()     # names earlier in this file
+        chunk = []
+
+        def flush():
+            # names that already exist in the table are conflicts, reported before inserting
+            taken = existing_names(conn, table, name_column, (name for _, name, _ in chunk))
+            rows = []
+            for line, name, values in chunk:
+                if name in taken:
+                    result.errors.append(RowError(line, name, f"{name_column} '{name}' already exists."))
+                else:
+                    rows.append((line, name, values))
+            if rows:
+                insert_chunk(conn, table, columns, rows, result)
+            chunk.clear()
+            if progress:
+                progress(result.inserted, result.skipped)
+
+        for line, values in read_rows(path, fields):
+            if cancelled is not None and cancelled.is_set():
+                break
+            name = values.get(name_column, "")
+            try:
+                values = resolve(validate_row(values, fields))
+                if name in seen:
+                    raise ValueError(f"{name_column} '{name}' appears more than once in the file.")
+            except ValueError as e:
+                result.errors.append(RowError(line, name, str(e)))
+                continue
+            seen.add(name)
+            if table == "Item":
+                values["DateAdded"] = added
+            chunk.append((line, name, values))
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+    finally:
+        conn.close()
+
+    result.errors.sort(key=lambda error: error.line)
+    return result
+
+
+def import_items(path, user, admin=False, database=None, notify=True, **options):
+    """Imports Items from CSV for user. Collections and sources must already exist; non-admins can only
+    import into their own collections. Returns an ImportResult."""
+    conn = sqlite3.connect(database or DATABASE)
+    # in-memory lookups; names resolve case-insensitively to the stored spelling
+    collections = {}
+    for name, owner in conn.execute("SELECT CollectionName, User FROM Collection"):
+        collections.setdefault(name.lower(), (name, owner))
+    sources = {name.lower(): name for (name,) in conn.execute("SELECT BusinessName FROM Source") if name}
+    conn.close()
+
+    def resolve(values):
+        match = collections.get(values["Collection"].lower())
+        if match is None:
+            raise ValueError(f"Collection '{values['Collection']}' does not exist.")
+        values["Collection"], owner = match
+        if not admin and owner != user:
+            raise ValueError(f"Collection '{values['Collection']}' belongs to another user.")
+        if not admin or not values.get("User"):
+            values["User"] = owner if admin else user
+
+        if values.get("Source"):
+            source = sources.get(values["Source"].lower())
+            if source is None:
+                raise ValueError(f"Source '{values['Source']}' does not exist.")
+            values["Source"] = source
+        return values
+
+    result = run_import(path, "Item", ITEM_FIELDS, "ItemName", resolve, database, **options)
+    if notify and result.inserted:
+        publish(ChangeEvent("Item", None, INSERT))
+    return result
+
+
+def import_sources(path, database=None, notify=True, **options):
+    """Imports Sources from CSV; rows whose BusinessName already exists are reported and skipped."""
+    result = run_import(path, "Source", SOURCE_FIELDS, "BusinessName", lambda values: values, database, **options)
+    if notify and result.inserted:
+        publish(ChangeEvent("Source", None, INSERT))
+    return result
+
+
+def write_error_report(result, path):
+    """Writes the rejected rows (line, name, error) to a CSV file next to the import."""
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Line", "Name", "Error"])
+        writer.writerows((error.line, error.name, error.message) for error in result.errors)
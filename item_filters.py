@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+
+# Program:          item filters module
+# Associated file:  item_filters.py
+# Purpose:          This module turns the My Items filter panel's criteria (collection, price and value
+#                   ranges, source, location, status, date added) into a parameterized WHERE clause,
+#                   computes per-facet counts with indexed GROUP BY queries and caches both by criteria
+#                   until an Item or Collection write makes them stale.
+
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from typing import Optional
+
+from db import connect, ownership_filter
+from models import subscribe
+from money import export_columns
+from paging import QueryPageSource, column_affinities
+
+# columns shown in the My Items grid (ItemID last, it is the hidden row key)
+ITEM_COLUMNS = (
+    "ItemName", "Collection", "User", "Source", "Status",
+    "Description", "PricePaidCents", "CurrentValueCents", "Location", "Notes", "ItemID",
+)
+
+# columns the panel offers value counts for
+FACET_COLUMNS = ("Source", "Location", "Status")
+
+# distinct values listed per facet
+FACET_LIMIT = 100
+
+
+@dataclass(frozen=True)
+class ItemFilter:
+    """Criteria for the My Items grid. Frozen, so it doubles as the cache key."""
+    collection: Optional[str] = None
+    user: Optional[str] = None          # owner restriction (None for admin)
+    show_inactive: bool = False
+    status: Optional[str] = None
+    source: Optional[str] = None
+    location: Optional[str] = None
+    price_min: Optional[int] = None     # money bounds are integer cents
+    price_max: Optional[int] = None
+    value_min: Optional[int] = None
+    value_max: Optional[int] = None
+    added_from: Optional[str] = None    # 'YYYY-MM-DD', inclusive
+    added_to: Optional[str] = None      # 'YYYY-MM-DD', inclusive
+
+    def where(self):
+        """Returns (" WHERE ...", params) for these criteria ("" when nothing is filtered)."""
+        conditions = []
+        params = []
+
+        def add(condition, *values):
+            conditions.append(condition)
+            params.extend(values)
+
+        if self.collection is not None:
+            add("Collection = ?", self.collection)
+        if self.user is not None:
+            add("User = ?", self.user)
+        if self.status:
+            add("Status = ?", self.status)
+        elif not self.show_inactive:
+            add("Status = 'Active'")
+        if self.source:
+            add("Source = ?", self.source)
+        if self.location:
+            add("Location = ?", self.location)
+        if self.price_min is not None:
+            add("PricePaidCents >= ?", self.price_min)
+        if self.price_max is not None:
+            add("PricePaidCents <= ?", self.price_max)
+        if self.value_min is not None:
+            add("CurrentValueCents >= ?", self.value_min)
+        if self.value_max is not None:
+            add("CurrentValueCents <= ?", self.value_max)
+        if self.added_from:
+            add("DateAdded >= ?", self.added_from)
+        if self.added_to:
+            # the whole end day is included
+            add("DateAdded < date(?, '+1 day')", self.added_to)
+
+        clause = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return clause, tuple(params)
+
+    def matches(self, row):
+        """True if a row (a {column: value} dict, e.g. from ChangeEvent.rows) meets these criteria.
+
+        Mirrors where(): NULL never satisfies a comparison, and money columns hold integer cents.
+        """
+        def equals(column, value):
+            return row.get(column) == value
+
+        def within(column, low, high):
+            value = row.get(column)
+            if low is None and high is None:
+                return True
+            return value is not None and (low is None or value >= low) and (high is None or value <= high)
+
+        if self.collection is not None and not equals("Collection", self.collection):
+            return False
+        if self.user is not None and not equals("User", self.user):
+            return False
+        if self.status:
+            if not equals("Status", self.status):
+                return False
+        elif not self.show_inactive and not equals("Status", "Active"):
+            return False
+        if self.source and not equals("Source", self.source):
+            return False
+        if self.location and not equals("Location", self.location):
+            return False
+        if not within("PricePaidCents", self.price_min, self.price_max):
+            return False
+        if not within("CurrentValueCents", self.value_min, self.value_max):
+            return False
+        next_day = (date.fromisoformat(self.added_to) + timedelta(days=1)).isoformat() if self.added_to else None
+        return within("DateAdded", self.added_from or None, None) and (
+            next_day is None or (row.get("DateAdded") is not None and row["DateAdded"] < next_day))
+
+    def without(self, column):
+        """The same criteria minus one facet, so a facet's counts aren't narrowed by itself."""
+        if column == "Status":
+            return replace(self, status=None, show_inactive=True)
+        return replace(self, **{column.lower(): None})
+
+
+def for_logged_in_user(**criteria):
+    """Builds an ItemFilter with the non-admin ownership rule applied."""
+    condition, params = ownership_filter(("User",))
+    return ItemFilter(user=params[0] if condition else None, **criteria)
+
+
+class FilterCache:
+    """Small LRU cache keyed by ItemFilter (plus an optional facet name).
+
+    Values that have a close() method (QueryPageSource holds a SQLite connection) are closed when they
+    are evicted or cleared. A closed page source reconnects on its next read, so the grid showing it
+    keeps working.
+    """
+
+    def __init__(self, size=16):
+        self.size = size
+        self._entries = OrderedDict()
+
+    def get(self, key, factory):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        value = self._entries[key] = factory()
+        while len(self._entries) > self.size:
+            _, evicted = self._entries.popitem(last=False)
+            self._close(evicted)
+        return value
+
+    def clear(self, event=None):
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for value in entries:
+            self._close(value)
+
+    def items(self):
+        return list(self._entries.items())
+
+    def replace(self, key, value):
+        """Swaps the value of a cached key in place (keeping its LRU position)."""
+        if key in self._entries:
+            self._entries[key] = value
+
+    def discard(self, key):
+        self._close(self._entries.pop(key, None))
+
+    @staticmethod
+    def _close(value):
+        close = getattr(value, "close", None)
+        if callable(close):
+            close()
+
+
+# page sources (with their cached pages and counts), facet counts and footer totals, per criteria
+result_cache = FilterCache()
+facet_cache = FilterCache(size=64)
+totals_cache = FilterCache()
+
+for _model in ("Item", "Collection"):
+    subscribe(result_cache.clear, model=_model)
+    subscribe(facet_cache.clear, model=_model)
+subscribe(totals_cache.clear, model="Collection")
+
+
+def apply_item_change(event):
+    """Keeps the cached footer totals current from an Item ChangeEvent's rows.
+
+    Totals the change can't be applied to (a removed amount was a minimum or maximum) are dropped
+    and re-aggregated when next shown; events without rows (bulk writes) drop every total.
+    """
+    if event.rows is None:
+        totals_cache.clear()
+        return
+    for item_filter, totals in totals_cache.items():
+        try:
+            updated = totals.updated(event.rows, item_filter.matches)
+        except (TypeError, ValueError):   # a value the Python comparison can't mirror
+            updated = None
+        if updated is None:
+            totals_cache.discard(item_filter)
+        else:
+            totals_cache.replace(item_filter, updated)
+
+
+subscribe(apply_item_change, model="Item")
+
+
+def item_query(item_filter):
+    clause, params = item_filter.where()
+    return f"SELECT {', '.join(ITEM_COLUMNS)} FROM Item{clause}", params
+
+
+def item_export_query(item_filter):
+    """Like item_query, with money as exact decimal text under its plain column names."""
+    clause, params = item_filter.where()
+    return f"SELECT {export_columns(ITEM_COLUMNS)} FROM Item{clause}", params
+
+
+def page_source_for(item_filter):
+    """Cached QueryPageSource for the criteria; going back to an earlier filter reuses its pages."""
+    def build():
+        query, params = item_query(item_filter)
+        return QueryPageSource(query, params, column_types=column_affinities("Item"), key_columns=("ItemID",))
+    return result_cache.get(item_filter, build)
+
+
+def facet_counts(item_filter, column):
+    """Returns [(value, count), ...] for one facet, most common first."""
+    if column not in FACET_COLUMNS:
+        raise ValueError(f"'{column}' is not a facet column.")
+
+    def build():
+        clause, params = item_filter.without(column).where()
+        query = f"""
+            SELECT {column}, COUNT(*) FROM Item{clause}
+            GROUP BY {column}
+            ORDER BY COUNT(*) DESC, {column}
+            LIMIT ?
+        """
+        conn = connect()
+        rows = conn.execute(query, params + (FACET_LIMIT,)).fetchall()
+        return [(row[0], row[1]) for row in rows if row[0] not in (None, "")]
+    return facet_cache.get((item_filter, column), build)
+
+
+@dataclass(frozen=True)
+class ItemTotals:
+    """Footer figures for every row matching a filter, not just the rows on screen (money in cents)."""
+    count: int = 0
+    price_total: int = 0
+    price_min: Optional[int] = None
+    price_max: Optional[int] = None
+    value_total: int = 0
+    value_min: Optional[int] = None
+    value_max: Optional[int] = None
+
+    @property
+    def gain(self):
+        """Current value minus price paid over the whole result set."""
+        return self.value_total - self.price_total
+
+    def updated(self, changes, matches):
+        """The totals after ChangeEvent.rows changes, for a filter whose membership test is matches.
+
+        Returns None when they can't be worked out without a query: a row that left the set held
+        the minimum or maximum of one of the amounts.
+        """
+        count = self.count
+        sums = {"PricePaidCents": self.price_total, "CurrentValueCents": self.value_total}
+        bounds = {"PricePaidCents": [self.price_min, self.price_max],
+                  "CurrentValueCents": [self.value_min, self.value_max]}
+        for before, after in changes:
+            was = before is not None and matches(before)
+            now = after is not None and matches(after)
+            if was and now and all(before[column] == after[column] for column in sums):
+                continue  # still counted, amounts unchanged
+            if was:
+                count -= 1
+                for column, (low, high) in bounds.items():
+                    cents = before[column]
+                    if cents is not None:
+                        if cents in (low, high) and count:
+                            return None
+                        sums[column] -= cents
+            if now:
+                count += 1
+                for column, limits in bounds.items():
+                    cents = after[column]
+                    if cents is not None:
+                        sums[column] += cents
+                        limits[0] = cents if limits[0] is None else min(limits[0], cents)
+                        limits[1] = cents if limits[1] is None else max(limits[1], cents)
+        if not count:
+            return ItemTotals()
+        return ItemTotals(count, sums["PricePaidCents"], *bounds["PricePaidCents"],
+                          sums["CurrentValueCents"], *bounds["CurrentValueCents"])
+
+
+def item_totals(item_filter):
+    """Returns ItemTotals for the criteria, computed with one aggregate query over the same WHERE.
+
+    SUM over integer cents is exact (TOTAL would always return a REAL).
+    """
+    def build():
+        clause, params = item_filter.where()
+        query = f"""
+            SELECT COUNT(*),
+                COALESCE(SUM(PricePaidCents), 0), MIN(PricePaidCents), MAX(PricePaidCents),
+                COALESCE(SUM(CurrentValueCents), 0), MIN(CurrentValueCents), MAX(CurrentValueCents)
+            FROM Item{clause}
+        """
+        conn = connect()
+        return ItemTotals(*conn.execute(query, params).fetchone())
+    return totals_cache.get(item_filter, build)
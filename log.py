@@ -1,5 +1,4 @@
 import sqlite3
-from dataclasses import dataclass
 from datetime import datetime
 # from db import get_logged_in_user  # or wherever you store that function
 
@@ -8,13 +7,10 @@ def get_logged_in_user():
     logged_in_user = None  # Replace this with the actual logic to check the logged-in user
     return logged_in_user if logged_in_user else "admin"
 
-@dataclass
 class LogEntry:
-    user: str
-    message: str
-    timestamp: str
-
-    def __post_init__(self):
+    def __init__(self, user, message, timestamp=None):
+        self.user = user
+        self.message = message
         self.timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # Automatically set the timestamp
 
     def log_action(self):
@@ -40,25 +36,21 @@ class LogEntry:
 # Function to create and log an action
 
 import sqlite3
+from db import run_write
 
-def log(message, user=None):
+def log(message, user=None, database=None):
     # Use 'admin' as default if no user is logged in
     user = user or 'admin'
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
     try:
-        conn = sqlite3.connect("collections.sqlite")
-        cursor = conn.cursor()
-
-        # Insert log entry into the Log table
-        cursor.execute("""
+        # Insert log entry into the Log table (retried if another instance holds the write lock)
+        run_write(lambda conn: conn.execute("""
             INSERT INTO Log (User, Message, Timestamp) 
             VALUES (?, ?, ?)
-        """, (user, message, timestamp))
+        """, (user, message, timestamp)), database=database or "collections.sqlite")
         print(message) # also print to the console.
 
-        conn.commit()
-        conn.close()
         print(f"Action logged: {message}")
     except Exception as e:
         log(f"Error logging action: {e}")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+# Program:          lookup cache module
+# Associated file:  lookup_cache.py
+# Purpose:          This module caches the small option lists the forms load into their dropdowns
+#                   (collections, sources, items, users) keyed by (query, params), so opening a window
+#                   after the first time is served from memory. Entries are dropped whenever a model
+#                   writes to one of the tables the query reads.
+
+import re
+import threading
+
+from db import connect
+from models import subscribe
+
+# FROM/JOIN <table> — good enough for the simple dropdown queries used by the forms
+TABLE_PATTERN = re.compile(r"\b(?:FROM|JOIN)\s+\"?(\w+)\"?", re.IGNORECASE)
+
+
+def tables_in(query):
+    """Returns the lower-cased table names a query reads."""
+    return {name.lower() for name in TABLE_PATTERN.findall(query)}
+
+
+class LookupCache:
+    """(query, params) -> rows cache with per-table invalidation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {}      # (query, params) -> list of tuples
+        self._maps = {}      # (query, params) -> {name: id}
+        self._by_table = {}  # table -> set of keys that read it
+        self.hits = 0
+        self.misses = 0
+
+    def get_rows(self, query, params=()):
+        """Returns the rows of a query, running it only if it isn't cached."""
+        key = (" ".join(query.split()), tuple(params or ()))
+        with self._lock:
+            rows = self._rows.get(key)
+            if rows is not None:
+                self.hits += 1
+                return rows
+
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute(query, key[1])
+        rows = [tuple(row) for row in cursor.fetchall()]
+        cursor.close()
+
+        with self._lock:
+            self.misses += 1
+            self._rows[key] = rows
+            for table in tables_in(query):
+                self._by_table.setdefault(table, set()).add(key)
+        return rows
+
+    def get_values(self, query, params=()):
+        """First column of every row (the dropdown's display values)."""
+        return [row[0] for row in self.get_rows(query, params)]
+
+    def get_map(self, query, params=()):
+        """{name: id} for a two-column "SELECT id, name" query."""
+        key = (" ".join(query.split()), tuple(params or ()))
+        rows = self.get_rows(query, params)
+        with self._lock:
+            mapping = self._maps.get(key)
+            if mapping is None:
+                mapping = self._maps[key] = {row[1]: row[0] for row in rows}
+        return dict(mapping)
+
+    def invalidate(self, table=None):
+        """Drops every entry that reads table (everything when table is None)."""
+        with self._lock:
+            if table is None:
+                self._rows.clear()
+                self._maps.clear()
+                self._by_table.clear()
+                return
+            for key in self._by_table.pop(table.lower(), set()):
+                self._rows.pop(key, None)
+                self._maps.pop(key, None)
+
+
+# shared cache for the whole process, kept current by model writes
+cache = LookupCache()
+subscribe(lambda event: cache.invalidate(event.model))
+
+
+##### PREFIX LOOKUPS (type-ahead) #####
+
+# upper bound for a prefix range: sorts after every character that can follow the prefix
+PREFIX_UPPER = "\U0010ffff"
+
+
+def prefix_matches(table, column, prefix, limit=50, id_column=None, where="", params=()):
+    """Returns up to limit (name, id) rows whose column starts with prefix, case-insensitively.
+
+    The prefix is turned into a NOCASE range (column >= prefix AND column < prefix + U+10FFFF) so
+    the NOCASE indexes from db.ensure_indexes() are used and no LIKE wildcards need escaping.
+    """
+    id_expr = id_column or column
+    query = f"SELECT {column}, {id_expr} FROM {table} WHERE {column} IS NOT NULL"
+    values = []
+    if prefix:
+        query += f" AND {column} >= ? COLLATE NOCASE AND {column} < ? COLLATE NOCASE"
+        values += [prefix, prefix + PREFIX_UPPER]
+    if where:
+        query += f" AND ({where})"
+        values += list(params)
+    query += f" ORDER BY {column} COLLATE NOCASE LIMIT ?"
+    values.append(limit)
+
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute(query, values)
+    rows = [tuple(row) for row in cursor.fetchall()]
+    cursor.close()
+    return rows
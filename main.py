@@ -1,12 +1,10 @@
-import sqlite3
-import tkinter as tk  # Ensure tkinter is imported as tk
-from tkinter import ttk, simpledialog, messagebox
-from gui2 import LoginWindow
+import sys
+import startup  # first, so start-up timings include every import below
 
-if __name__ == "__main__":
-    # Initialize root window
-    root = tk.Tk()
-    root.withdraw() # hide main window until logged in.
+startup.enable("--profile-startup" in sys.argv)
+
+import gui
+startup.mark("gui imported")
 
-    login_window = LoginWindow(master=root)
-    login_window.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    gui.main()
@@ -0,0 +1,1337 @@
+# Program:          main window module
+# Associated file:  main_window.py
+# Purpose:          The main application window: search bar, tab viewer and the button panel. Imported by
+#                   LoginWindow after a successful login, so none of this is loaded before the login
+#                   window is on screen.
+
+import os
+import queue
+import re
+import sqlite3
+import threading
+import tkinter as tk  # Ensure tkinter is imported as tk
+from tkinter import ttk, simpledialog, messagebox, filedialog, StringVar
+from models import User, Item, Source, Collection, ChangeEvent, INSERT, subscribe, unsubscribe, publish
+from db import configure, get_logged_in_user, is_admin
+from log import log
+from model_dialogs import show_record
+import metrics
+from lookup_cache import cache
+from search import SearchWorker, ensure_search_index
+import item_filters
+from export import ExportJob, ExportCancelled, format_for
+import importer
+import reports
+import backup
+import maintenance
+from paging import QueryPageSource, ListPageSource, quote_identifier
+from grid_model import GridViewModel, filtered_query, heading_labels, items_footer, toggle_sort
+from money import MONEY_COLUMNS, export_columns, format_money, to_cents
+from gui import BaseWindow, LoginWindow, load_theme
+
+# shown in the Users tab but never written to an export file (the CLI's users export leaves it out too)
+UNEXPORTED_COLUMNS = ("Password",)
+
+# Virtual list: only the visible rows exist as Tk items, the rest are fetched from a page source on scroll
+class VirtualTreeview(ttk.Frame):
+    """Treeview that renders the row window of a grid_model.GridViewModel.
+
+    The view-model decides what to show (query, sort, window, selection, diff); this widget only
+    applies the RowWindow it returns and forwards scrolling, resizing and selection back to it.
+    """
+
+    def __init__(self, master, columns, key_columns=(), display_columns=None, overscan=100, row_height=20,
+                 formatters=None):
+        super().__init__(master)
+        self.model = GridViewModel(columns, key_columns, overscan=overscan, formatters=formatters)
+        self.columns = self.model.columns
+        self.key_columns = self.model.key_columns
+        self.row_height = row_height
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", selectmode="browse",
+                                 height=self.model.visible_rows)
+        if display_columns:
+            self.tree.configure(displaycolumns=display_columns)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scrollbar)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_to(self.model.first - 3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_to(self.model.first + 3))
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<Up>", lambda event: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self.move_selection(-self.model.visible_rows))
+        self.tree.bind("<Next>", lambda event: self.move_selection(self.model.visible_rows))
+
+    # Treeview pass-throughs used by TabViewer
+    def heading(self, *args, **kwargs):
+        return self.tree.heading(*args, **kwargs)
+
+    def column(self, *args, **kwargs):
+        return self.tree.column(*args, **kwargs)
+
+    def selection(self):
+        return self.tree.selection()
+
+    def item(self, *args, **kwargs):
+        return self.tree.item(*args, **kwargs)
+
+    @property
+    def source(self):
+        return self.model.source
+
+    def set_source(self, source, keep_position=False):
+        self.apply(self.model.set_source(source, keep_position))
+
+    def reload(self):
+        self.apply(self.model.reload())
+
+    def sort_by(self, order_by):
+        self.apply(self.model.sort_by(order_by))
+
+    def display_columns(self):
+        """Columns in the order they are shown (hidden key columns excluded)."""
+        shown = self.tree["displaycolumns"]
+        return self.columns if shown in ("#all", ("#all",)) else tuple(shown)
+
+    def sort_order(self):
+        return self.model.sort_order()
+
+    def row_count(self):
+        return self.model.row_count()
+
+    def apply(self, window):
+        """Applies a RowWindow to the Tk items (None means nothing changed)."""
+        if window is None:
+            return
+        if window.deleted:
+            self.tree.delete(*window.deleted)
+        for position, iid in enumerate(window.order or ()):
+            self.tree.move(iid, "", position)
+        for position, iid, values in window.inserted:
+            self.tree.insert("", position, iid=iid, values=values)
+        for iid, values in window.updated:
+            self.tree.item(iid, values=values)
+        if window.selection is not None and self.tree.selection() != window.selection:
+            self.tree.selection_set(*window.selection)
+        self.scrollbar.set(*window.scroll)
+
+    def scroll_to(self, first):
+        self.apply(self.model.scroll_to(first))
+        return "break"
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.apply(self.model.scroll_fraction(amount))
+        elif action == "scroll":
+            step = self.model.visible_rows if unit == "pages" else 1
+            self.scroll_to(self.model.first + int(amount) * step)
+
+    def on_mousewheel(self, event):
+        return self.scroll_to(self.model.first - int(event.delta / 120) * 3)
+
+    def on_resize(self, event):
+        window = self.model.resize((event.height - self.row_height) // self.row_height)
+        if window is not None:
+            self.tree.configure(height=self.model.visible_rows)
+            self.apply(window)
+
+    def on_select(self, event=None):
+        selected = self.tree.selection()
+        if selected:
+            self.model.select(selected[0])
+
+    def move_selection(self, step):
+        self.apply(self.model.move_selection(step))
+        return "break"
+
+
+SEARCH_DELAY_MS = 120   # pause in typing before a search starts
+SEARCH_POLL_MS = 15     # how often streamed results are moved from the worker into the panel
+
+# search result group -> tab that lists those rows
+SEARCH_RESULT_TABS = {
+    "Items": "My Items",
+    "Collections": "My Items",
+    "Sources": "Sources",
+    "Users": "Users",
+    "Log": "Activiy Log",
+}
+
+# Global search: debounced, cancellable, results streamed in per group
+class SearchPanel(tk.Frame):
+    """Search box that queries Items, Collections, Sources (and Users/Log for admin) as the user types."""
+
+    def __init__(self, master, on_open=None):
+        super().__init__(master)
+        self.on_open = on_open
+        self.worker = SearchWorker()
+        self.results = queue.Queue()   # (generation, group, rows) from the worker thread
+        self.generation = None
+        self._pending = None
+        self._polling = False
+
+        tk.Label(self, text="Search:").grid(row=0, column=0, sticky="w", padx=(0, 5))
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(self, textvariable=self.search_var)
+        self.search_entry.grid(row=0, column=1, sticky="ew")
+        self.grid_columnconfigure(1, weight=1)
+
+        self.result_tree = ttk.Treeview(self, columns=("Detail",), height=8)
+        self.result_tree.heading("#0", text="Result")
+        self.result_tree.heading("Detail", text="Detail")
+        self.result_tree.bind("<Double-1>", self.on_result_double_click)
+
+        self.search_var.trace_add("write", self.on_text_changed)
+        self.search_entry.bind("<Escape>", lambda event: self.search_var.set(""))
+        self.bind("<Destroy>", lambda event: self.worker.cancel() if event.widget is self else None)
+
+        # the search indexes are created on a worker thread: the first build reads every table
+        self.status_var = tk.StringVar(value="Building search index...")
+        self.status_label = tk.Label(self, textvariable=self.status_var)
+        self.status_label.grid(row=0, column=2, sticky="w", padx=(5, 0))
+        self.search_entry.configure(state="disabled")
+        self.index_ready = threading.Event()
+        self.index_error = None
+        threading.Thread(target=self.build_index, daemon=True).start()
+        self.after(SEARCH_POLL_MS, self.poll_index)
+
+    def build_index(self):
+        """Worker thread: creates any missing search index and its triggers."""
+        try:
+            conn = configure(sqlite3.connect(self.worker.database))
+            try:
+                ensure_search_index(conn)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.index_error = e
+        finally:
+            self.index_ready.set()
+
+    def poll_index(self):
+        """Enables the search box once the index is built."""
+        if not self.index_ready.is_set():
+            self.after(SEARCH_POLL_MS, self.poll_index)
+            return
+        if self.index_error is not None:
+            print(f"[DEBUG] Search index build failed: {self.index_error}")
+            self.status_var.set("Search unavailable")
+            return
+        self.status_label.grid_remove()
+        self.search_entry.configure(state="normal")
+
+    def on_text_changed(self, *args):
+        # restart the debounce timer on every keystroke
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        self._pending = self.after(SEARCH_DELAY_MS, self.start_search)
+
+    def start_search(self):
+        """Cancels the running search (if any) and starts one for the current text."""
+        self._pending = None
+        self.result_tree.delete(*self.result_tree.get_children())
+        text = self.search_var.get().strip()
+        if not text:
+            self.worker.cancel()
+            self.generation = None
+            self._polling = False   # the pending poll sees generation None and stops
+            self.result_tree.grid_remove()
+            return
+
+        self.result_tree.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(5, 0))
+        self.generation = self.worker.start(
+            text,
+            on_group=lambda generation, group, rows: self.results.put((generation, group, rows)),
+            on_done=lambda generation: self.results.put((generation, None, None)),
+            user=get_logged_in_user(),
+            admin=is_admin(),
+        )
+        if not self._polling:
+            self._polling = True
+            self.after(SEARCH_POLL_MS, self.poll_results)
+
+    def poll_results(self):
+        """Moves streamed groups into the result tree; stops once the current search is done or cancelled."""
+        if self.generation is None or not self.worker.is_current(self.generation):
+            self._polling = False
+            return
+        done = False
+        while True:
+            try:
+                generation, group, rows = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.generation:
+                continue  # a stale search finished after a newer one started
+            if group is None:
+                done = True
+            elif rows:
+                self.add_group(group, rows)
+
+        if done:
+            self._polling = False
+        else:
+            self.after(SEARCH_POLL_MS, self.poll_results)
+
+    def add_group(self, group, rows):
+        parent = self.result_tree.insert("", "end", iid=group, text=f"{group} ({len(rows)})", open=True)
+        for row_id, title, detail in rows:
+            self.result_tree.insert(parent, "end", iid=f"{group}|{row_id}", text=str(title),
+                                    values=("" if detail is None else str(detail),))
+
+    def on_result_double_click(self, event):
+        selected = self.result_tree.selection()
+        if not selected or "|" not in selected[0]:
+            return
+        group, row_id = selected[0].split("|", 1)
+        if self.on_open:
+            self.on_open(group, row_id)
+
+# How often the export window checks its worker for progress (milliseconds)
+EXPORT_POLL_MS = 100
+
+
+class ExportWindow(tk.Toplevel):
+    """Shows the progress of one export with a Cancel button; the export runs on a worker thread."""
+
+    def __init__(self, master, query, params, path):
+        super().__init__(master)
+        self.title("Export")
+        self.resizable(False, False)
+        self.configure(padx=20, pady=20)
+        self.path = path
+        self.updates = queue.Queue()   # (written, total, done, error) from the worker thread
+
+        tk.Label(self, text=f"Exporting to {os.path.basename(path)}").pack(anchor="w")
+        self.progress = ttk.Progressbar(self, length=300, mode="determinate")
+        self.progress.pack(pady=10)
+        self.status_var = StringVar(value="Starting...")
+        tk.Label(self, textvariable=self.status_var).pack(anchor="w")
+        self.cancel_button = ttk.Button(self, text="Cancel", command=self.cancel)
+        self.cancel_button.pack(pady=(10, 0))
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        self.job = ExportJob(query, params, path)
+        self.job.start(
+            on_progress=lambda written, total: self.updates.put((written, total, False, None)),
+            on_done=lambda written, error: self.updates.put((written, None, True, error)),
+        )
+        self.after(EXPORT_POLL_MS, self.poll)
+
+    def poll(self):
+        """Shows the latest progress; closes the window when the worker finishes."""
+        latest = None
+        while True:
+            try:
+                latest = self.updates.get_nowait()
+            except queue.Empty:
+                break
+
+        if latest is None:
+            self.after(EXPORT_POLL_MS, self.poll)
+            return
+
+        written, total, done, error = latest
+        if not done:
+            if total:
+                self.progress["value"] = 100 * written / total
+            self.status_var.set(f"{written:,} of {total:,} rows written")
+            self.after(EXPORT_POLL_MS, self.poll)
+            return
+
+        self.destroy()
+        if isinstance(error, ExportCancelled):
+            messagebox.showinfo("Export", "Export cancelled.")
+        elif error is not None:
+            messagebox.showerror("Export Error", f"Export failed: {error}")
+        else:
+            log(f"{get_logged_in_user()} exported {written} rows to {os.path.basename(self.path)}.")
+            messagebox.showinfo("Export", f"Exported {written:,} rows to {self.path}.")
+
+    def cancel(self):
+        self.cancel_button.configure(state="disabled")
+        self.status_var.set("Cancelling...")
+        self.job.cancel()
+
+
+class ImportWindow(tk.Toplevel):
+    """Runs a CSV import on a worker thread, showing progress and a summary of rejected rows."""
+
+    # errors listed in the summary dialog; the full list goes to <file>.errors.csv
+    SHOWN_ERRORS = 15
+
+    def __init__(self, master, model, path):
+        super().__init__(master)
+        self.title("Import")
+        self.resizable(False, False)
+        self.configure(padx=20, pady=20)
+        self.model = model
+        self.path = path
+        self.updates = queue.Queue()   # (inserted, skipped, result) from the worker thread
+        self.cancelled = threading.Event()
+
+        tk.Label(self, text=f"Importing {os.path.basename(path)}").pack(anchor="w")
+        self.status_var = StringVar(value="Starting...")
+        tk.Label(self, textvariable=self.status_var).pack(anchor="w", pady=10)
+        self.cancel_button = ttk.Button(self, text="Cancel", command=self.cancel)
+        self.cancel_button.pack()
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        threading.Thread(target=self.run, args=(get_logged_in_user(), is_admin()), daemon=True).start()
+        self.after(EXPORT_POLL_MS, self.poll)
+
+    def run(self, user, admin):
+        # change events are published from poll() on the Tk thread, not from here
+        options = dict(
+            notify=False,
+            cancelled=self.cancelled,
+            progress=lambda inserted, skipped: self.updates.put((inserted, skipped, None)),
+        )
+        try:
+            if self.model == "Item":
+                result = importer.import_items(self.path, user, admin, **options)
+            else:
+                result = importer.import_sources(self.path, **options)
+        except (ValueError, OSError, sqlite3.Error) as e:
+            result = e
+        self.updates.put((None, None, result))
+
+    def poll(self):
+        latest = None
+        while True:
+            try:
+                latest = self.updates.get_nowait()
+            except queue.Empty:
+                break
+
+        if latest is None or latest[2] is None:
+            if latest is not None:
+                self.status_var.set(f"{latest[0]:,} rows imported, {latest[1]:,} skipped")
+            self.after(EXPORT_POLL_MS, self.poll)
+            return
+
+        result = latest[2]
+        self.destroy()
+        if isinstance(result, Exception):
+            messagebox.showerror("Import Error", f"Import failed: {result}")
+            return
+
+        if result.inserted:
+            publish(ChangeEvent(self.model, None, INSERT))
+            if self.model == "Item":
+                metrics.incr(metrics.ITEMS_ADDED, get_logged_in_user(), result.inserted)
+        log(f"{get_logged_in_user()} imported {os.path.basename(self.path)}: {result.summary()}")
+
+        message = result.summary()
+        if self.cancelled.is_set():
+            message = "Import cancelled. " + message
+        if result.errors:
+            report = os.path.splitext(self.path)[0] + ".errors.csv"
+            importer.write_error_report(result, report)
+            lines = [f"Line {error.line}: {error.message}" for error in result.errors[:self.SHOWN_ERRORS]]
+            if result.skipped > self.SHOWN_ERRORS:
+                lines.append(f"... and {result.skipped - self.SHOWN_ERRORS} more.")
+            message += "\n\n" + "\n".join(lines) + f"\n\nAll rejected rows were written to {report}."
+            messagebox.showwarning("Import", message)
+        else:
+            messagebox.showinfo("Import", message)
+
+    def cancel(self):
+        self.cancel_button.configure(state="disabled")
+        self.status_var.set("Cancelling...")
+        self.cancelled.set()
+
+
+# Main app window extends the BaseWindow class
+class MainApplication(BaseWindow):  # Use tk.Tk
+    """Main application window with a tabbed viewer and dynamic buttons."""
+
+    def __init__(self):
+        load_theme()  # first themed window
+        super().__init__()
+        self.title("Collection Management System")
+        self.geometry("1260x600")
+        self.minsize(1260, 600)
+        self.maxsize(1260, 600)
+        self.configure(padx=10, pady=10)
+
+        # Retrieve the logged-in user's username
+        logged_in_user = get_logged_in_user()
+        # Configure grid layout
+        self.grid_columnconfigure(0, weight=1)  # 40% for the button panel
+        self.grid_columnconfigure(1, weight=2)  # 60% for the tab viewer
+        self.grid_rowconfigure(0, weight=1)
+
+        self.grid_rowconfigure(0, weight=0)
+        self.grid_rowconfigure(1, weight=1)
+
+        # Global search bar across the top
+        self.search_panel = SearchPanel(self, on_open=self.open_search_result)
+        self.search_panel.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 10))
+
+        # Create the dynamic button panel, on the left side of the app
+        self.button_panel = DynamicButtonPanel(self)
+        self.button_panel.grid(row=1, column=0, sticky="nsew", padx=(0, 10))
+
+        # Create the tab viewer on the right side of the app.
+        self.tab_viewer = TabViewer(self)
+        self.tab_viewer.grid(row=1, column=1, sticky="nsew")
+
+        # TabViewer.on_tab_changed updates the buttons (and lazily loads the tab), so it owns
+        # the <<NotebookTabChanged>> binding
+
+        # Persist metric rollups periodically and once more when the window closes
+        self.after(metrics.FLUSH_INTERVAL_MS, self.flush_metrics)
+        self.bind("<Destroy>", lambda event: metrics.flush() if event.widget is self else None)
+
+        # Back up the database once a day while the app is open (see backup.py)
+        self.after(backup.CHECK_INTERVAL_MS, self.scheduled_backup)
+
+        # Tidy the database up (ANALYZE, incremental vacuum, ...) while the user is idle
+        self.maintenance = maintenance.MaintenanceScheduler()
+        for sequence in ("<Any-KeyPress>", "<Any-ButtonPress>", "<Motion>", "<MouseWheel>"):
+            self.bind_all(sequence, self.maintenance.note_activity, add="+")
+        self.after(maintenance.CHECK_INTERVAL_MS, self.idle_maintenance)
+
+    def open_search_result(self, group, row_id):
+        """Switches to the tab that lists a search result's rows."""
+        tab_name = SEARCH_RESULT_TABS.get(group)
+        if tab_name in self.tab_viewer.tabs:
+            self.tab_viewer.notebook.select(self.tab_viewer.tabs[tab_name])
+
+    def flush_metrics(self):
+        """Writes pending counters to MetricRollup and reschedules itself."""
+        metrics.flush()
+        self.after(metrics.FLUSH_INTERVAL_MS, self.flush_metrics)
+
+    def scheduled_backup(self):
+        """Starts a background backup when one is due and reschedules itself."""
+        def run():
+            try:
+                backup.backup_if_due()
+            except (backup.BackupError, OSError, sqlite3.Error) as e:
+                print(f"[DEBUG] Scheduled backup failed: {e}")
+
+        threading.Thread(target=run, daemon=True).start()
+        self.after(backup.CHECK_INTERVAL_MS, self.scheduled_backup)
+
+    def idle_maintenance(self):
+        """Runs the next maintenance step in the background when idle and reschedules itself."""
+        self.maintenance.tick()
+        self.after(maintenance.CHECK_INTERVAL_MS, self.idle_maintenance)
+
+    def update_buttons(self, event=None):
+        # Update the buttons based on the active tab.
+        active_tab = self.tab_viewer.notebook.tab(self.tab_viewer.notebook.select(), "text")
+        self.button_panel.update_buttons(active_tab)
+
+
+# "no filter" entry of the My Items facet dropdowns
+FACET_ANY = "Any"
+ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Delay before the tab after the visible one is loaded in the background (milliseconds)
+PREFETCH_DELAY_MS = 300
+
+# Which tabs show each model's rows. Every write is also logged, so the log tab goes stale too.
+MODEL_TABS = {
+    "Item": ("My Items",),
+    "Collection": ("My Items",),
+    "User": ("Users",),
+    "Source": ("Sources",),
+}
+LOG_TAB = "Activiy Log"
+
+# Tabbed viewer to toggle between User, Collection, Item and Source tables
+class TabViewer(tk.Frame):
+    def __init__(self, master):
+        super().__init__(master)
+        self.master = master
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(fill="both", expand=True)
+
+        # Define tab configurations
+        self.tabs_config = {
+            "Users": {
+                "visible": lambda: is_admin(),
+                "columns": ("Username", "Password", "Role", "Status"),
+                "key": ("Username",),
+                "table": "User",
+                "query": "SELECT Username, Password, Role, Status FROM User"
+            },
+            "My Items": {
+                "visible": lambda: True,
+                "columns": (
+                    "ItemName", "Collection", "User", "Source", "Status",
+                    "Description", "PricePaidCents", "CurrentValueCents", "Location", "Notes"
+                ),
+                "key": ("ItemID",),
+                "table": "Item",
+                "query": ""  # Dynamic query based on user/collection
+            },
+            "Sources": {
+                "visible": lambda: True,
+                "columns": (
+                    "BusinessName", "FirstName", "LastName", "Phone", "Address",
+                    "City", "State", "Zip", "Email"
+                ),
+                "key": ("BusinessName",),
+                "table": "Source",
+                "query": """
+                    SELECT BusinessName, FirstName, LastName, Phone, Address,
+                    City, State, Zip, Email FROM Source
+                """
+            },
+            "Activiy Log": {
+                "visible": lambda: is_admin(),
+                "columns": ("User", "Message", "Timestamp"),
+                "key": ("LogID",),
+                "table": "Log",
+                "query": "SELECT User, Message, Timestamp, rowid AS LogID FROM Log"
+            },
+            "Metrics": {
+                "visible": lambda: is_admin(),
+                "columns": ("Name", "Label", "PeriodStart", "Count", "Total", "MinValue", "MaxValue"),
+                "key": ("Name", "Label", "PeriodStart"),
+                "table": None,
+                "query": ""  # Read from MetricRollup at the selected granularity
+            }
+        }
+
+        self.tabs = {}
+        self.trees = {}         # tab name -> its VirtualTreeview
+        self.loaders = {}       # tab name -> first-time data load
+        self.refreshers = {}    # tab name -> diff-based reload of an already loaded tab
+        self.loaded = set()     # tabs whose data has been queried at least once
+        self.stale = set()      # loaded tabs that have seen a write since they were last shown
+        self.pending_changes = []   # ChangeEvents received since the last idle flush
+        self.flush_scheduled = False
+        self.user_tree = None
+        self.item_tree = None
+        self.collection_tree = None
+        self.source_tree = None
+
+        # the migrations and sort indexes were applied before this window was built
+        # (gui.DatabasePreparation), so building the tabs runs no DDL
+
+        # Build all visible tabs
+        self.setup_tabs()
+
+        # Update button layout (and load the tab's data) when switching tabs
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
+        # Only the tab on screen is queried, after the window has painted
+        self.after_idle(self.load_current_tab)
+
+        # Model writes refresh the affected tabs; stop listening once the viewer is gone
+        subscribe(self.on_model_change)
+        self.bind("<Destroy>", lambda event: unsubscribe(self.on_model_change) if event.widget is self else None)
+
+    def get_filtered_query(self, table, columns):
+        """Returns a (query, params) SELECT filtered by user if not admin."""
+        return filtered_query(table, columns)
+
+    def export_query(self, tab_name):
+        """Returns the (query, params) behind a tab as it is shown: same filter, columns and sort."""
+        self.ensure_loaded(tab_name)
+        tree = self.trees[tab_name]
+        # money as dollars, not cents
+        columns = export_columns(column for column in tree.display_columns() if column not in UNEXPORTED_COLUMNS)
+        source = tree.source
+
+        if isinstance(source, QueryPageSource):
+            return f"SELECT {columns} FROM ({source.query}){source.order_clause()}", source.params
+        if tab_name == "Metrics":
+            query, params = metrics.rollup_query(self.granularity_var.get())
+            order = ", ".join(
+                f"{quote_identifier(column)} {'DESC' if descending else 'ASC'}"
+                for column, descending in tree.sort_order()
+            )
+            return f"SELECT {columns} FROM ({query})" + (f" ORDER BY {order}" if order else ""), params
+        return None
+
+    def setup_tabs(self):
+        """Creates tabs based on visibility rules. Widgets are built now; data loads on first view."""
+        for tab_name, config in self.tabs_config.items():
+            if config["visible"]():
+                tab_frame = ttk.Frame(self.notebook)
+                self.notebook.add(tab_frame, text=tab_name)
+                self.tabs[tab_name] = tab_frame
+
+                if tab_name == "My Items":
+                    self.setup_my_items_tab(tab_frame, config["columns"])
+                    self.loaders[tab_name] = self.load_collection_dropdown
+                    self.refreshers[tab_name] = self.refresh_my_items
+                    self.trees[tab_name] = self.my_items_tree
+                elif tab_name == "Metrics":
+                    self.setup_metrics_tab(tab_frame, config["columns"])
+                    self.loaders[tab_name] = self.load_metrics
+                    self.refreshers[tab_name] = lambda: self.load_metrics(keep_position=True)
+                    self.trees[tab_name] = self.metrics_tree
+                else:
+                    treeview = self.create_treeview(tab_frame, config["columns"], config["key"])
+                    setattr(self, f"{tab_name.lower()}_tree", treeview)
+                    self.loaders[tab_name] = (
+                        lambda treeview=treeview, config=config:
+                        self.populate_treeview(treeview, config["query"], table=config["table"])
+                    )
+                    self.refreshers[tab_name] = treeview.reload
+                    self.trees[tab_name] = treeview
+
+    def current_tab(self):
+        """Name of the tab on screen, or None before any tab exists."""
+        if not self.notebook.tabs():
+            return None
+        return self.notebook.tab(self.notebook.select(), "text")
+
+    def ensure_loaded(self, tab_name):
+        """Loads a tab the first time it is needed, or re-reads it if a write marked it stale."""
+        if tab_name not in self.loaders:
+            return
+        if tab_name not in self.loaded:
+            self.loaders[tab_name]()
+            self.loaded.add(tab_name)
+        elif tab_name in self.stale:
+            self.refreshers[tab_name]()
+        self.stale.discard(tab_name)
+
+    def load_current_tab(self):
+        """Loads the visible tab, then prefetches the next one once Tk is idle again."""
+        tab_name = self.current_tab()
+        if tab_name is None:
+            return
+        self.ensure_loaded(tab_name)
+
+        names = list(self.tabs)
+        next_index = names.index(tab_name) + 1
+        if next_index < len(names) and names[next_index] not in self.loaded:
+            self.after(PREFETCH_DELAY_MS, lambda: self.ensure_loaded(names[next_index]))
+
+    def setup_my_items_tab(self, parent, columns):
+        """Sets up the special 'My Items' tab with filtering controls."""
+        self.my_items_tab = parent
+        self.collection_var = StringVar()
+        self.show_inactive_var = tk.BooleanVar()
+
+        # Control panel: dropdown + checkbox
+        control_frame = tk.Frame(parent)
+        control_frame.pack(anchor="w", padx=10, pady=(10, 5))
+
+        tk.Label(control_frame, text="Choose a Collection:").pack(side="left")
+        self.collection_dropdown = ttk.Combobox(control_frame, textvariable=self.collection_var, state="readonly")
+        self.collection_dropdown.pack(side="left", padx=(5, 10))
+        self.collection_dropdown.bind("<<ComboboxSelected>>", self.on_collection_selected)
+
+        # Checkbox for toggling inactive items
+        tk.Checkbutton(
+            control_frame,
+            text="Show Inactive",
+            variable=self.show_inactive_var,
+            command=self.toggle_show_inactive
+        ).pack(side="left")
+
+        # Filter panel: criteria compile to a parameterized WHERE clause (see item_filters.py)
+        self.setup_item_filter_panel(parent)
+
+        # Footer totals for the whole filtered result (packed first so the grid can't push it off)
+        self.items_footer_var = StringVar()
+        tk.Label(parent, textvariable=self.items_footer_var, anchor="w").pack(side="bottom", fill="x", padx=10, pady=(0, 5))
+
+        # Treeview to display items
+        self.my_items_tree = self.create_treeview(parent, columns, self.tabs_config["My Items"]["key"])
+        self.item_tree = self.my_items_tree
+        self.item_tree.tree.bind("<Double-1>", self.on_double_click)
+
+    def setup_item_filter_panel(self, parent):
+        """Builds the price/value range, source, location, status and date-added filters."""
+        filter_frame = tk.Frame(parent)
+        filter_frame.pack(anchor="w", padx=10, pady=(0, 5))
+
+        self.filter_entries = {}
+        for column, (label, name) in enumerate((
+            ("Price", "price"), ("Value", "value"), ("Added (YYYY-MM-DD)", "added"),
+        )):
+            tk.Label(filter_frame, text=f"{label}:").grid(row=0, column=column * 4, sticky="w")
+            low = tk.Entry(filter_frame, width=10)
+            low.grid(row=0, column=column * 4 + 1, padx=(2, 0))
+            tk.Label(filter_frame, text="to").grid(row=0, column=column * 4 + 2, padx=2)
+            high = tk.Entry(filter_frame, width=10)
+            high.grid(row=0, column=column * 4 + 3, padx=(0, 10))
+            self.filter_entries[name] = (low, high)
+
+        # Facet dropdowns list each value with its count, e.g. "Acme (12)"
+        self.facet_vars = {}
+        self.facet_dropdowns = {}
+        self.facet_maps = {}
+        for column, facet in enumerate(item_filters.FACET_COLUMNS):
+            tk.Label(filter_frame, text=f"{facet}:").grid(row=1, column=column * 4, sticky="w", pady=(5, 0))
+            var = StringVar(value=FACET_ANY)
+            dropdown = ttk.Combobox(filter_frame, textvariable=var, state="readonly", width=22)
+            dropdown.grid(row=1, column=column * 4 + 1, columnspan=3, sticky="w", pady=(5, 0), padx=(2, 10))
+            dropdown.bind("<<ComboboxSelected>>", lambda event: self.apply_item_filters())
+            self.facet_vars[facet] = var
+            self.facet_dropdowns[facet] = dropdown
+
+        tk.Button(filter_frame, text="Apply", command=self.apply_item_filters).grid(row=0, column=12, padx=5)
+        tk.Button(filter_frame, text="Clear", command=self.clear_item_filters).grid(row=1, column=12, padx=5, pady=(5, 0))
+
+    def current_item_filter(self, collection_name):
+        """Reads the filter panel into an ItemFilter (raises ValueError on bad input)."""
+        def number(entry, label):
+            return to_cents(entry.get(), label)
+
+        def date(entry):
+            text = entry.get().strip()
+            if text and not ISO_DATE.match(text):
+                raise ValueError("Dates must be entered as YYYY-MM-DD.")
+            return text or None
+
+        price_low, price_high = self.filter_entries["price"]
+        value_low, value_high = self.filter_entries["value"]
+        added_low, added_high = self.filter_entries["added"]
+        facets = {
+            facet.lower(): self.facet_maps.get(facet, {}).get(var.get())
+            for facet, var in self.facet_vars.items()
+        }
+        return item_filters.for_logged_in_user(
+            collection=collection_name,
+            show_inactive=self.show_inactive_var.get(),
+            price_min=number(price_low, "Minimum price"),
+            price_max=number(price_high, "Maximum price"),
+            value_min=number(value_low, "Minimum value"),
+            value_max=number(value_high, "Maximum value"),
+            added_from=date(added_low),
+            added_to=date(added_high),
+            **facets,
+        )
+
+    def refresh_facets(self, item_filter):
+        """Reloads the facet dropdowns with counts for the current criteria."""
+        for facet, dropdown in self.facet_dropdowns.items():
+            counts = item_filters.facet_counts(item_filter, facet)
+            mapping = {f"{value} ({count})": value for value, count in counts}
+            self.facet_maps[facet] = mapping
+            dropdown["values"] = [FACET_ANY] + list(mapping)
+
+            # keep the selection, relabelled with its new count
+            selected = getattr(item_filter, facet.lower())
+            label = next((text for text, value in mapping.items() if value == selected), None)
+            self.facet_vars[facet].set(label or FACET_ANY)
+
+    def apply_item_filters(self):
+        collection = self.collection_var.get()
+        if collection:
+            self.load_items_for_collection(collection)
+
+    def refresh_my_items(self):
+        """Re-reads the visible items and their facet counts after a write."""
+        self.my_items_tree.reload()
+        collection = self.collection_var.get()
+        if collection:
+            try:
+                item_filter = self.current_item_filter(collection)
+            except ValueError:
+                return  # reported when the filter is applied
+            self.refresh_facets(item_filter)
+            self.refresh_items_footer(item_filter)
+
+    def clear_item_filters(self):
+        for low, high in self.filter_entries.values():
+            low.delete(0, tk.END)
+            high.delete(0, tk.END)
+        for var in self.facet_vars.values():
+            var.set(FACET_ANY)
+        self.apply_item_filters()
+
+    def setup_metrics_tab(self, parent, columns):
+        """Sets up the admin 'Metrics' dashboard, which reads the MetricRollup table instead of Log."""
+        self.granularity_var = StringVar(value="day")
+
+        control_frame = tk.Frame(parent)
+        control_frame.pack(anchor="w", padx=10, pady=(10, 5))
+
+        tk.Label(control_frame, text="Granularity:").pack(side="left")
+        granularity_dropdown = ttk.Combobox(
+            control_frame, textvariable=self.granularity_var,
+            values=tuple(metrics.GRANULARITIES), state="readonly"
+        )
+        granularity_dropdown.pack(side="left", padx=(5, 10))
+        granularity_dropdown.bind("<<ComboboxSelected>>", lambda event: self.load_metrics())
+
+        self.metrics_tree = self.create_treeview(parent, columns, self.tabs_config["Metrics"]["key"])
+
+    def load_metrics(self, keep_position=False):
+        """Flushes pending counters and reloads the dashboard from the rollup table."""
+        metrics.flush()
+        rows = metrics.query_rollups(self.granularity_var.get())
+        source = ListPageSource(rows, self.tabs_config["Metrics"]["columns"])
+        self.metrics_tree.set_source(source, keep_position=keep_position)
+
+    def toggle_show_inactive(self):
+        """Reload items when the 'Show Inactive' checkbox is toggled."""
+        collection = self.collection_var.get()
+        if collection:
+            self.load_items_for_collection(collection)
+
+    def load_collection_dropdown(self):
+        """Populates the collection dropdown for current user/admin."""
+        collections = self.collection_names()
+
+        self.collection_dropdown["values"] = collections
+        if collections:
+            self.collection_var.set(collections[0])
+            self.load_items_for_collection(collections[0])
+
+    def collection_names(self):
+        """Collections visible to the logged-in user (all of them for admin)."""
+        if is_admin():
+            return cache.get_values("SELECT CollectionName FROM Collection")
+        return cache.get_values("SELECT CollectionName FROM Collection WHERE User = ?", (get_logged_in_user(),))
+
+    def refresh_collection_dropdown(self):
+        """Refreshes the dropdown list of collections."""
+        self.collection_dropdown['values'] = self.collection_names()
+
+    def on_collection_selected(self, event):
+        """Handles dropdown selection event."""
+        selected = self.collection_var.get()
+        self.load_items_for_collection(selected)
+
+    def load_items_for_collection(self, collection_name):
+        """Loads items for the selected collection, filtered in SQL by the filter panel."""
+        try:
+            item_filter = self.current_item_filter(collection_name)
+        except ValueError as e:
+            messagebox.showerror("Filter Error", str(e))
+            return
+
+        # results (and their cached pages) are reused when the same criteria come back
+        tree = self.my_items_tree
+        tree.apply(tree.model.set_filter(item_filter))
+        self.refresh_facets(item_filter)
+        self.refresh_items_footer(item_filter)
+
+    def refresh_items_footer(self, item_filter):
+        """Shows count, sums, ranges and gain/loss of every item matching the filter."""
+        self.items_footer_var.set(items_footer(item_filters.item_totals(item_filter)))
+
+    def create_treeview(self, parent, columns, key=()):
+        """Creates a scrollable virtual treeview widget with sortable columns.
+
+        Key columns that are not displayed are appended as hidden columns so row identity
+        (ItemID, Username, BusinessName, ...) can be used as the Treeview iid.
+        """
+        hidden = tuple(column for column in key if column not in columns)
+        # integer-cent columns are shown as dollars; sorting still uses the stored cents
+        formatters = {column: lambda cents: format_money(cents, blank="") for column in columns if column in MONEY_COLUMNS}
+        tree = VirtualTreeview(parent, tuple(columns) + hidden, key_columns=key,
+                               display_columns=columns if hidden else None, formatters=formatters)
+        for col in columns:
+            tree.heading(col, text=MONEY_COLUMNS.get(col, col), command=lambda col=col: self.sort_items(tree, col))
+            tree.column(col, anchor="w", width=100)
+        # Shift-click on a heading adds the column as a secondary sort key
+        tree.tree.bind("<Shift-Button-1>", lambda event: self.on_heading_shift_click(tree, event))
+        tree.pack(fill="both", expand=True)
+        return tree
+
+    def populate_treeview(self, tree, query, params=(), table=None):
+        """Points the treeview at a query; rows are fetched a page at a time as the user scrolls.
+
+        The current sort order is kept, so re-filtering a sorted tab stays sorted.
+        """
+        tree.apply(tree.model.set_query(query, params, table))
+
+    def sort_items(self, treeview, column, extend=False):
+        """Handles clicking on a column header to sort the treeview.
+
+        A plain click sorts by that column alone (toggling direction if it is already the primary
+        key); with extend=True (shift-click) the column is added to, or toggled within, the sort keys.
+        """
+        order_by = toggle_sort(treeview.sort_order(), column, extend)
+        self.sort_treeview(treeview, order_by)
+        self.update_column_headings(treeview, order_by)
+
+    def on_heading_shift_click(self, treeview, event):
+        """Shift-click on a heading: multi-column sort."""
+        if treeview.tree.identify_region(event.x, event.y) != "heading":
+            return None
+        column_id = treeview.tree.identify_column(event.x)  # "#1", "#2", ... in display order
+        column = treeview.display_columns()[int(column_id[1:]) - 1]
+        self.sort_items(treeview, column, extend=True)
+        return "break"
+
+    def update_column_headings(self, treeview, order_by):
+        """Adds ↑ or ↓ (and the key position for multi-column sorts) to column headers."""
+        for column, text in heading_labels(treeview.display_columns(), order_by, MONEY_COLUMNS).items():
+            treeview.heading(column, text=text)
+
+    def sort_treeview(self, treeview, order_by):
+        """Sorts treeview rows with an ORDER BY in SQL (only the visible page is re-read)."""
+        try:
+            treeview.sort_by(order_by)
+        except ValueError as e:
+            messagebox.showerror("Sort Error", str(e))
+
+    def on_tab_changed(self, event):
+        """Handles tab switch event to update the sidebar buttons and load the tab's data."""
+        self.master.update_buttons()
+        self.load_current_tab()
+
+    def on_model_change(self, event):
+        """Queues a ChangeEvent; bursts (e.g. save + status) are applied once per Tk idle cycle."""
+        self.pending_changes.append(event)
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.after_idle(self.apply_model_changes)
+
+    def apply_model_changes(self):
+        """Marks the tabs touched by the queued events stale and re-reads the visible one."""
+        events, self.pending_changes = self.pending_changes, []
+        self.flush_scheduled = False
+        if not events:
+            return
+
+        affected = {LOG_TAB}
+        for event in events:
+            affected.update(MODEL_TABS.get(event.model, ()))
+        self.stale.update(affected & self.loaded)
+
+        # new/renamed/deleted collections change the My Items dropdown itself
+        if "My Items" in self.loaded and any(event.model == "Collection" for event in events):
+            self.refresh_collection_dropdown()
+
+        tab_name = self.current_tab()
+        if tab_name in self.stale:
+            self.ensure_loaded(tab_name)
+
+    def refresh_all(self):
+        """Marks every loaded tab stale and re-reads only the one on screen (diff-based)."""
+        self.stale.update(self.loaded)
+        tab_name = self.current_tab()
+        if tab_name in self.loaded:
+            self.ensure_loaded(tab_name)
+
+    def on_double_click(self, event):
+        """Shows the record behind a double-clicked row, looked up by the tab's key column."""
+        treeview = event.widget
+        selected = treeview.selection()
+        if not selected:
+            return
+
+        tab_name = self.current_tab()
+        config = self.tabs_config.get(tab_name, {})
+        model_mapping = {"Item": Item, "Collection": Collection, "User": User, "Source": Source}
+        model_cls = model_mapping.get(config.get("table"))
+        if not model_cls:
+            messagebox.showerror("Error", f"No model found for tab: {tab_name}")
+            return
+
+        try:
+            # the key (e.g. ItemID) is a hidden column of the row when it isn't displayed
+            column = config["key"][0]
+            values = treeview.item(selected[0])["values"]
+            show_record(model_cls, column, values[list(treeview["columns"]).index(column)])
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {e}")
+
+# Button panel on the left that displays buttons that correspond with the tab currently displayed
+class DynamicButtonPanel(tk.Frame):
+    """A panel with buttons that change dynamically based on the active tab."""
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.configure(padx=10, pady=10)
+        self.buttons = []
+        self.update_buttons("Users")
+
+        # static logout button
+        self.logout_button = tk.Button(self, text="Logout", command=self.logout)
+        self.logout_button.pack(side="bottom", pady=10, fill="x")
+        
+    def update_buttons(self, active_tab):
+        print(f"[DEBUG] Active Tab: {active_tab}")
+
+        # Clear existing buttons
+        for button in self.buttons:
+            button.destroy()
+        self.buttons.clear()
+
+        if active_tab == "Users":
+            self.add_button("Add User", self.add_user)
+            self.add_button("Update User", self.update_user)
+            self.add_button("Deactivate User", self.deactivate_user)
+            self.add_button("Reactivate User", self.reactivate_user)
+            self.add_button("Delete User", self.delete_user)
+            self.add_button("Back Up Database", self.backup_database)
+            self.add_button("Verify Backup...", self.verify_backup)
+
+        elif active_tab == "My Items":            
+            self.add_button("Add Item", self.add_item)
+            self.add_button("Deactivate Item", self.deactivate_item)
+            self.add_button("Update Item", self.update_item)
+            # self.add_button("Delete Item", self.delete_item)
+            self.add_button("Add Collection", self.add_collection)
+            self.add_button("Edit Collection", self.edit_collection)
+            self.add_button("Deactivate Collection", self.deactivate_collection)
+            self.add_button("Reactivate Collection", self.reactivate_collection)
+            self.add_button("Delete Collection", self.delete_collection)
+            self.add_button("Import Items...", self.import_items)
+            self.add_button("Collection Report...", self.collection_report)
+
+
+        elif active_tab == "Sources":
+            self.add_button("Add Source", self.add_source)
+            self.add_button("Update Source", self.update_source)
+            self.add_button("Delete Source", self.delete_source)
+            self.add_button("Import Sources...", self.import_sources)
+
+        # every tab can be exported as shown
+        self.add_button("Export...", lambda: self.export_tab(active_tab))
+
+    def add_button(self, text, command):
+        button = ttk.Button(self, text=text, command=command)
+        button.pack(fill="x", pady=5)
+        self.buttons.append(button)
+
+    def logout(self):
+
+        # Handle the logout process        
+        confirm = messagebox.askyesno("Confirm Logout", "Are you sure you want to log out?")
+        if not confirm:
+            return
+        # Close the application window, revert to the login window
+        self.master.destroy()
+        login_window = LoginWindow()
+
+    def export_tab(self, tab_name):
+        """Asks for a file name and exports the tab's current view to it."""
+        query = self.master.tab_viewer.export_query(tab_name)
+        if query is None:
+            messagebox.showinfo("Export", "Open a collection first to export its items.")
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self.master,
+            title=f"Export {tab_name}",
+            defaultextension=".csv",
+            initialfile=tab_name.replace(" ", "_"),
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")],
+        )
+        if not path:
+            return
+        try:
+            format_for(path)  # a typed-in extension such as .txt is refused before the window opens
+        except ValueError as e:
+            messagebox.showerror("Export", str(e))
+            return
+        ExportWindow(self.master, *query, path)
+
+    def import_items(self):
+        self.import_csv("Items", "Item")
+
+    def collection_report(self):
+        """Writes an HTML or PDF report of the user's collections (every collection for admins)."""
+        path = filedialog.asksaveasfilename(
+            parent=self.master,
+            title="Save Collection Report",
+            defaultextension=".html",
+            initialfile="collection_report",
+            filetypes=[("HTML", "*.html"), ("PDF", "*.pdf")],
+        )
+        if not path:
+            return
+
+        results = queue.Queue()
+        user, admin = get_logged_in_user(), is_admin()
+        show_inactive = self.master.tab_viewer.show_inactive_var.get()
+
+        def run():
+            try:
+                reports.write_report(path, user, admin, include_inactive=show_inactive)
+                results.put(None)
+            except (ValueError, OSError, sqlite3.Error) as e:
+                results.put(e)
+
+        def poll():
+            try:
+                error = results.get_nowait()
+            except queue.Empty:
+                self.after(EXPORT_POLL_MS, poll)
+                return
+            self.master.configure(cursor="")
+            if error is not None:
+                messagebox.showerror("Report Error", f"Could not create the report: {error}")
+            else:
+                log(f"{user} created a collection report.")
+                messagebox.showinfo("Report", f"Report saved to {path}.")
+
+        self.master.configure(cursor="watch")
+        threading.Thread(target=run, daemon=True).start()
+        self.after(EXPORT_POLL_MS, poll)
+
+    def backup_database(self):
+        """Admin only: online backup of the database, verified and rotated (see backup.py)."""
+        if not is_admin():
+            messagebox.showerror("Access Denied", "Only admins can back up the database.")
+            return
+        results = queue.Queue()
+        user = get_logged_in_user()
+
+        def run():
+            try:
+                results.put(backup.backup_database())
+            except (backup.BackupError, OSError, sqlite3.Error) as e:
+                results.put(e)
+
+        def poll():
+            try:
+                result = results.get_nowait()
+            except queue.Empty:
+                self.after(EXPORT_POLL_MS, poll)
+                return
+            self.master.configure(cursor="")
+            if isinstance(result, Exception):
+                messagebox.showerror("Backup Error", f"Could not back up the database: {result}")
+            else:
+                log(f"{user} backed up the database to {os.path.basename(result.path)}.")
+                messagebox.showinfo("Backup", f"Backup saved to {result.path} "
+                                              f"({result.bytes:,} bytes, integrity check passed).")
+
+        self.master.configure(cursor="watch")
+        threading.Thread(target=run, daemon=True).start()
+        self.after(EXPORT_POLL_MS, poll)
+
+    def verify_backup(self):
+        """Admin only: runs integrity_check on a backup file."""
+        if not is_admin():
+            messagebox.showerror("Access Denied", "Only admins can verify backups.")
+            return
+        folder = backup.backup_folder()
+        path = filedialog.askopenfilename(
+            parent=self.master,
+            title="Verify Backup",
+            initialdir=folder if os.path.isdir(folder) else None,
+            filetypes=[("Backups", "*.sqlite *.sqlite.gz"), ("All files", "*")],
+        )
+        if not path:
+            return
+        results = queue.Queue()
+        threading.Thread(target=lambda: results.put(backup.verify_backup(path)), daemon=True).start()
+
+        def poll():
+            try:
+                errors = results.get_nowait()
+            except queue.Empty:
+                self.after(EXPORT_POLL_MS, poll)
+                return
+            self.master.configure(cursor="")
+            if errors:
+                messagebox.showerror("Verify Backup", f"{os.path.basename(path)} is damaged:\n" + "\n".join(errors[:10]))
+            else:
+                messagebox.showinfo("Verify Backup", f"{os.path.basename(path)} passed the integrity check.")
+
+        self.master.configure(cursor="watch")
+        self.after(EXPORT_POLL_MS, poll)
+
+    def import_sources(self):
+        self.import_csv("Sources", "Source")
+
+    def import_csv(self, title, model):
+        path = filedialog.askopenfilename(
+            parent=self.master, title=f"Import {title}", filetypes=[("CSV", "*.csv")]
+        )
+        if path:
+            ImportWindow(self.master, model, path)
+
+    # --- User actions ---
+    # Windows no longer take a refresh callback from here: their model writes publish
+    # ChangeEvents and TabViewer refreshes only the affected tabs.
+    def add_user(self):
+        from crud_windows import AddUserWindow
+        AddUserWindow(self.master).grab_set()
+
+    def update_user(self):
+        from crud_windows import UpdateUserWindow
+        UpdateUserWindow(self.master).grab_set()
+
+    def deactivate_user(self):
+        from crud_windows import DeactivateUserWindow
+        DeactivateUserWindow(self.master).grab_set()
+
+    def reactivate_user(self):
+        from crud_windows import ReactivateUserWindow
+        ReactivateUserWindow(self.master).grab_set()
+
+    def edit_user(self):
+        messagebox.showinfo("Edit User", "Edit user functionality not implemented yet.")
+
+    def delete_user(self):
+        from crud_windows import DeleteUserWindow
+        DeleteUserWindow(self.master).grab_set()
+
+    # --- Item actions ---
+    def add_item(self):
+        from crud_windows import AddItemWindow
+        AddItemWindow(self.master).grab_set()
+
+    def deactivate_item(self):
+        from crud_windows import DeactivateItemWindow
+        DeactivateItemWindow(self.master).grab_set()
+    
+    
+    def update_item(self):
+        from crud_windows import UpdateItemWindow
+        UpdateItemWindow(self.master).grab_set()
+        
+
+    # def delete_item(self):
+    #     item_name = simpledialog.askstring("Delete Item", "Enter item name to delete:")
+    #     if item_name:
+    #         # Replace with actual deletion logic
+    #         messagebox.showinfo("Delete Item", "Delete item functionality not implemented yet.")
+    #         self.master.tab_viewer.refresh_all()
+
+    # --- Collection actions ---
+    def add_collection(self):
+        from crud_windows import AddCollectionWindow
+        AddCollectionWindow(self.master).grab_set()
+
+    def deactivate_collection(self):
+        from crud_windows import DeactivateCollectionWindow
+        DeactivateCollectionWindow(self.master).grab_set()
+
+    def reactivate_collection(self):
+        from crud_windows import ReactivateCollectionWindow
+        ReactivateCollectionWindow(self.master).grab_set()
+
+    def delete_collection(self):
+        from crud_windows import DeleteCollectionWindow
+        DeleteCollectionWindow(self.master).grab_set()
+
+
+    def edit_collection(self):
+        messagebox.showinfo("Edit Collection", "Edit collection functionality not implemented yet.")
+
+    # --- Source actions ---
+    def add_source(self):
+        from crud_windows import AddSourceWindow
+        AddSourceWindow(self.master).grab_set()
+
+    def update_source(self):
+        from crud_windows import UpdateSourceWindow
+        UpdateSourceWindow(self.master).grab_set()
+
+    def delete_source(self):
+        business_name = simpledialog.askstring("Delete Source", "Enter business name to delete:")
+        if business_name:
+            # Replace with actual deletion logic
+            messagebox.showinfo("Delete Source", "Delete source functionality not implemented yet.")
+            self.master.tab_viewer.refresh_all()
+
+    def dummy_action(self):
+        print("Button clicked!")
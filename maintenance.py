@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+
+# Program:          maintenance module
+# Associated file:  maintenance.py
+# Purpose:          Housekeeping for collections.sqlite, done in small slices while nobody is using it.
+#                   Deletes, deactivations and log churn leave free pages behind and make the planner's
+#                   statistics stale; each step here fixes one of those, and each runs under a time budget
+#                   (enforced with Connection.interrupt) so it never holds a lock long enough to be noticed:
+#
+#                       checkpoint   copy the WAL back into the database (WAL databases only)
+#                       vacuum       PRAGMA incremental_vacuum, a few pages at a time
+#                       analyze      ANALYZE the tables whose row counts drifted from sqlite_stat1
+#                       optimize     PRAGMA optimize
+#
+#                   The GUI runs one step at a time after it has been idle for a while (see
+#                   MaintenanceScheduler); cron can run them all with `python -m collectionmanager maintain`.
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from db import DATABASE
+
+# time budget per step (seconds): the GUI keeps it short, the CLI default is longer
+STEP_BUDGET = 0.25
+CLI_STEP_BUDGET = 2.0
+
+# how long a step may wait for a lock before giving up until next time (milliseconds)
+LOCK_WAIT_MS = 50
+
+# an exact ANALYZE reads every index entry (75k items x 11 indexes took 86 ms, ~10M entries/s);
+# when that would not fit in half the time left, the table is sampled at ANALYSIS_LIMIT rows per
+# index instead, which is fast but only estimates row counts
+ANALYZE_ENTRIES_PER_SECOND = 5_000_000
+ANALYSIS_LIMIT = 1000
+
+# re-analyze a table when its row count moved this much since the last ANALYZE
+STALE_RATIO = 0.1
+
+# free pages reclaimed per PRAGMA incremental_vacuum (each page costs roughly 0.7 ms to move)
+VACUUM_PAGES = 64
+
+# GUI: idle time before maintenance starts, pause between passes and polling interval
+IDLE_SECONDS = 60
+PASS_INTERVAL_SECONDS = 30 * 60
+CHECK_INTERVAL_MS = 5_000
+
+# a step that runs out of budget is retried on later idle ticks, at most this often per pass
+STEP_ATTEMPTS = 3
+
+
+@dataclass
+class StepResult:
+    step: str
+    seconds: float
+    finished: bool      # False when the budget ran out or the database was busy; the step is retried
+    detail: str = ""
+
+
+class Budget:
+    """Deadline for one step; interrupts the running statement when it passes."""
+
+    def __init__(self, conn, seconds):
+        self.deadline = time.perf_counter() + seconds
+        self.timer = threading.Timer(seconds, conn.interrupt)
+        self.timer.daemon = True
+
+    def left(self):
+        return self.deadline - time.perf_counter()
+
+    def __enter__(self):
+        self.timer.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.cancel()
+
+
+def maintenance_connection(database, lock_wait_ms=LOCK_WAIT_MS):
+    """Autocommit connection that gives up quickly on locks instead of queueing behind users."""
+    conn = sqlite3.connect(database, isolation_level=None)
+    conn.execute(f"PRAGMA busy_timeout = {lock_wait_ms}")
+    return conn
+
+
+##### STEPS #####
+# Each step takes (conn, budget) and returns (finished, detail).
+
+def step_checkpoint(conn, budget):
+    if conn.execute("PRAGMA journal_mode").fetchone()[0].lower() != "wal":
+        return True, "not a WAL database"
+    busy, frames, copied = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+    if busy or copied < frames:
+        return False, f"{copied} of {frames} WAL frames copied (readers active)"
+    if frames:
+        # everything is copied back: shrink the -wal file too; this waits at most LOCK_WAIT_MS
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    return True, f"{frames} WAL frames copied"
+
+
+def step_vacuum(conn, budget):
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        hint = " (run `collectionmanager vacuum` once to enable it)" if pages and free / pages > 0.1 else ""
+        return True, f"incremental vacuum is off, {free} free pages{hint}"
+    reclaimed = 0
+    while free and budget.left() > 0:
+        conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES})").fetchall()
+        left = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        reclaimed += free - left
+        free = left
+    return not free, f"{reclaimed} pages reclaimed, {free} free"
+
+
+def analyzed_tables(conn):
+    """Tables whose indexes ANALYZE is worth running on: app tables, not sqlite_ or FTS shadow tables."""
+    virtual = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%'")]
+    tables = [row[0] for row in conn.execute(
+        "SELECT DISTINCT tbl_name FROM sqlite_master WHERE type = 'index' AND tbl_name NOT LIKE 'sqlite%'")]
+    return [table for table in tables if not any(table.startswith(f"{name}_") for name in virtual)]
+
+
+def stale_tables(conn, budget):
+    """Yields (table, rows, analyzed_rows) for tables never analyzed or whose size drifted."""
+    analyzed = {}
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+        for table, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1"):
+            rows = int(stat.split()[0])
+            analyzed[table] = max(rows, analyzed.get(table, 0))
+    for table in analyzed_tables(conn):
+        if budget.left() <= 0:
+            return
+        rows = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+        before = analyzed.get(table)
+        if before is None or abs(rows - before) > STALE_RATIO * max(before, 1):
+            yield table, rows, before
+
+
+def step_analyze(conn, budget):
+    done = []
+    for table, rows, before in stale_tables(conn, budget):
+        indexes = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND tbl_name = ?",
+                               (table,)).fetchone()[0]
+        exact = rows * indexes <= budget.left() * ANALYZE_ENTRIES_PER_SECOND
+        conn.execute(f"PRAGMA analysis_limit = {0 if exact else ANALYSIS_LIMIT}")
+        conn.execute(f'ANALYZE "{table}"')
+        done.append(f"{table} ({'never' if before is None else f'{before:,}'} -> {rows:,} rows)")
+        if budget.left() <= 0:
+            return False, "analyzed " + ", ".join(done)
+    if budget.left() <= 0:
+        return False, "out of time counting rows"
+    return True, ("analyzed " + ", ".join(done)) if done else "statistics are current"
+
+
+def step_optimize(conn, budget):
+    # 0x10000 asks SQLite 3.46+ to check every table, not only those this connection queried;
+    # older versions ignore the bit, and step_analyze has covered the drifted tables anyway
+    conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+    conn.execute("PRAGMA optimize = 0x10002")
+    return True, "done"
+
+
+STEPS = {
+    "checkpoint": step_checkpoint,
+    "vacuum": step_vacuum,
+    "analyze": step_analyze,
+    "optimize": step_optimize,
+}
+
+
+def run_step(name, database=DATABASE, budget=STEP_BUDGET):
+    """Runs one step under its time budget; returns a StepResult. Never raises on locks or timeouts."""
+    started = time.perf_counter()
+    conn = maintenance_connection(database)
+    try:
+        with Budget(conn, budget) as deadline:
+            finished, detail = STEPS[name](conn, deadline)
+    except sqlite3.OperationalError as e:
+        # "interrupted" when the budget ran out, "database is locked" when users got there first;
+        # an interrupted statement is rolled back, so the step is simply retried later
+        finished, detail = False, str(e)
+    finally:
+        conn.close()
+    return StepResult(name, round(time.perf_counter() - started, 3), finished, detail)
+
+
+def run_all(database=DATABASE, budget=CLI_STEP_BUDGET, steps=None):
+    """Runs the steps (all by default) one after another; returns their StepResults."""
+    return [run_step(name, database, budget) for name in (steps or STEPS)]
+
+
+class MaintenanceScheduler:
+    """Runs one maintenance step at a time in a background thread while the user is idle.
+
+    The front end calls note_activity() on input and tick() periodically. A pass over all steps
+    starts once the user has been idle for idle_seconds, at most every pass_interval seconds.
+    """
+
+    def __init__(self, database=DATABASE, budget=STEP_BUDGET, idle_seconds=IDLE_SECONDS,
+                 pass_interval=PASS_INTERVAL_SECONDS):
+        self.database = database
+        self.budget = budget
+        self.idle_seconds = idle_seconds
+        self.pass_interval = pass_interval
+        self.last_activity = time.monotonic()
+        self.last_pass = None       # when the last pass finished
+        self.pending = []           # steps left in the current pass
+        self.attempts = {}
+        self.results = []           # StepResults of the current or last pass
+        self.running = None         # thread of the step being run
+
+    def note_activity(self, event=None):
+        self.last_activity = time.monotonic()
+
+    def idle(self):
+        return time.monotonic() - self.last_activity >= self.idle_seconds
+
+    def next_step(self):
+        """The step to run now, or None (busy user, step in flight, or nothing due)."""
+        if (self.running and self.running.is_alive()) or not self.idle():
+            return None
+        if not self.pending:
+            if self.last_pass is not None and time.monotonic() - self.last_pass < self.pass_interval:
+                return None
+            self.pending = list(STEPS)
+            self.attempts = {}
+            self.results = []
+        return self.pending[0]
+
+    def tick(self):
+        """Starts the next due step in the background; returns its name or None."""
+        name = self.next_step()
+        if name is None:
+            return None
+        self.attempts[name] = self.attempts.get(name, 0) + 1
+        self.running = threading.Thread(target=self.run, args=(name,), daemon=True)
+        self.running.start()
+        return name
+
+    def run(self, name):
+        result = run_step(name, self.database, self.budget)
+        self.results.append(result)
+        print(f"[DEBUG] Maintenance {result.step}: {result.detail} ({result.seconds * 1000:.0f} ms)")
+        if result.finished or self.attempts[name] >= STEP_ATTEMPTS:
+            self.pending.remove(name)
+            if not self.pending:
+                self.last_pass = time.monotonic()
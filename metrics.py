@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+# Program:          metrics module
+# Associated file:  metrics.py
+# Purpose:          This module keeps in-process counters and histograms for the actions the app logs
+#                   (logins, items added, deactivations, collection status changes) and periodically
+#                   rolls them up into the MetricRollup table so the admin dashboard never has to scan Log.
+
+##### TABLE SCHEMA #####
+
+# CREATE TABLE "MetricRollup" (
+# 	"Name"	TEXT NOT NULL,
+# 	"Label"	TEXT NOT NULL DEFAULT '',
+# 	"Granularity"	TEXT NOT NULL,       -- 'minute', 'hour' or 'day'
+# 	"PeriodStart"	TEXT NOT NULL,       -- '%Y-%m-%d %H:%M:00' truncated to the granularity
+# 	"Count"	INTEGER NOT NULL DEFAULT 0,
+# 	"Total"	REAL NOT NULL DEFAULT 0,
+# 	"MinValue"	REAL,
+# 	"MaxValue"	REAL,
+# 	PRIMARY KEY("Name", "Label", "Granularity", "PeriodStart")
+# ) WITHOUT ROWID
+
+import sqlite3
+import threading
+from datetime import datetime
+
+DATABASE = "collections.sqlite"
+
+# how often the GUI flushes the registry into MetricRollup (milliseconds)
+FLUSH_INTERVAL_MS = 60_000
+
+# granularity name -> strftime pattern that truncates a timestamp to the start of its period
+GRANULARITIES = {
+    "minute": "%Y-%m-%d %H:%M:00",
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+
+# metric names used by the app
+LOGINS = "logins"
+ITEMS_ADDED = "items_added"
+ITEMS_DEACTIVATED = "items_deactivated"
+USERS_DEACTIVATED = "users_deactivated"
+USERS_REACTIVATED = "users_reactivated"
+COLLECTIONS_ADDED = "collections_added"
+COLLECTION_STATUS_CHANGES = "collection_status_changes"
+ITEM_PRICE_PAID = "item_price_paid_cents"  # histogram
+
+
+def ensure_schema(conn):
+    """Creates the MetricRollup table if it does not exist yet."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS MetricRollup (
+            Name        TEXT NOT NULL,
+            Label       TEXT NOT NULL DEFAULT '',
+            Granularity TEXT NOT NULL,
+            PeriodStart TEXT NOT NULL,
+            Count       INTEGER NOT NULL DEFAULT 0,
+            Total       REAL NOT NULL DEFAULT 0,
+            MinValue    REAL,
+            MaxValue    REAL,
+            PRIMARY KEY (Name, Label, Granularity, PeriodStart)
+        ) WITHOUT ROWID
+    """)
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters and histograms bucketed by minute."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (name, label, minute) -> [count, total, min, max]
+        self._buckets = {}
+
+    def incr(self, name, label="", amount=1):
+        """Adds amount to a counter."""
+        self._record(name, label, amount, None)
+
+    def observe(self, name, value, label=""):
+        """Records one sample of a histogram (count, total, min and max are kept)."""
+        self._record(name, label, 1, float(value))
+
+    def _record(self, name, label, count, value):
+        minute = datetime.now().strftime(GRANULARITIES["minute"])
+        key = (name, label or "", minute)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [0, 0.0, None, None]
+            bucket[0] += count
+            if value is not None:
+                bucket[1] += value
+                bucket[2] = value if bucket[2] is None else min(bucket[2], value)
+                bucket[3] = value if bucket[3] is None else max(bucket[3], value)
+
+    def snapshot(self):
+        """Returns the unflushed buckets without clearing them."""
+        with self._lock:
+            return {key: list(bucket) for key, bucket in self._buckets.items()}
+
+    def flush(self, database=None):
+        """Persists pending buckets into MetricRollup at every granularity; returns rows written."""
+        with self._lock:
+            pending, self._buckets = self._buckets, {}
+        if not pending:
+            return 0
+
+        # fold the minute buckets into every granularity before touching the database
+        rollups = {}
+        for (name, label, minute), (count, total, low, high) in pending.items():
+            stamp = datetime.strptime(minute, GRANULARITIES["minute"])
+            for granularity, pattern in GRANULARITIES.items():
+                key = (name, label, granularity, stamp.strftime(pattern))
+                row = rollups.setdefault(key, [0, 0.0, None, None])
+                row[0] += count
+                row[1] += total
+                if low is not None:
+                    row[2] = low if row[2] is None else min(row[2], low)
+                    row[3] = high if row[3] is None else max(row[3], high)
+
+        try:
+            conn = sqlite3.connect(database or DATABASE)
+            with conn:
+                ensure_schema(conn)
+                conn.executemany("""
+                    INSERT INTO MetricRollup (Name, Label, Granularity, PeriodStart, Count, Total, MinValue, MaxValue)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (Name, Label, Granularity, PeriodStart) DO UPDATE SET
+                        Count = Count + excluded.Count,
+                        Total = Total + excluded.Total,
+                        MinValue = CASE WHEN MinValue IS NULL OR excluded.MinValue < MinValue
+                                        THEN excluded.MinValue ELSE MinValue END,
+                        MaxValue = CASE WHEN MaxValue IS NULL OR excluded.MaxValue > MaxValue
+                                        THEN excluded.MaxValue ELSE MaxValue END
+                """, [key + tuple(row) for key, row in rollups.items()])
+            conn.close()
+        except sqlite3.Error as e:
+            # put the samples back so the next flush can retry them
+            self._restore(pending)
+            print(f"[Metrics Error] {e}")
+            return 0
+
+        return len(rollups)
+
+    def _restore(self, pending):
+        with self._lock:
+            for key, (count, total, low, high) in pending.items():
+                bucket = self._buckets.setdefault(key, [0, 0.0, None, None])
+                bucket[0] += count
+                bucket[1] += total
+                if low is not None:
+                    bucket[2] = low if bucket[2] is None else min(bucket[2], low)
+                    bucket[3] = high if bucket[3] is None else max(bucket[3], high)
+
+
+# shared registry for the whole process
+registry = MetricsRegistry()
+
+
+def incr(name, label="", amount=1):
+    registry.incr(name, label, amount)
+
+
+def observe(name, value, label=""):
+    registry.observe(name, value, label)
+
+
+def flush(database=None):
+    return registry.flush(database)
+
+
+def rollup_query(granularity="day", name=None, since=None):
+    """Returns the (query, params) behind query_rollups (also used to export the dashboard)."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}'.")
+
+    query = """
+        SELECT Name, Label, PeriodStart, Count, Total, MinValue, MaxValue
+        FROM MetricRollup
+        WHERE Granularity = ?
+    """
+    params = [granularity]
+    if name:
+        query += " AND Name = ?"
+        params.append(name)
+    if since:
+        query += " AND PeriodStart >= ?"
+        params.append(since)
+    query += " ORDER BY PeriodStart DESC, Name, Label"
+    return query, params
+
+
+def query_rollups(granularity="day", name=None, since=None, database=None):
+    """Returns (Name, Label, PeriodStart, Count, Total, MinValue, MaxValue) rows from MetricRollup."""
+    query, params = rollup_query(granularity, name, since)
+    conn = sqlite3.connect(database or DATABASE)
+    ensure_schema(conn)
+    rows = conn.execute(query, params).fetchall()
+    conn.close()
+    return rows
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+
+# Program:          model dialogs module
+# Associated file:  model_dialogs.py
+# Purpose:          Presentation adapter for the models. The data layer (models.py, db.py, log.py) has no
+#                   GUI imports so it can be used from the CLI, worker threads and worker processes; the
+#                   message boxes that display records live here instead.
+
+from tkinter import messagebox
+
+
+def show_details(record, title="Details"):
+    """Shows every field of a model instance in an info dialog."""
+    messagebox.showinfo(title, record.to_display_string())
+
+
+def show_record(model_cls, column, value, title=None):
+    """Looks a record up by column and shows it, or reports that it wasn't found."""
+    record = model_cls.get_by_identifier(column, value)
+    name = model_cls.__name__
+    if not record:
+        messagebox.showerror("Error", f"{name} with {column} '{value}' not found.")
+        return None
+    show_details(record, title or f"{name} Details")
+    return record
@@ -1,10 +1,12 @@
 # %%
 import sqlite3
-from dataclasses import dataclass, field
-from typing import Optional
-from tkinter import messagebox
-from log import log
-from db import connect, login  # Ensure the login function from db.py is imported
+from collections import namedtuple
+from datetime import datetime
+from db import connect, run_write
+
+# This module is imported by every front end, so it stays cheap to import: plain classes instead of
+# dataclasses (the dataclasses module alone costs more than the rest of the data layer) and money.py
+# only when a record is displayed.
 
 
 # models/
@@ -19,7 +21,8 @@ from db import connect, login  # Ensure the login function from db.py is importe
     # execute query - helper function for executing an SQL query
     # get_by_identifier - selects a record by its identifier (Username BusinessName, CollectionName, ItemName, )
     # get_all - selects every record by the identifier; used for dropdown selection menus
-    # validate_and_convert_numeric - converts to an int or a float
+    # validate_and_convert_numeric - converts to an int or a float (money uses money.to_cents instead)
+    # (dialogs that display records live in model_dialogs.py; this module never imports tkinter)
 
 # objects
 # ├── User           ← Stores users registered for the application
@@ -39,14 +42,123 @@ DATABASE = "collections.sqlite"
 def get_connection():
     return sqlite3.connect(DATABASE)
 
+
+##### CHANGE EVENTS #####
+
+# Every model write publishes a ChangeEvent. Subscribers (lookup caches, TabViewer, summary
+# panels) use it to refresh only what changed instead of reloading everything.
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+STATUS = "status"            # Status column changed on one row
+BULK_STATUS = "bulk_status"  # Status changed on many rows (key is the parent, e.g. a collection)
+
+
+# model:     table name: "Item", "User", "Source", "Collection"
+# key:       identifier value of the changed row (None when unknown)
+# operation: one of INSERT, UPDATE, DELETE, STATUS, BULK_STATUS
+# status:    new status for STATUS / BULK_STATUS events
+# rows:      ((before, after), ...) column dicts of the changed rows, read in the writing transaction
+#            (before is None for an insert, after for a delete); None when the writer didn't record
+#            them, e.g. bulk writes. Lets subscribers such as the footer totals apply the change
+#            instead of re-querying.
+ChangeEvent = namedtuple("ChangeEvent", ("model", "key", "operation", "status", "rows"), defaults=(None, None))
+
+# writes touching more rows than this publish rows=None (subscribers re-query instead)
+TRACKED_ROWS_LIMIT = 500
+
+
+def row_snapshots(conn, table, rowids):
+    """{rowid: {column: value}} for the given rows of table, read on conn."""
+    if not rowids:
+        return {}
+    cursor = conn.execute(f"SELECT rowid, * FROM {table} WHERE rowid IN ({', '.join('?' * len(rowids))})",
+                          tuple(rowids))
+    columns = [description[0] for description in cursor.description[1:]]
+    return {row[0]: dict(zip(columns, row[1:])) for row in cursor}
+
+
+def tracked_write(conn, table, where, params, write):
+    """Runs write() on conn and returns ChangeEvent.rows for the rows of table matching where."""
+    rowids = [row[0] for row in conn.execute(f"SELECT rowid FROM {table} WHERE {where}", params)]
+    if len(rowids) > TRACKED_ROWS_LIMIT:
+        write()
+        return None
+    before = row_snapshots(conn, table, rowids)
+    write()
+    after = row_snapshots(conn, table, rowids)
+    return tuple((before.get(rowid), after.get(rowid)) for rowid in rowids)
+
+
+def tracked_insert(conn, table, sql, params):
+    """Runs an INSERT on conn; returns (rowid, ChangeEvent.rows) for the new row."""
+    rowid = conn.execute(sql, params).lastrowid
+    return rowid, ((None, row_snapshots(conn, table, [rowid]).get(rowid)),)
+
+
+# (callback, model filter or None for every model)
+_subscribers = []
+
+def subscribe(callback, model=None):
+    """Calls callback(event) for every ChangeEvent (only for one model if given)."""
+    _subscribers.append((callback, model))
+    return callback
+
+def unsubscribe(callback):
+    _subscribers[:] = [(cb, model) for cb, model in _subscribers if cb is not callback]
+
+def publish(event):
+    for callback, model in list(_subscribers):
+        if model is not None and model != event.model:
+            continue
+        try:
+            callback(event)
+        except Exception as e:
+            print(f"[Change subscriber error] {e}")
+
 ##### BASE MODEL #####
 
 
 
-@dataclass
+# marks a field without a default in FIELDS
+REQUIRED = object()
+
+
 class BaseModel:
-    table_name: str
-    identifier_column: str
+    """A row of table_name. Subclasses list their columns in FIELDS as (name, default) pairs, in
+    constructor and INSERT order; fields with a REQUIRED default must be passed."""
+
+    FIELDS = ()
+    table_name = None
+    identifier_column = None
+
+    def __init__(self, *args, **kwargs):
+        name = type(self).__name__
+        names = [field_name for field_name, _ in self.FIELDS]
+        if len(args) > len(names):
+            raise TypeError(f"{name}() takes {len(names)} arguments but {len(args)} were given")
+        values = dict(zip(names, args))
+        for key, value in kwargs.items():
+            if key not in names:
+                raise TypeError(f"{name}() got an unexpected keyword argument '{key}'")
+            if key in values:
+                raise TypeError(f"{name}() got multiple values for argument '{key}'")
+            values[key] = value
+        for field_name, default in self.FIELDS:
+            if field_name not in values and default is REQUIRED:
+                raise TypeError(f"{name}() missing required argument: '{field_name}'")
+            setattr(self, field_name, values.get(field_name, default))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in vars(self).items())})"
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return vars(self) == vars(other)
+
+    __hash__ = None
 
     @classmethod
     def get_by_values(cls, values_dict):
@@ -72,14 +184,19 @@ class BaseModel:
         #     return  # Or raise an exception, or update instead
 
         # Insert new record
-        fields, values = self.get_fields_and_values()
-        placeholders = ', '.join('?' for _ in fields)
-        sql = f"INSERT INTO {self.table_name} ({', '.join(fields)}) VALUES ({placeholders})"
-        self.execute_query(sql, values)
+        sql, values = self.insert_statement()
+        _, rows = self.execute_write(lambda conn: tracked_insert(conn, self.table_name, sql, values))
+        publish(ChangeEvent(self.table_name, getattr(self, self.identifier_column, None), INSERT, rows=rows))
 
         # Optionally set status to Active
         self.update_status("Active")
 
+    def insert_statement(self):
+        """Returns (sql, values) inserting this record; lets callers run it on their own connection."""
+        fields, values = self.get_fields_and_values()
+        placeholders = ', '.join('?' for _ in fields)
+        return f"INSERT INTO {self.table_name} ({', '.join(fields)}) VALUES ({placeholders})", values
+
     def update(self, identifier_column="id", identifier_value=None):
         fields = self.__dict__.copy()
         if identifier_value is None:
@@ -93,27 +210,35 @@ class BaseModel:
         query = f"UPDATE {self.__class__.__name__} SET {set_clause} WHERE {identifier_column} = ?"
         values.append(identifier_value)
 
-        with connect() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, values)
-            conn.commit()
+        rows = run_write(lambda conn: tracked_write(conn, self.__class__.__name__, f"{identifier_column} = ?",
+                                                    (identifier_value,), lambda: conn.execute(query, values)))
+        publish(ChangeEvent(self.__class__.__name__, identifier_value, UPDATE, rows=rows))
 
 
     def delete(self):
         sql = f"DELETE FROM {self.table_name} WHERE {self.identifier_column} = ?"
-        self.execute_query(sql, (getattr(self, self.identifier_column),))
+        key = (getattr(self, self.identifier_column),)
+        rows = self.execute_write(lambda conn: tracked_write(conn, self.table_name, f"{self.identifier_column} = ?",
+                                                             key, lambda: conn.execute(sql, key)))
+        publish(ChangeEvent(self.table_name, key[0], DELETE, rows=rows))
 
     def update_status(self, new_status):
         sql = f"UPDATE {self.table_name} SET Status = ? WHERE {self.identifier_column} = ?"
-        self.execute_query(sql, (new_status, getattr(self, self.identifier_column)))
+        key = (getattr(self, self.identifier_column),)
+        rows = self.execute_write(lambda conn: tracked_write(conn, self.table_name, f"{self.identifier_column} = ?",
+                                                             key, lambda: conn.execute(sql, (new_status,) + key)))
         setattr(self, "Status", new_status)
+        publish(ChangeEvent(self.table_name, key[0], STATUS, new_status, rows))
 
     @staticmethod
     def execute_query(query, params=()):
-        with sqlite3.connect("collections.sqlite") as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchall()
+        # busy_timeout plus retry, so another instance holding the write lock doesn't fail the save
+        return run_write(lambda conn: conn.execute(query, params).fetchall(), database="collections.sqlite")
+
+    @staticmethod
+    def execute_write(job):
+        """Runs job(conn) in a retried write transaction and returns its result."""
+        return run_write(job, database="collections.sqlite")
 
     
     
@@ -163,6 +288,11 @@ class BaseModel:
 
         return [cls.from_row(row) for row in rows]
 
+    @classmethod
+    def from_row(cls, row):
+        """Builds a model from a sqlite3.Row (connect() returns rows keyed by column name)."""
+        return cls(**dict(zip(row.keys(), row)))
+
     @staticmethod
     def validate_and_convert_numeric(value, field_name):
         try:
@@ -170,33 +300,30 @@ class BaseModel:
         except ValueError:
             raise ValueError(f"{field_name} must be a valid number.")
 
-    def show_item_details(self, item_identifier):
-        item = self.get_by_identifier(item_identifier)
-        if not item:
-            messagebox.showerror("Error", f"Item with identifier '{item_identifier}' not found.")
-            return
-
-        fields, values = item.get_fields_and_values()
-        details = "\n".join(f"{f}: {v}" for f, v in zip(fields, values))
-        messagebox.showinfo("Item Details", details)
-
     def to_display_string(self):
+        from money import MONEY_COLUMNS, format_money
+
         fields, values = self.get_fields_and_values()
-        return "\n".join(f"{f}: {v}" for f, v in zip(fields, values))
+        # integer-cent columns are shown as dollars under their plain names
+        return "\n".join(
+            f"{MONEY_COLUMNS[f]}: {format_money(v)}" if f in MONEY_COLUMNS else f"{f}: {v}"
+            for f, v in zip(fields, values)
+        )
 
 ###### USER #####
 
 
-@dataclass
 class User(BaseModel):
-    Username: str
-    Password: str
-    Role: str
-    Status: str = "Active"
-    UserID: Optional[int] = field(default=None, repr=False)
+    FIELDS = (
+        ("Username", REQUIRED),
+        ("Password", REQUIRED),
+        ("Role", REQUIRED),
+        ("Status", "Active"),
+        ("UserID", None),
+    )
 
-    table_name:        str = field(init=False, repr=False, default="User")
-    identifier_column: str = field(init=False, default="Username")
+    table_name = "User"
+    identifier_column = "Username"
 
     @classmethod
     def from_row(cls, row):
@@ -228,52 +355,57 @@ class User(BaseModel):
         
 
 
-@dataclass
 class Item(BaseModel):
-    Collection: str
-    User: str
-    ItemName: str
-    Source: str
-
-    Status: str = field(default="Active", init=True)
-
-    Description: Optional[str] = field(default=None, init=True, repr=False)
-    PricePaid: Optional[float] = field(default=None, init=True, repr=False)
-    CurrentValue: Optional[float] = field(default=None, init=True, repr=False)
-    Location: Optional[str] = field(default=None, init=True, repr=False)
-    Notes: Optional[str] = field(default=None, init=True, repr=False)
-    ItemID: Optional[int] = field(default=None, init=True, repr=False)
-
-    table_name: str = field(init=False, default="Item")
-    identifier_column: str = field(init=False, default="ItemID")
+    FIELDS = (
+        ("Collection", REQUIRED),
+        ("User", REQUIRED),
+        ("ItemName", REQUIRED),
+        ("Source", REQUIRED),
+        ("Status", "Active"),
+        ("Description", None),
+        ("PricePaidCents", None),       # see money.py
+        ("CurrentValueCents", None),
+        ("Location", None),
+        ("Notes", None),
+        ("ItemID", None),
+        ("DateAdded", None),
+    )
+
+    table_name = "Item"
+    identifier_column = "ItemID"
 
     def get_fields_and_values(self):
         """Return fields and their values for database operations."""
-        fields = ["Collection", "User", "ItemName", "Source", "Status", "Description", "PricePaid", "CurrentValue", "Location", "Notes"]
-        values = [self.Collection, self.User, self.ItemName, self.Source, self.Status, self.Description, self.PricePaid, self.CurrentValue, self.Location, self.Notes]
+        fields = ["Collection", "User", "ItemName", "Source", "Status", "Description", "PricePaidCents", "CurrentValueCents", "Location", "Notes", "DateAdded"]
+        values = [self.Collection, self.User, self.ItemName, self.Source, self.Status, self.Description, self.PricePaidCents, self.CurrentValueCents, self.Location, self.Notes, self.DateAdded]
         return fields, values
 
+    def insert_statement(self):
+        # stamp new items so they can be filtered by date added
+        if not self.DateAdded:
+            self.DateAdded = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return super().insert_statement()
+
 ###### SOURCE #####
 
 
-@dataclass
 class Source(BaseModel):
-    BusinessName: str
-    FirstName: str
-    Phone: str
-    Email: str
-
-    Status: str = field(default="Active", init=True)
-
-    LastName: Optional[str] = field(default="", init=True, repr=False)
-    City: Optional[str] = field(default="", init=True, repr=False)
-    Address: Optional[str] = field(default="", init=True, repr=False)
-    State: Optional[str] = field(default="", init=True, repr=False)
-    Zip: Optional[str] = field(default="", init=True, repr=False)
-    SourceID: Optional[int] = field(init=True, default=None)  # Allow initialization
-
-    table_name: str = field(init=False, default="Source")
-    identifier_column: str = field(init=False, default="BusinessName")
+    FIELDS = (
+        ("BusinessName", REQUIRED),
+        ("FirstName", REQUIRED),
+        ("Phone", REQUIRED),
+        ("Email", REQUIRED),
+        ("Status", "Active"),
+        ("LastName", ""),
+        ("City", ""),
+        ("Address", ""),
+        ("State", ""),
+        ("Zip", ""),
+        ("SourceID", None),  # Allow initialization
+    )
+
+    table_name = "Source"
+    identifier_column = "BusinessName"
 
     @classmethod
     def get_by_name(cls, business_name):
@@ -294,29 +426,20 @@ class Source(BaseModel):
 ###### COLLECTION #####
 
 
-@dataclass
 class Collection(BaseModel):
+    FIELDS = (
+        ("User", REQUIRED),
+        ("CollectionName", REQUIRED),
+        ("Status", "Active"),
+    )
 
-    User: str
-    CollectionName: str    
-    Status: str = field(default="Active", init=True)
-
-    table_name: str = field(init=False, default="Collection")
-    identifier_column: str = field(init=False, default="CollectionName")
+    table_name = "Collection"
+    identifier_column = "CollectionName"
 
     def update_all_items_status(self, new_status: str):
         """Update the status of all items in this collection."""
-        conn = connect()
-        cursor = conn.cursor()
-        try:
-            query = "UPDATE Item SET Status = ? WHERE Collection = ?"
-            cursor.execute(query, (new_status, self.CollectionName))
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        query = "UPDATE Item SET Status = ? WHERE Collection = ?"
+        run_write(lambda conn: conn.execute(query, (new_status, self.CollectionName)))
+        publish(ChangeEvent("Item", self.CollectionName, BULK_STATUS, new_status))
 
 # %%
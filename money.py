@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+# Program:          money module
+# Associated file:  money.py
+# Purpose:          Amounts of money are stored as integer cents (Item.PricePaidCents and
+#                   Item.CurrentValueCents), so totals are exact and SQLite sums integers instead of REALs.
+#                   This module converts between cents and what people type, see, import and export
+#                   ("1234.5", "$1,234.50"). Nothing outside the database should ever see raw cents except
+#                   the API, which returns them as JSON integers.
+
+import math
+from decimal import Decimal, InvalidOperation
+
+# stored column -> the name people see in the grid, CSV files, reports and the API
+MONEY_COLUMNS = {
+    "PricePaidCents": "PricePaid",
+    "CurrentValueCents": "CurrentValue",
+}
+
+# about $10 trillion; keeps every sum far away from SQLite's 64-bit integer limit
+MAX_CENTS = 10 ** 15
+
+CENT = Decimal("0.01")
+
+
+def to_cents(value, field_name="Amount"):
+    """Parses an amount (form text, CSV cell, JSON number) into integer cents; None for blanks.
+
+    Accepts "12", "12.5", "$1,234.56", "-3.10", ints, floats and Decimals. Amounts with more than two
+    decimal places are rejected rather than silently rounded.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"{field_name} must be a valid amount, e.g. 12.50.")
+    if isinstance(value, int):
+        amount = Decimal(value)
+    elif isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"{field_name} must be a valid amount, e.g. 12.50.")
+        amount = Decimal(repr(value))  # the shortest decimal that round-trips, e.g. 19.99 not 19.989999...
+    elif isinstance(value, Decimal):
+        amount = value
+    else:
+        text = str(value).strip().replace(",", "").replace(" ", "")
+        negative = text.startswith("-")
+        text = text.lstrip("-").lstrip("$")
+        if not text:
+            return None
+        try:
+            amount = Decimal(text)
+        except InvalidOperation:
+            raise ValueError(f"{field_name} must be a valid amount, e.g. 12.50.")
+        if negative:
+            amount = -amount
+
+    if not amount.is_finite():
+        raise ValueError(f"{field_name} must be a valid amount, e.g. 12.50.")
+    if amount != amount.quantize(CENT):
+        raise ValueError(f"{field_name} can have at most two decimal places.")
+    cents = int(amount * 100)
+    if abs(cents) >= MAX_CENTS:
+        raise ValueError(f"{field_name} is too large.")
+    return cents
+
+
+def cents_to_text(cents):
+    """Plain decimal text for entry fields and exports: 123456 -> "1234.56", None -> ""."""
+    if cents is None:
+        return ""
+    if not isinstance(cents, int):
+        return str(cents)   # a value the migration could not read as money; shown as stored
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def format_money(cents, blank="-"):
+    """Display text: 123456 -> "$1,234.56", -5 -> "-$0.05", None -> blank."""
+    if cents is None:
+        return blank
+    if not isinstance(cents, int):
+        return str(cents)
+    sign = "-" if cents < 0 else ""
+    return f"{sign}${abs(cents) // 100:,}.{abs(cents) % 100:02d}"
+
+
+def format_signed(cents):
+    """Gain/loss text: "+$1.00" or "-$1.00"."""
+    return ("+" if cents >= 0 else "") + format_money(cents)
+
+
+def sql_amount(column):
+    """SQL expression turning a cents column into exact decimal text ("1234.56"), NULL stays NULL."""
+    return (
+        f"CASE WHEN typeof({column}) = 'integer' THEN "
+        f"printf('%s%d.%02d', CASE WHEN {column} < 0 THEN '-' ELSE '' END, abs({column}) / 100, abs({column}) % 100) "
+        f"ELSE {column} END"
+    )
+
+
+def export_columns(columns):
+    """SELECT list for exports: money columns as decimal text under their external names."""
+    return ", ".join(
+        f'{sql_amount(quoted)} AS "{MONEY_COLUMNS[column]}"' if column in MONEY_COLUMNS else quoted
+        for column, quoted in ((column, '"' + column.replace('"', '""') + '"') for column in columns)
+    )
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+
+# Program:          paging module
+# Associated file:  paging.py
+# Purpose:          This module serves windows of rows to the virtual list widget in gui.py. A page source
+#                   runs a query once per page and keeps the most recently used pages in memory, so
+#                   scrolling through a huge table never loads the whole result set. Pages after one
+#                   already read are found by seeking past its last row (keyset paging) rather than
+#                   by counting through every earlier row with OFFSET.
+
+import sqlite3
+from collections import OrderedDict
+
+DATABASE = "collections.sqlite"
+
+
+def quote_identifier(name):
+    """Quotes a column name for use in generated SQL."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def affinity(declared_type):
+    """Returns 'numeric' or 'text' for a declared column type, following SQLite's affinity rules."""
+    declared = (declared_type or "").upper()
+    if "INT" in declared:
+        return "numeric"
+    if "CHAR" in declared or "CLOB" in declared or "TEXT" in declared:
+        return "text"
+    if not declared or "BLOB" in declared:
+        return "text"
+    return "numeric"  # REAL, FLOAT, DOUBLE, NUMERIC, DECIMAL, ...
+
+
+# table name -> {column: affinity}; schemas don't change while the app runs
+_affinity_cache = {}
+
+
+def column_affinities(table, database=None):
+    """Maps each column of a table to 'numeric' or 'text' (cached per table)."""
+    key = (database or DATABASE, table)
+    if key not in _affinity_cache:
+        conn = sqlite3.connect(key[0])
+        rows = conn.execute(f"PRAGMA table_info({quote_identifier(table)})").fetchall()
+        conn.close()
+        _affinity_cache[key] = {row[1]: affinity(row[2]) for row in rows}
+    return _affinity_cache[key]
+
+
+def sort_key(value):
+    """Sort key that orders None first, numbers numerically and everything else as text."""
+    if value is None:
+        return (0, 0, "")
+    if isinstance(value, (int, float)):
+        return (1, value, "")
+    return (2, 0, str(value).lower())
+
+
+class QueryPageSource:
+    """Pages through the rows of a SELECT query with an LRU cache of fetched pages.
+
+    Sorting is done by SQL: column_types ({column: 'numeric'|'text'}) decides how each column is
+    ordered (numbers numerically, text case-insensitively) and key_columns are appended as a
+    tie-breaker, so every query has a total order and pages never overlap or skip rows. With
+    key_columns, a page is read by seeking from the last row of the nearest page before it that was
+    already read, and OFFSET only covers the pages in between (none when scrolling).
+    """
+
+    def __init__(self, query, params=(), page_size=200, cache_pages=16, database=None,
+                 column_types=None, key_columns=()):
+        self.query = query.strip().rstrip(";")
+        self.params = tuple(params or ())
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self.database = database or DATABASE
+        self.column_types = column_types or {}
+        self.key_columns = tuple(key_columns)
+        self.order_by = []  # list of (column, descending)
+
+        self._conn = None
+        self._columns = None
+        self._count = None
+        self._pages = OrderedDict()
+        self._page_ends = {}  # page number -> last row, kept after the page itself is evicted
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.database)
+        return self._conn
+
+    @property
+    def columns(self):
+        """Column names produced by the query; used as the ORDER BY whitelist."""
+        if self._columns is None:
+            cursor = self._connection().execute(f"SELECT * FROM ({self.query}) LIMIT 0", self.params)
+            self._columns = [description[0] for description in cursor.description]
+        return self._columns
+
+    def count(self):
+        if self._count is None:
+            cursor = self._connection().execute(f"SELECT COUNT(*) FROM ({self.query})", self.params)
+            self._count = cursor.fetchone()[0]
+        return self._count
+
+    def set_order(self, order_by):
+        """Sets the sort order as a list of (column, descending) pairs; unknown columns raise ValueError."""
+        if list(order_by) == self.order_by:
+            return  # keep the cached pages
+        for column, _ in order_by:
+            if column not in self.columns:
+                raise ValueError(f"Cannot sort by unknown column '{column}'.")
+        self.order_by = list(order_by)
+        self.invalidate()
+
+    def sort_columns(self):
+        """The full ordering as (column, descending) pairs: the chosen sort, then the key columns.
+
+        Without key columns every column is used, so rows that still tie are identical anyway.
+        """
+        terms = list(self.order_by)
+        sorted_columns = {column for column, _ in terms}
+        terms += [(column, False) for column in self.key_columns if column not in sorted_columns]
+        return terms or [(column, False) for column in self.columns]
+
+    def sort_term(self, column):
+        term = quote_identifier(column)
+        if self.column_types.get(column, "text") == "text":
+            # matches the NOCASE indexes created by db.ensure_indexes()
+            term += " COLLATE NOCASE"
+        return term
+
+    def order_term(self, column, descending):
+        return f"{self.sort_term(column)} {'DESC' if descending else 'ASC'}"
+
+    def order_clause(self):
+        terms = [self.order_term(column, descending) for column, descending in self.sort_columns()]
+        return " ORDER BY " + ", ".join(terms)
+
+    def seek_clause(self, last_row):
+        """WHERE clause (and its params) for the rows that sort after last_row.
+
+        SQLite sorts NULL first, so after NULL ascending is any value and nothing follows it descending.
+        """
+        alternatives, params = [], []
+        ties, tie_params = [], []
+        for column, descending in self.sort_columns():
+            term = self.sort_term(column)
+            value = last_row[self.columns.index(column)]
+            if value is None:
+                after, after_params = (None, ()) if descending else (f"{term} IS NOT NULL", ())
+            elif descending:
+                after, after_params = f"({term} < ? OR {term} IS NULL)", (value,)
+            else:
+                after, after_params = f"{term} > ?", (value,)
+            if after:
+                alternatives.append("(" + " AND ".join(ties + [after]) + ")")
+                params += tie_params + list(after_params)
+            ties.append(f"{term} IS ?")
+            tie_params.append(value)
+        if not alternatives:
+            return " WHERE 0", ()
+        clause = " OR ".join(alternatives)
+        # a plain range on the leading column as well, which an index on it can satisfy
+        column, descending = self.sort_columns()[0]
+        value = last_row[self.columns.index(column)]
+        if value is not None:
+            term = self.sort_term(column)
+            bound = f"({term} <= ? OR {term} IS NULL)" if descending else f"{term} >= ?"
+            return f" WHERE {bound} AND ({clause})", (value,) + tuple(params)
+        return f" WHERE {clause}", tuple(params)
+
+    def get_page(self, page_number):
+        """Returns one page of rows, from the cache when possible."""
+        page = self._pages.get(page_number)
+        if page is not None:
+            self._pages.move_to_end(page_number)
+            return page
+
+        start = page_number * self.page_size
+        where, where_params = "", ()
+        if self.key_columns:
+            read = [number for number in self._page_ends if number < page_number]
+            if read:
+                nearest = max(read)
+                where, where_params = self.seek_clause(self._page_ends[nearest])
+                start = (page_number - nearest - 1) * self.page_size
+        sql = f"SELECT * FROM ({self.query}){where}{self.order_clause()} LIMIT ? OFFSET ?"
+        cursor = self._connection().execute(sql, self.params + where_params + (self.page_size, start))
+        page = [tuple(row) for row in cursor.fetchall()]
+
+        if len(page) == self.page_size:
+            self._page_ends[page_number] = page[-1]
+        self._pages[page_number] = page
+        while len(self._pages) > self.cache_pages:
+            self._pages.popitem(last=False)
+        return page
+
+    def rows(self, start, stop):
+        """Returns rows[start:stop] of the (sorted) result set."""
+        start = max(0, start)
+        stop = min(stop, self.count())
+        if stop <= start:
+            return []
+
+        rows = []
+        first_page = start // self.page_size
+        last_page = (stop - 1) // self.page_size
+        for page_number in range(first_page, last_page + 1):
+            rows.extend(self.get_page(page_number))
+        offset = first_page * self.page_size
+        return rows[start - offset:stop - offset]
+
+    def invalidate(self):
+        """Forgets cached pages and the row count so the next read re-queries."""
+        self._pages.clear()
+        self._page_ends.clear()
+        self._count = None
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class ListPageSource:
+    """Page source over rows that are already in memory (small result sets such as metric rollups)."""
+
+    def __init__(self, rows, columns):
+        self.columns = list(columns)
+        self.order_by = []
+        self._rows = [tuple(row) for row in rows]
+
+    def count(self):
+        return len(self._rows)
+
+    def set_order(self, order_by):
+        for column, _ in order_by:
+            if column not in self.columns:
+                raise ValueError(f"Cannot sort by unknown column '{column}'.")
+        self.order_by = list(order_by)
+        # apply the keys last-to-first so the first column wins (stable sort)
+        for column, descending in reversed(self.order_by):
+            index = self.columns.index(column)
+            self._rows.sort(key=lambda row: sort_key(row[index]), reverse=descending)
+
+    def rows(self, start, stop):
+        return self._rows[max(0, start):stop]
+
+    def invalidate(self):
+        pass
+
+    def close(self):
+        pass
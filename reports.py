@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+
+# Program:          reports module
+# Associated file:  reports.py
+# Purpose:          This module builds the printable collection reports: a summary of every collection in
+#                   scope followed by one section per collection with its items, the contacts of the sources
+#                   they came from and valuation totals. All data comes from two queries (one JOIN for the
+#                   rows, one GROUP BY for the totals). Sections are rendered to HTML or PDF in a process
+#                   pool when there are enough of them to be worth it. The PDF writer is self-contained, so
+#                   no extra packages or network access are needed.
+
+import html
+import multiprocessing
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import groupby
+from typing import List, Optional, Tuple
+
+from item_filters import ItemFilter
+from money import format_money, format_signed
+
+DATABASE = "collections.sqlite"
+
+# below this many sections the pool's start-up costs more than it saves
+PARALLEL_MIN_SECTIONS = 4
+
+# workers are started fresh rather than forked: the GUI renders from a worker thread, and forking a
+# process with other threads running (Tk's included) can copy a lock some thread holds
+POOL_CONTEXT = "spawn"
+
+ITEM_HEADINGS = ("Item", "Status", "Source", "Location", "Price Paid", "Current Value", "Gain/Loss")
+SOURCE_HEADINGS = ("Business", "Contact", "Phone", "Email", "City")
+SUMMARY_HEADINGS = ("Collection", "Items", "Price Paid", "Current Value", "Gain/Loss")
+
+# shown for an amount that isn't known (no price or value recorded), instead of counting it as $0.00
+UNKNOWN = "\u2014"
+
+
+def add_known(total, amount):
+    """Sum that skips unknown (None) amounts and stays None until something is known."""
+    if amount is None:
+        return total
+    return amount if total is None else total + amount
+
+
+@dataclass
+class Totals:
+    """Cents over the items whose amount is known; None when none of them has one."""
+    items: int = 0
+    price_paid: Optional[int] = None
+    current_value: Optional[int] = None
+    gain: Optional[int] = None  # over the items with both a price and a value
+
+    def add(self, other):
+        self.items += other.items
+        self.price_paid = add_known(self.price_paid, other.price_paid)
+        self.current_value = add_known(self.current_value, other.current_value)
+        self.gain = add_known(self.gain, other.gain)
+
+
+@dataclass
+class ReportSection:
+    """One collection: plain data only, so sections can be sent to worker processes."""
+    collection: str
+    owner: Optional[str]
+    totals: Totals
+    items: List[Tuple] = field(default_factory=list)     # rows matching ITEM_HEADINGS
+    sources: List[Tuple] = field(default_factory=list)   # rows matching SOURCE_HEADINGS
+
+
+@dataclass
+class Report:
+    title: str
+    scope: str
+    generated: str
+    sections: List[ReportSection]
+
+    @property
+    def totals(self):
+        totals = Totals()
+        for section in self.sections:
+            totals.add(section.totals)
+        return totals
+
+
+def money(cents):
+    return format_money(cents, blank=UNKNOWN)
+
+
+def signed_money(cents):
+    return UNKNOWN if cents is None else format_signed(cents)
+
+
+##### DATA #####
+
+def build_report(user=None, admin=False, collections=None, include_inactive=False, database=None):
+    """Loads the report data for user (every owner for admin), optionally limited to some collections."""
+    owner = None if admin else user
+    item_filter = ItemFilter(user=owner, show_inactive=include_inactive)
+    clause, params = item_filter.where()
+
+    collection_clause, collection_params = "", ()
+    if collections:
+        collection_clause = f" AND i.Collection IN ({', '.join('?' for _ in collections)})"
+        collection_params = tuple(collections)
+
+    conn = sqlite3.connect(database or DATABASE)
+
+    # every collection in scope, including empty ones
+    query = "SELECT CollectionName, User FROM Collection"
+    values = []
+    if owner is not None:
+        query += " WHERE User = ?"
+        values.append(owner)
+    owners = dict(conn.execute(query + " ORDER BY CollectionName COLLATE NOCASE", values).fetchall())
+    if collections:
+        owners = {name: owners.get(name) for name in collections if name in owners}
+
+    # totals per collection in one pass; integer SUMs, so they are exact to the cent. SUM skips NULLs
+    # (unknown amounts) and is NULL when every amount is unknown; a gain needs both amounts.
+    totals = {
+        name: Totals(count, paid, value, gain)
+        for name, count, paid, value, gain in conn.execute(f"""
+            SELECT i.Collection, COUNT(*), SUM(i.PricePaidCents), SUM(i.CurrentValueCents),
+                SUM(i.CurrentValueCents - i.PricePaidCents)
+            FROM (SELECT * FROM Item{clause}) i
+            WHERE 1 = 1{collection_clause}
+            GROUP BY i.Collection
+        """, params + collection_params)
+    }
+
+    # items with their source's contact details, already in section order
+    rows = conn.execute(f"""
+        SELECT i.Collection, i.ItemName, i.Status, i.Source, i.Location, i.PricePaidCents, i.CurrentValueCents,
+            s.FirstName, s.LastName, s.Phone, s.Email, s.City
+        FROM (SELECT * FROM Item{clause}) i
+        LEFT JOIN Source s ON s.BusinessName = i.Source
+        WHERE 1 = 1{collection_clause}
+        ORDER BY i.Collection COLLATE NOCASE, i.ItemName COLLATE NOCASE
+    """, params + collection_params)
+
+    sections = {}
+    contacts = {}   # collection -> {source: contact row}
+    for name, group in groupby(rows, key=lambda row: row[0]):
+        section = sections.get(name)
+        if section is None:
+            section = sections[name] = ReportSection(name, owners.get(name), totals.get(name, Totals()))
+        seen = contacts.setdefault(name, {})
+        for _, item, status, source, location, paid, value, first, last, phone, email, city in group:
+            gain = None if value is None or paid is None else value - paid
+            section.items.append((item, status, source or "", location or "", paid, value, gain))
+            if source and source not in seen:
+                contact = " ".join(part for part in (first, last) if part)
+                seen[source] = (source, contact, phone or "", email or "", city or "")
+    conn.close()
+    for name, section in sections.items():
+        section.sources = sorted(contacts[name].values(), key=lambda contact: contact[0].lower())
+
+    ordered = [sections.get(name) or ReportSection(name, owner, Totals()) for name, owner in owners.items()]
+    # items whose collection row is missing still get reported
+    ordered += [section for name, section in sections.items() if name not in owners]
+
+    return Report(
+        title="Collection Report",
+        scope="All users" if admin else f"User: {user}",
+        generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        sections=ordered,
+    )
+
+
+def render_sections(render, sections, workers=None):
+    """Renders sections in a process pool (in order); small reports, or a single CPU, render in-process."""
+    if (workers or os.cpu_count() or 1) == 1 or len(sections) < PARALLEL_MIN_SECTIONS:
+        return [render(section) for section in sections]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(POOL_CONTEXT)) as pool:
+        chunk = max(1, len(sections) // ((workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(render, sections, chunksize=chunk))
+
+
+##### HTML #####
+
+HTML_STYLE = """
+    body { font-family: Helvetica, Arial, sans-serif; color: #222; margin: 2em; }
+    h1 { margin-bottom: 0; }
+    .meta { color: #666; margin-top: 0.2em; }
+    table { border-collapse: collapse; width: 100%; margin: 0.5em 0 1.5em; font-size: 0.9em; }
+    th, td { border-bottom: 1px solid #ddd; padding: 4px 8px; text-align: left; }
+    th { background: #f2f2f2; }
+    td.num, th.num { text-align: right; }
+    tr.total td { font-weight: bold; border-top: 2px solid #999; }
+    section { page-break-inside: avoid; }
+"""
+
+NUMERIC_HEADINGS = {"Items", "Price Paid", "Current Value", "Gain/Loss"}
+
+
+def html_table(headings, rows, total=None):
+    classes = [' class="num"' if heading in NUMERIC_HEADINGS else "" for heading in headings]
+
+    def cells(values, tag):
+        return "".join(
+            f"<{tag}{css}>{html.escape(str(value))}</{tag}>" for css, value in zip(classes, values)
+        )
+    body = "".join(f"<tr>{cells(row, 'td')}</tr>" for row in rows)
+    if total:
+        body += f'<tr class="total">{cells(total, "td")}</tr>'
+    return f"<table><thead><tr>{cells(headings, 'th')}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def render_section_html(section):
+    totals = section.totals
+    parts = [f"<section><h2>{html.escape(section.collection)}</h2>"]
+    if section.owner:
+        parts.append(f'<p class="meta">Owner: {html.escape(section.owner)}</p>')
+    parts.append(
+        f"<p>{totals.items} items &middot; paid {money(totals.price_paid)} &middot; "
+        f"now worth {money(totals.current_value)} &middot; {signed_money(totals.gain)}</p>"
+    )
+    if section.items:
+        rows = [
+            (item, status, source, location, money(paid), money(value), signed_money(gain))
+            for item, status, source, location, paid, value, gain in section.items
+        ]
+        parts.append("<h3>Items</h3>" + html_table(ITEM_HEADINGS, rows))
+    else:
+        parts.append("<p>No items.</p>")
+    if section.sources:
+        parts.append("<h3>Sources</h3>" + html_table(SOURCE_HEADINGS, section.sources))
+    parts.append("</section>")
+    return "".join(parts)
+
+
+def summary_rows(report):
+    rows = [
+        (section.collection, section.totals.items, money(section.totals.price_paid),
+         money(section.totals.current_value), signed_money(section.totals.gain))
+        for section in report.sections
+    ]
+    totals = report.totals
+    total = ("Total", totals.items, money(totals.price_paid), money(totals.current_value), signed_money(totals.gain))
+    return rows, total
+
+
+def write_html(report, path, workers=None):
+    rows, total = summary_rows(report)
+    sections = render_sections(render_section_html, report.sections, workers)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(
+            f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(report.title)}</title>"
+            f"<style>{HTML_STYLE}</style></head><body>"
+            f"<h1>{html.escape(report.title)}</h1>"
+            f'<p class="meta">{html.escape(report.scope)} &middot; generated {report.generated}</p>'
+            f"<h2>Summary</h2>{html_table(SUMMARY_HEADINGS, rows, total)}"
+        )
+        file.writelines(sections)
+        file.write("</body></html>")
+
+
+##### PDF #####
+
+# US Letter in points, Courier 8pt text lines (Courier is one of the 14 fonts every PDF reader has)
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+MARGIN = 40
+FONT_SIZE = 8
+LINE_HEIGHT = 10.5
+LINE_CHARS = int((PAGE_WIDTH - 2 * MARGIN) / (FONT_SIZE * 0.6))
+PAGE_LINES = int((PAGE_HEIGHT - 2 * MARGIN) / LINE_HEIGHT)
+
+# widths (characters) of the text table columns; they add up to LINE_CHARS or less
+ITEM_WIDTHS = (30, 8, 16, 12, 13, 13, 13)
+SOURCE_WIDTHS = (22, 20, 16, 28, 16)
+SUMMARY_WIDTHS = (40, 8, 18, 18, 18)
+
+# line kinds: "title" and "heading" are bold, "text" is regular
+TITLE, HEADING, TEXT = "title", "heading", "text"
+
+
+def text_row(values, widths, headings=()):
+    cells = []
+    for index, (value, width) in enumerate(zip(values, widths)):
+        text = str(value)
+        if len(text) > width - 1:
+            text = text[:width - 2] + "~"
+        numeric = index < len(headings) and headings[index] in NUMERIC_HEADINGS
+        cells.append(text.rjust(width - 1) + " " if numeric else text.ljust(width))
+    return "".join(cells).rstrip()
+
+
+def text_table(headings, widths, rows, total=None):
+    lines = [(HEADING, text_row(headings, widths, headings)), (TEXT, "-" * min(sum(widths), LINE_CHARS))]
+    lines += [(TEXT, text_row(row, widths, headings)) for row in rows]
+    if total:
+        lines += [(TEXT, "-" * min(sum(widths), LINE_CHARS)), (HEADING, text_row(total, widths, headings))]
+    return lines
+
+
+def render_section_lines(section):
+    """Lays a section out as (kind, text) lines for the PDF writer."""
+    totals = section.totals
+    lines = [(TEXT, ""), (TITLE, section.collection)]
+    if section.owner:
+        lines.append((TEXT, f"Owner: {section.owner}"))
+    lines.append((TEXT, f"{totals.items} items - paid {money(totals.price_paid)} - now worth "
+                        f"{money(totals.current_value)} - {signed_money(totals.gain)}"))
+    lines.append((TEXT, ""))
+    if section.items:
+        rows = [
+            (item, status, source, location, money(paid), money(value), signed_money(gain))
+            for item, status, source, location, paid, value, gain in section.items
+        ]
+        lines += text_table(ITEM_HEADINGS, ITEM_WIDTHS, rows)
+    else:
+        lines.append((TEXT, "No items."))
+    if section.sources:
+        lines.append((TEXT, ""))
+        lines += text_table(SOURCE_HEADINGS, SOURCE_WIDTHS, section.sources)
+    return lines
+
+
+def pdf_string(text):
+    # the fonts use WinAnsiEncoding, which is cp1252 (it has the UNKNOWN dash, latin-1 doesn't)
+    text = text.encode("cp1252", "replace").decode("latin-1")
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def pdf_document(lines):
+    """Builds a PDF (as bytes) from (kind, text) lines, paginating as it goes."""
+    pages = [lines[start:start + PAGE_LINES] for start in range(0, len(lines), PAGE_LINES)] or [[]]
+    fonts = {TITLE: ("F2", FONT_SIZE + 3), HEADING: ("F2", FONT_SIZE), TEXT: ("F1", FONT_SIZE)}
+
+    # objects 1-4: catalog, page tree and the two fonts; then a (page, content) pair per page
+    objects = [None, None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>",
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Courier-Bold /Encoding /WinAnsiEncoding >>"]
+    page_ids = []
+    for number, page in enumerate(pages, start=1):
+        commands = ["BT", f"{MARGIN} {PAGE_HEIGHT - MARGIN} Td", f"{LINE_HEIGHT} TL"]
+        for kind, text in page:
+            font, size = fonts[kind]
+            commands.append(f"/{font} {size} Tf {pdf_string(text[:LINE_CHARS])} '")
+        commands.append("ET")
+        footer = f"Page {number} of {len(pages)}"
+        commands.append(f"BT /F1 {FONT_SIZE} Tf {MARGIN} {MARGIN / 2} Td {pdf_string(footer)} Tj ET")
+        stream = "\n".join(commands).encode("latin-1")
+
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1") + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(len(objects))
+
+    objects[0] = "<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        if isinstance(body, str):
+            body = body.encode("latin-1")
+        output += f"{number} 0 obj\n".encode("latin-1") + body + b"\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(output)
+
+
+def write_pdf(report, path, workers=None):
+    rows, total = summary_rows(report)
+    lines = [
+        (TITLE, report.title),
+        (TEXT, f"{report.scope} - generated {report.generated}"),
+        (TEXT, ""),
+        (HEADING, "Summary"),
+    ]
+    lines += text_table(SUMMARY_HEADINGS, SUMMARY_WIDTHS, rows, total)
+    for section_lines in render_sections(render_section_lines, report.sections, workers):
+        lines += section_lines
+    with open(path, "wb") as file:
+        file.write(pdf_document(lines))
+
+
+WRITERS = {".html": write_html, ".htm": write_html, ".pdf": write_pdf}
+
+
+def write_report(path, user=None, admin=False, collections=None, include_inactive=False,
+                 database=None, workers=None):
+    """Builds the report and writes it as HTML or PDF depending on the file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Unsupported report format '{extension}'. Use .html or .pdf.")
+    report = build_report(user, admin, collections, include_inactive, database)
+    WRITERS[extension](report, path, workers)
+    return report
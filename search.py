@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+
+# Program:          search module
+# Associated file:  search.py
+# Purpose:          This module implements the global substring/prefix search. Each searchable table
+#                   has an external-content FTS5 trigram index kept current by triggers, so substring
+#                   matches are index lookups instead of LIKE '%x%' scans. Searches run on a worker
+#                   thread, stream their results one group at a time and can be cancelled mid-query.
+
+import sqlite3
+import threading
+
+from db import ownership_filter
+
+DATABASE = "collections.sqlite"
+
+# rows returned per group
+RESULT_LIMIT = 25
+
+# substring hits ranked per group: limit * CANDIDATE_FACTOR of them (see search_group)
+CANDIDATE_FACTOR = 8
+
+# trigram indexes need at least three characters; shorter queries fall back to prefix ranges
+MIN_SUBSTRING_LENGTH = 3
+
+# group name -> how to search it. "rowid" is the table's row identity (content_rowid of the index),
+# "owner" the column used for non-admin ownership filtering.
+SEARCH_GROUPS = {
+    "Items": {
+        "table": "Item", "index": "ItemSearch", "rowid": "ItemID",
+        "columns": ("ItemName", "Description", "Location", "Notes"),
+        "title": "ItemName", "detail": "Collection", "owner": "User", "admin_only": False,
+    },
+    "Collections": {
+        "table": "Collection", "index": "CollectionSearch", "rowid": "rowid",
+        "columns": ("CollectionName",),
+        "title": "CollectionName", "detail": "User", "owner": "User", "admin_only": False,
+    },
+    "Sources": {
+        "table": "Source", "index": "SourceSearch", "rowid": "SourceID",
+        "columns": ("BusinessName", "FirstName", "LastName", "City", "Email", "Phone"),
+        "title": "BusinessName", "detail": "City", "owner": None, "admin_only": False,
+    },
+    "Users": {
+        "table": "User", "index": "UserSearch", "rowid": "UserID",
+        "columns": ("Username",),
+        "title": "Username", "detail": "Role", "owner": None, "admin_only": True,
+    },
+    "Log": {
+        "table": "Log", "index": "LogSearch", "rowid": "rowid",
+        "columns": ("Message", "User"),
+        "title": "Message", "detail": "Timestamp", "owner": None, "admin_only": True,
+        "prefix_indexed": False,  # no index on Message, so short queries skip the log
+    },
+}
+
+
+def ensure_search_index(conn, rebuild=False):
+    """Creates the FTS5 indexes and their sync triggers; fills an index the first time it is created."""
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+    with conn:
+        for group in SEARCH_GROUPS.values():
+            table, index, rowid = group["table"], group["index"], group["rowid"]
+            columns = ", ".join(group["columns"])
+            new_values = ", ".join(f"new.{column}" for column in group["columns"])
+            old_values = ", ".join(f"old.{column}" for column in group["columns"])
+
+            created = index not in existing
+            if created:
+                conn.execute(f"""
+                    CREATE VIRTUAL TABLE {index} USING fts5(
+                        {columns}, content='{table}', content_rowid='{rowid}', tokenize='trigram'
+                    )
+                """)
+
+            # keep the index in step with every writer (GUI, CLI, importer, other app instances)
+            if f"{index}_ai" not in existing:
+                conn.execute(f"""
+                    CREATE TRIGGER {index}_ai AFTER INSERT ON "{table}" BEGIN
+                        INSERT INTO {index} (rowid, {columns}) VALUES (new.{rowid}, {new_values});
+                    END
+                """)
+            if f"{index}_ad" not in existing:
+                conn.execute(f"""
+                    CREATE TRIGGER {index}_ad AFTER DELETE ON "{table}" BEGIN
+                        INSERT INTO {index} ({index}, rowid, {columns}) VALUES ('delete', old.{rowid}, {old_values});
+                    END
+                """)
+            if f"{index}_au" not in existing:
+                # only text changes touch the index; status toggles don't
+                conn.execute(f"""
+                    CREATE TRIGGER {index}_au AFTER UPDATE OF {columns} ON "{table}" BEGIN
+                        INSERT INTO {index} ({index}, rowid, {columns}) VALUES ('delete', old.{rowid}, {old_values});
+                        INSERT INTO {index} (rowid, {columns}) VALUES (new.{rowid}, {new_values});
+                    END
+                """)
+
+            if created or rebuild:
+                conn.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+
+
+def rebuild_search_index(database=None):
+    """Re-reads every indexed table (e.g. after a VACUUM renumbered rowids)."""
+    conn = sqlite3.connect(database or DATABASE)
+    ensure_search_index(conn, rebuild=True)
+    conn.close()
+
+
+def fts_phrase(text):
+    """Quotes user input as a single FTS5 phrase so operators and punctuation are literal."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def rank_rows(text, rows):
+    """Orders (id, title, detail) rows: prefix hits first, then earlier matches, then shorter titles."""
+    needle = text.lower()
+
+    def score(row):
+        title = str(row[1] or "").lower()
+        position = title.find(needle)
+        return (
+            0 if position == 0 else 1,
+            position if position >= 0 else len(title) + 1,
+            len(title),
+            title,
+        )
+    return sorted(rows, key=score)
+
+
+def search_group(conn, name, text, user=None, admin=False, limit=RESULT_LIMIT):
+    """Returns up to limit ranked (id, title, detail) rows of one group matching text.
+
+    Ranking every match would make the cost grow with the number of hits (a common word matches most
+    of a big table), so only a bounded candidate set is ranked: the title-prefix hits, read from the
+    NOCASE title index, plus the newest CANDIDATE_FACTOR * limit substring hits from the trigram index.
+    Both reads stop after a fixed number of rows.
+    """
+    group = SEARCH_GROUPS[name]
+    table, index, rowid = group["table"], group["index"], group["rowid"]
+    title, detail = group["title"], group["detail"]
+
+    condition, params = ownership_filter((group["owner"],) if group["owner"] else (), user, admin, alias="t")
+    owner_clause = f" AND {condition}" if condition else ""
+
+    rows = []
+    if group.get("prefix_indexed", True):
+        # case-insensitive prefix range on the (NOCASE-indexed) title: the best-ranked hits, and the
+        # only search for text too short for trigrams
+        query = f"""
+            SELECT t.{rowid}, t.{title}, t.{detail}
+            FROM "{table}" t
+            WHERE t.{title} >= ? COLLATE NOCASE AND t.{title} < ? COLLATE NOCASE{owner_clause}
+            ORDER BY t.{title} COLLATE NOCASE
+            LIMIT ?
+        """
+        rows += conn.execute(query, (text, text + "\U0010ffff") + params + (limit,)).fetchall()
+
+    if len(text) >= MIN_SUBSTRING_LENGTH:
+        # substring match through the trigram index, newest rows first; rowid order is the index's own
+        # order, so SQLite stops reading after the LIMIT instead of sorting every hit
+        query = f"""
+            SELECT t.{rowid}, t.{title}, t.{detail}
+            FROM {index} JOIN "{table}" t ON t.{rowid} = {index}.rowid
+            WHERE {index} MATCH ?{owner_clause}
+            ORDER BY {index}.rowid DESC
+            LIMIT ?
+        """
+        rows += conn.execute(query, (fts_phrase(text),) + params + (limit * CANDIDATE_FACTOR,)).fetchall()
+
+    unique = {row[0]: tuple(row) for row in rows}
+    return rank_rows(text, list(unique.values()))[:limit]
+
+
+def visible_groups(admin):
+    return [name for name, group in SEARCH_GROUPS.items() if admin or not group["admin_only"]]
+
+
+class SearchWorker:
+    """Runs one search at a time on a background thread; starting a new one cancels the old one."""
+
+    def __init__(self, database=None):
+        self.database = database or DATABASE
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._conn = None
+
+    def start(self, text, on_group, on_done=None, user=None, admin=False):
+        """Searches every visible group, calling on_group(generation, name, rows) per group from the
+        worker thread. Returns the generation number; results of older generations are stale."""
+        text = text.strip()
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._interrupt()
+        if not text:
+            return generation
+
+        thread = threading.Thread(
+            target=self._run, args=(generation, text, on_group, on_done, user, admin), daemon=True
+        )
+        thread.start()
+        return generation
+
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+            self._interrupt()
+
+    def is_current(self, generation):
+        return generation == self._generation
+
+    def _interrupt(self):
+        # abort whatever statement the previous search is running
+        if self._conn is not None:
+            try:
+                self._conn.interrupt()
+            except sqlite3.ProgrammingError:
+                pass
+
+    def _run(self, generation, text, on_group, on_done, user, admin):
+        conn = None
+        try:
+            with self._lock:
+                if not self.is_current(generation):
+                    return
+                conn = self._conn = sqlite3.connect(self.database, check_same_thread=False)
+            for name in visible_groups(admin):
+                if not self.is_current(generation):
+                    return
+                rows = search_group(conn, name, text, user, admin)
+                if self.is_current(generation):
+                    on_group(generation, name, rows)
+        except sqlite3.OperationalError as e:
+            # "interrupted" means a newer search cancelled this one
+            if "interrupt" not in str(e):
+                print(f"[Search Error] {e}")
+        finally:
+            if conn is not None:
+                with self._lock:
+                    if self._conn is conn:
+                        self._conn = None
+                conn.close()
+            # always sent, even for a cancelled or failed search, so the caller can stop waiting
+            if on_done:
+                on_done(generation)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+# Program:          startup profiler
+# Associated file:  startup.py
+# Purpose:          Optional timings for the phases of application start-up: module imports, theme loading
+#                   and the first paint of the login and main windows, measured from the moment this module
+#                   was imported (main.py imports it first). Enable with `python main.py --profile-startup`
+#                   or by setting COLLECTIONS_PROFILE_STARTUP=1; otherwise every call is a no-op.
+
+import os
+import time
+
+STARTED = time.perf_counter()
+
+enabled = bool(os.environ.get("COLLECTIONS_PROFILE_STARTUP"))
+
+# (label, milliseconds since STARTED)
+marks = []
+
+
+def enable(flag=True):
+    global enabled
+    enabled = enabled or flag
+
+
+def mark(label):
+    """Records and prints how long after start-up a phase finished."""
+    if not enabled:
+        return
+    elapsed = (time.perf_counter() - STARTED) * 1000
+    marks.append((label, elapsed))
+    print(f"[Startup] {label}: {elapsed:.1f} ms")
+
+
+def mark_first_paint(window, label):
+    """Marks label once the window has been mapped and its first idle redraw has run."""
+    if not enabled:
+        return
+
+    def on_map(event):
+        if event.widget is window:
+            window.unbind("<Map>", binding)
+            window.after_idle(lambda: mark(label))
+    binding = window.bind("<Map>", on_map, add="+")
@@ -0,0 +1,205 @@
+# Program:          API server tests
+# Associated file:  tests/test_api_server.py
+# Purpose:          Runs api_server.ApiServer on a free localhost port against a small database made by
+#                   datagen.generate and talks to it over real HTTP connections.
+
+import asyncio
+import base64
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+import datagen
+from api_server import ApiServer
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    database = str(tmp_path_factory.mktemp("api") / "api.sqlite")
+    datagen.generate(database, datagen.DatasetSpec.for_items(200, users=3), search_index=False)
+
+    api = ApiServer(database, port=0)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(api.start(), loop).result(timeout=10)
+    yield api
+    loop.call_soon_threadsafe(api.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+
+
+# datagen.user_rows passwords
+PASSWORDS = {"admin": "admin"}
+
+
+def basic_auth(user, password=None):
+    password = PASSWORDS.get(user, "password") if password is None else password
+    return "Basic " + base64.b64encode(f"{user}:{password}".encode()).decode()
+
+
+def call(server, method, path, user="user00001", body=None, headers=None, password=None):
+    """Sends one request; returns (status, headers, decoded JSON or None)."""
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+    headers = dict(headers or {})
+    if user:
+        headers["Authorization"] = basic_auth(user, password)
+    if body is not None and not isinstance(body, (bytes, str)):
+        body = json.dumps(body)
+    connection.request(method, path, body=body, headers=headers)
+    response = connection.getresponse()
+    data = response.read()
+    connection.close()
+    return response.status, dict(response.getheaders()), json.loads(data) if data else None
+
+
+def raw_call(server, data):
+    """Sends bytes as they are (for requests http.client refuses to build); returns the status code."""
+    with socket.create_connection(("127.0.0.1", server.port), timeout=10) as sock:
+        sock.sendall(data)
+        reply = sock.recv(65536)
+    return int(reply.split()[1])
+
+
+def own_collection(server, user="user00001"):
+    status, _, data = call(server, "GET", "/collections", user)
+    assert status == 200
+    return data["collections"][0]["CollectionName"]
+
+
+def create_item(server, name, user="user00001", **fields):
+    body = dict(ItemName=name, Collection=own_collection(server, user), **fields)
+    status, _, item = call(server, "POST", "/items", user, body)
+    assert status == 201, item
+    return item
+
+
+def test_health_needs_no_user(server):
+    status, _, data = call(server, "GET", "/health", user=None)
+    assert status == 200 and data["status"] == "ok"
+
+
+def test_unknown_user_is_401(server):
+    assert call(server, "GET", "/items", user=None)[0] == 401
+    assert call(server, "GET", "/items", user="nobody")[0] == 401
+
+
+def test_wrong_password_is_401(server):
+    status, headers, _ = call(server, "GET", "/items", password="guess")
+    assert status == 401
+    assert headers["WWW-Authenticate"].startswith("Basic")
+    assert call(server, "GET", "/items", user="admin", password="password")[0] == 401
+
+
+def test_username_header_alone_is_not_a_login(server):
+    assert call(server, "GET", "/items", user=None, headers={"X-User": "admin"})[0] == 401
+
+
+@pytest.mark.parametrize("header", ["Basic !!!", "Basic " + base64.b64encode(b"no-colon").decode(), "Bearer x"])
+def test_malformed_credentials_are_401(server, header):
+    assert call(server, "GET", "/items", user=None, headers={"Authorization": header})[0] == 401
+
+
+def test_remote_binding_needs_explicit_opt_in(tmp_path):
+    with pytest.raises(ValueError):
+        ApiServer(str(tmp_path / "unused.sqlite"), host="0.0.0.0")
+
+
+def test_item_round_trip(server):
+    item = create_item(server, "Round trip item", PricePaid="12.50", CurrentValueCents=2000, Location="Safe")
+    assert item["PricePaidCents"] == 1250
+    assert item["CurrentValueCents"] == 2000
+    assert item["User"] == "user00001"
+
+    status, _, fetched = call(server, "GET", f"/items/{item['ItemID']}")
+    assert status == 200 and fetched == item
+
+    status, _, updated = call(server, "PATCH", f"/items/{item['ItemID']}", body={"CurrentValue": "25.75", "Notes": "checked"})
+    assert status == 200
+    assert updated["CurrentValueCents"] == 2575 and updated["Notes"] == "checked"
+
+    status, _, listed = call(server, "GET", f"/items?collection={item['Collection'].replace(' ', '%20')}&limit=1000")
+    assert status == 200
+    [row] = [row for row in listed["items"] if row["ItemID"] == item["ItemID"]]
+    assert row == {column: updated[column] for column in row}
+
+    status, _, history = call(server, "GET", f"/items/{item['ItemID']}/history?period=day")
+    assert status == 200 and history["points"][-1]["cents"] == 2575
+
+
+def test_collection_and_source_round_trip(server):
+    status, _, collection = call(server, "POST", "/collections", body={"CollectionName": "Test Shells"})
+    assert status == 201 and collection["User"] == "user00001"
+    assert call(server, "POST", "/collections", body={"CollectionName": "Test Shells"})[0] == 409
+
+    status, _, source = call(server, "POST", "/sources", body={"BusinessName": "Test Shop", "City": "Austin"})
+    assert status == 201 and source["SourceID"]
+    status, _, sources = call(server, "GET", "/sources")
+    assert "Test Shop" in [row["BusinessName"] for row in sources["sources"]]
+
+
+def test_other_users_items_are_hidden(server):
+    item = create_item(server, "Private item", user="user00002")
+    path = f"/items/{item['ItemID']}"
+    assert call(server, "GET", path, user="user00001")[0] == 404
+    assert call(server, "PATCH", path, user="user00001", body={"Notes": "mine now"})[0] == 404
+    assert call(server, "GET", path + "/history", user="user00001")[0] == 404
+    assert call(server, "GET", path, user="admin")[0] == 200
+
+    # someone else's collection is not there for you either
+    body = {"ItemName": "Sneaky item", "Collection": own_collection(server, "user00002")}
+    assert call(server, "POST", "/items", user="user00001", body=body)[0] == 404
+
+
+def test_collection_for_another_user_is_403(server):
+    body = {"CollectionName": "Not yours", "User": "user00002"}
+    assert call(server, "POST", "/collections", user="user00001", body=body)[0] == 403
+    status, _, collection = call(server, "POST", "/collections", user="admin", body=dict(body, CollectionName="Given"))
+    assert status == 201 and collection["User"] == "user00002"
+
+
+def test_etag_and_304(server):
+    item = create_item(server, "ETag item", CurrentValueCents=100)
+    path = f"/items/{item['ItemID']}"
+    status, headers, _ = call(server, "GET", path)
+    etag = headers["ETag"]
+    assert status == 200 and etag
+
+    status, headers, body = call(server, "GET", path, headers={"If-None-Match": etag})
+    assert status == 304 and body is None and headers["ETag"] == etag
+
+    call(server, "PATCH", path, body={"CurrentValueCents": 101})
+    status, headers, body = call(server, "GET", path, headers={"If-None-Match": etag})
+    assert status == 200 and headers["ETag"] != etag and body["CurrentValueCents"] == 101
+
+
+@pytest.mark.parametrize("body", [
+    b"{not json",
+    b"[1, 2, 3]",
+    b"\xff\xfe",
+    b"[" * 100_000,
+    json.dumps({"ItemName": "Bad", "Colour": "red"}),
+    json.dumps({"ItemName": "Bad", "PricePaid": "12.345"}),
+    json.dumps({"ItemName": "Bad", "PricePaidCents": 12.5}),
+    json.dumps({"ItemName": "Bad", "Status": "Lost"}),
+    json.dumps({"ItemName": ""}),
+], ids=["not-json", "not-object", "not-utf8", "deep-nesting", "unknown-field", "three-decimals",
+        "fractional-cents", "bad-status", "empty-name"])
+def test_malformed_bodies_are_400(server, body):
+    assert call(server, "POST", "/items", body=body)[0] == 400
+
+
+def test_bad_content_length_is_400(server):
+    for length in (b"abc", b"-5"):
+        request = b"POST /items HTTP/1.1\r\nHost: x\r\nAuthorization: " + basic_auth("user00001").encode() + b"\r\nContent-Length: " + length + b"\r\n\r\n{}"
+        assert raw_call(server, request) == 400
+
+
+def test_bad_query_arguments_are_400(server):
+    assert call(server, "GET", "/items?limit=lots")[0] == 400
+    assert call(server, "GET", "/history?period=fortnight")[0] == 400
+    assert call(server, "GET", "/history?since=2024-13-01")[0] == 400
+    assert call(server, "DELETE", "/items")[0] == 405
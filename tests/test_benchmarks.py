@@ -0,0 +1,67 @@
+# Program:          Dataset generator and benchmark suite tests
+# Associated file:  tests/test_benchmarks.py
+# Purpose:          Checks that datagen.generate is reproducible and that benchmarks.run_suite works on a
+#                   scratch copy, saves results that load back and flags regressions when comparing.
+
+import os
+import sqlite3
+
+import pytest
+
+import benchmarks
+import datagen
+
+TABLES = ("User", "Source", "Collection", "Item", "Log", "ItemValue")
+
+
+def dump(path):
+    conn = sqlite3.connect(path)
+    rows = {table: conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall() for table in TABLES}
+    conn.close()
+    return rows
+
+
+def test_same_seed_same_data(tmp_path):
+    spec = datagen.DatasetSpec.for_items(200, users=3, seed=4)
+    first, second, other = (str(tmp_path / name) for name in ("a.sqlite", "b.sqlite", "c.sqlite"))
+    summary = datagen.generate(first, spec, search_index=False)
+    datagen.generate(second, spec, search_index=False)
+    datagen.generate(other, datagen.DatasetSpec.for_items(200, users=3, seed=5), search_index=False)
+
+    assert dump(first) == dump(second)
+    assert dump(first)["Item"] != dump(other)["Item"]
+    counts = {table: len(rows) for table, rows in dump(first).items()}
+    assert counts["Item"] == 200 and counts["User"] == 3 and counts["Log"] == spec.log_rows
+    assert summary["collections"] == counts["Collection"]
+    with pytest.raises(FileExistsError):
+        datagen.generate(first, spec, search_index=False)
+
+
+def test_suite_runs_on_a_scratch_copy(tmp_path):
+    database = str(tmp_path / "bench.sqlite")
+    datagen.generate(database, datagen.DatasetSpec.for_items(300, users=3), search_index=False)
+    before = dump(database)
+    cwd = os.getcwd()
+
+    results = benchmarks.run_suite(database, only=["models.", "grid."], repeat=1)
+    assert os.getcwd() == cwd
+    assert dump(database) == before  # models.Item.save wrote to the copy only
+    assert set(results["results"]) == {name for name in benchmarks.BENCHMARKS
+                                       if name.startswith(("models.", "grid."))}
+    assert results["dataset"]["Item"] == 300
+
+    path = str(tmp_path / "results.json")
+    benchmarks.save_results(results, path)
+    assert benchmarks.load_results(path) == results
+
+
+def test_compare_flags_slowdowns_past_the_threshold():
+    def results(**medians):
+        return {"results": {name.replace("_", "."): {"median_ms": ms} for name, ms in medians.items()}}
+
+    baseline = results(grid_scroll=10.0, grid_resort=10.0, search_items=4.0)
+    current = results(grid_scroll=12.0, grid_resort=13.0, log=1.0)
+    rows = {name: (change, regressed) for name, _, _, change, regressed in benchmarks.compare(baseline, current, 0.25)}
+    assert rows == {"grid.scroll": (pytest.approx(0.2), False), "grid.resort": (pytest.approx(0.3), True)}
+    with pytest.raises(ValueError):
+        benchmarks.run_suite("unused.sqlite", only=["no-such-benchmark"])
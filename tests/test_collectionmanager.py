@@ -0,0 +1,70 @@
+# Program:          Command-line tests
+# Associated file:  tests/test_collectionmanager.py
+# Purpose:          Runs collectionmanager.main against a small database made by datagen.generate and
+#                   checks how commands identify the acting user and when they migrate the schema.
+
+import sqlite3
+
+import pytest
+
+import collectionmanager
+import datagen
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("cli") / "cli.sqlite")
+    datagen.generate(path, datagen.DatasetSpec.for_items(50, users=2), search_index=False)
+    return path
+
+
+def run(database, *argv, password=None, monkeypatch):
+    if password is None:
+        monkeypatch.delenv(collectionmanager.PASSWORD_VARIABLE, raising=False)
+    else:
+        monkeypatch.setenv(collectionmanager.PASSWORD_VARIABLE, password)
+    return collectionmanager.main(["--database", database, *argv])
+
+
+def test_user_commands_need_the_password(database, monkeypatch, capsys):
+    assert run(database, "search", "item", "--user", "user00001", password="wrong", monkeypatch=monkeypatch) == 1
+    assert "Wrong password" in capsys.readouterr().err
+    assert run(database, "search", "item", "--user", "user00001", password="password", monkeypatch=monkeypatch) == 0
+
+
+def test_without_a_terminal_the_password_must_be_in_the_environment(database, monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin.isatty", lambda: False)
+    assert run(database, "search", "item", "--user", "user00001", monkeypatch=monkeypatch) == 1
+    assert collectionmanager.PASSWORD_VARIABLE in capsys.readouterr().err
+
+
+def test_admin_matches_the_gui(database, monkeypatch, tmp_path):
+    # db.is_admin decides, not the Role column
+    conn = sqlite3.connect(database)
+    conn.execute("UPDATE User SET Role = 'Admin' WHERE Username = 'user00001'")
+    conn.commit()
+    conn.close()
+    path = str(tmp_path / "users.csv")
+    assert run(database, "export", "users", path, "--user", "user00001", password="password",
+               monkeypatch=monkeypatch) == 1
+    assert run(database, "export", "users", path, "--user", "admin", password="admin", monkeypatch=monkeypatch) == 0
+
+
+def test_read_only_commands_leave_an_old_schema_alone(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "old.sqlite")
+    datagen.generate(path, datagen.DatasetSpec.for_items(20, users=1), search_index=False)
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE ItemValue")  # as before value history existed
+    conn.commit()
+    conn.close()
+
+    export = ("export", "items", str(tmp_path / "items.csv"), "--user", "admin")
+    assert run(path, *export, password="admin", monkeypatch=monkeypatch) == 1
+    assert "collectionmanager migrate" in capsys.readouterr().err
+    assert run(path, "backup", "--verify", path, monkeypatch=monkeypatch) == 0
+    conn = sqlite3.connect(path)
+    assert not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'ItemValue'").fetchone()
+    conn.close()
+
+    assert run(path, "migrate", monkeypatch=monkeypatch) == 0
+    assert run(path, *export, password="admin", monkeypatch=monkeypatch) == 0
@@ -0,0 +1,81 @@
+# Program:          Database helper tests
+# Associated file:  tests/test_db.py
+# Purpose:          Checks how db.SingleWriter groups queued write jobs into transactions and keeps a
+#                   failing job from taking the rest of its batch down with it.
+
+import sqlite3
+import threading
+
+import pytest
+
+from db import SingleWriter
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "writer.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Note (NoteID INTEGER PRIMARY KEY, Text TEXT NOT NULL)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def insert(conn, text):
+    return conn.execute("INSERT INTO Note (Text) VALUES (?)", (text,)).lastrowid
+
+
+def insert_then_fail(conn, text):
+    insert(conn, text)
+    raise ValueError("rejected")
+
+
+def stored(database):
+    conn = sqlite3.connect(database)
+    texts = [row[0] for row in conn.execute("SELECT Text FROM Note ORDER BY NoteID")]
+    conn.close()
+    return texts
+
+
+def test_queued_jobs_share_transactions(database):
+    writer = SingleWriter(database, batch_size=10)
+    started, gate = threading.Event(), threading.Event()
+
+    def blocker(conn):
+        started.set()
+        gate.wait(5)
+        return insert(conn, "first")
+
+    futures = [writer.submit(blocker)]
+    started.wait(5)
+    # these queue up behind the blocked job
+    futures += [writer.submit(insert, f"note {n}") for n in range(12)]
+    failing = writer.submit(insert_then_fail, "rolled back")
+    futures += [writer.submit(insert, f"note {n}") for n in range(12, 25)]
+    gate.set()
+    results = [future.result(timeout=10) for future in futures]
+    with pytest.raises(ValueError):
+        failing.result(timeout=10)
+    writer.close()
+
+    # the blocker alone, then 26 queued jobs in batches of 10, 10 and 6
+    assert writer.batches == 4 and writer.jobs_done == 27
+    assert stored(database) == ["first"] + [f"note {n}" for n in range(25)]
+    assert results == sorted(results)
+
+
+def test_alone_jobs_get_their_own_transaction(database):
+    writer = SingleWriter(database, batch_size=10)
+
+    def migration(conn):
+        with conn:
+            conn.execute("ALTER TABLE Note ADD COLUMN Tag TEXT")
+        return "done"
+
+    before = writer.submit(insert, "before")
+    alone = writer.submit_alone(migration)
+    after = writer.submit(lambda conn: conn.execute("INSERT INTO Note (Text, Tag) VALUES ('after', 'x')").lastrowid)
+    assert alone.result(timeout=10) == "done"
+    assert before.result(timeout=10) < after.result(timeout=10)
+    writer.close()
+    assert stored(database) == ["before", "after"]
@@ -0,0 +1,45 @@
+# Program:          Export tests
+# Associated file:  tests/test_export.py
+# Purpose:          Checks that ExportJob always reports back through on_done, whatever stops it.
+
+import os
+import sqlite3
+
+import pytest
+
+from export import ExportJob
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "export.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Item (ItemName TEXT)")
+    conn.executemany("INSERT INTO Item VALUES (?)", [(f"item {n}",) for n in range(10)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def run(job, **callbacks):
+    finished = []
+    job.start(on_done=lambda written, error: finished.append((written, error)), **callbacks)
+    job.thread.join(timeout=10)
+    return finished
+
+
+def test_done_after_success(database, tmp_path):
+    path = str(tmp_path / "items.csv")
+    assert run(ExportJob("SELECT * FROM Item", (), path, database=database)) == [(10, None)]
+    assert os.path.exists(path)
+
+
+def test_done_after_unexpected_error(database, tmp_path):
+    def broken_progress(written, total):
+        raise RuntimeError("progress display failed")
+
+    path = str(tmp_path / "items.csv")
+    finished = run(ExportJob("SELECT * FROM Item", (), path, database=database), on_progress=broken_progress)
+    [(written, error)] = finished
+    assert isinstance(error, RuntimeError)
+    assert not os.path.exists(path) and not os.path.exists(path + ".part")
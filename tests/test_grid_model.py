@@ -0,0 +1,156 @@
+# Program:          Grid view-model tests
+# Associated file:  tests/test_grid_model.py
+# Purpose:          Drives grid_model.GridViewModel over a QueryPageSource on a scratch table, without a
+#                   display, and checks the row windows it hands to the virtual Treeview.
+
+import sqlite3
+
+import pytest
+
+from grid_model import GridViewModel, heading_labels, toggle_sort
+from money import format_money
+from paging import QueryPageSource
+
+COLUMNS = ("ItemID", "ItemName", "CurrentValueCents")
+ROWS = 1000
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "grid.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Item (ItemID INTEGER PRIMARY KEY, ItemName TEXT, CurrentValueCents INTEGER)")
+    conn.executemany("INSERT INTO Item VALUES (?, ?, ?)",
+                     [(n, f"item {n:04d}", (n * 7919) % 500) for n in range(1, ROWS + 1)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def grid(database, visible_rows=25, overscan=50, page_size=100, cache_pages=4):
+    model = GridViewModel(COLUMNS, key_columns=("ItemID",), overscan=overscan, visible_rows=visible_rows)
+    source = QueryPageSource("SELECT ItemID, ItemName, CurrentValueCents FROM Item", database=database,
+                             page_size=page_size, cache_pages=cache_pages,
+                             column_types={"ItemID": "numeric", "ItemName": "text", "CurrentValueCents": "numeric"},
+                             key_columns=("ItemID",))
+    return model, model.set_source(source)
+
+
+def shown_ids(model):
+    return [int(iid) for iid in model.shown]
+
+
+##### VIRTUAL WINDOW #####
+
+def test_only_the_visible_rows_are_shown(database):
+    model, window = grid(database)
+    assert window.total == ROWS
+    assert [position for position, _, _ in window.inserted] == list(range(25))
+    assert shown_ids(model) == list(range(1, 26))
+
+
+def test_scrolling_visits_every_row_once_in_order(database):
+    model, _ = grid(database, visible_rows=30)
+    model.sort_by([("CurrentValueCents", True)])
+    seen = []
+    for first in range(0, ROWS, 30):
+        model.scroll_to(first)
+        seen += shown_ids(model)[len(seen) - model.first:]
+    conn = sqlite3.connect(database)
+    expected = [row[0] for row in conn.execute("SELECT ItemID FROM Item ORDER BY CurrentValueCents DESC, ItemID")]
+    conn.close()
+    assert seen == expected
+
+
+def test_page_cache_stays_bounded(database):
+    model, _ = grid(database, cache_pages=4)
+    for first in range(0, ROWS, 25):
+        model.scroll_to(first)
+        assert len(model.source._pages) <= 4
+    model.scroll_fraction(0.5)
+    assert model.first == ROWS // 2
+    assert shown_ids(model)[0] == ROWS // 2 + 1
+
+
+##### DIFF REFRESH #####
+
+def write(database, sql, params=()):
+    conn = sqlite3.connect(database)
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+def test_unchanged_reload_touches_no_rows(database):
+    model, _ = grid(database)
+    assert model.reload().changes == 0
+
+
+def test_reload_updates_only_the_changed_row(database):
+    model, _ = grid(database)
+    write(database, "UPDATE Item SET ItemName = 'renamed' WHERE ItemID = 5")
+    window = model.reload()
+    assert window.updated == [("5", (5, "renamed", (5 * 7919) % 500))]
+    assert window.changes == 1
+
+
+def test_reload_deletes_and_inserts_by_identity(database):
+    model, _ = grid(database)
+    write(database, "DELETE FROM Item WHERE ItemID = 3")
+    window = model.reload()
+    assert window.deleted == ["3"]
+    assert window.inserted == [(24, "26", (26, "item 0026", (26 * 7919) % 500))]
+    assert window.order is None and window.total == ROWS - 1
+
+
+def test_resort_moves_rows_instead_of_reinserting_them(database):
+    model, _ = grid(database, visible_rows=10)
+    assert model.sort_by([("ItemName", False)]).changes == 0  # same rows, same order
+    write(database, "UPDATE Item SET ItemName = printf('item %04d', 11 - ItemID) WHERE ItemID <= 10")
+    model.source.invalidate()
+    window = model.sort_by([("ItemName", False)])
+    assert window.order == [str(item_id) for item_id in range(10, 0, -1)]
+    assert window.inserted == [] and window.deleted == []
+
+
+##### VIEW-MODEL STATE #####
+
+def test_selection_follows_its_row_through_a_resort(database):
+    model, _ = grid(database)
+    model.select("7")
+    window = model.sort_by([("ItemID", True)])
+    assert window.selection == ()  # row 7 is now far below the window
+    model.scroll_to(ROWS - 7 - 10)
+    assert model.render().selection == ("7",)
+    assert model.selected_index == ROWS - 7
+
+
+def test_keyboard_selection_scrolls_the_window(database):
+    model, _ = grid(database, visible_rows=10)
+    model.select("10")
+    window = model.move_selection(1)
+    assert window.selection == ("11",) and model.first == 1
+    window = model.move_selection(-5)
+    assert window.selection == ("6",) and model.first == 1
+    model.move_selection(-100)
+    assert model.selected_iid == "1" and model.first == 0
+
+
+def test_formatters_change_the_text_not_the_sort(database):
+    model = GridViewModel(COLUMNS, key_columns=("ItemID",), visible_rows=3,
+                          formatters={"CurrentValueCents": format_money})
+    model.set_source(QueryPageSource("SELECT * FROM Item", database=database, key_columns=("ItemID",),
+                                     column_types={"CurrentValueCents": "numeric"}))
+    window = model.sort_by([("CurrentValueCents", True)])
+    assert [values[2] for _, _, values in window.inserted] == ["$4.99"] * 2 + ["$4.98"]
+
+
+def test_heading_clicks():
+    order = toggle_sort([], "ItemName")
+    assert order == [("ItemName", False)]
+    assert toggle_sort(order, "ItemName") == [("ItemName", True)]
+    order = toggle_sort(order, "CurrentValueCents", extend=True)
+    assert order == [("ItemName", False), ("CurrentValueCents", False)]
+    assert toggle_sort(order, "CurrentValueCents", extend=True) == [("ItemName", False), ("CurrentValueCents", True)]
+    labels = heading_labels(COLUMNS, order, titles={"CurrentValueCents": "CurrentValue"})
+    assert labels == {"ItemID": "ItemID", "ItemName": "ItemName \u21911", "CurrentValueCents": "CurrentValue \u21912"}
@@ -0,0 +1,82 @@
+# Program:          Importer tests
+# Associated file:  tests/test_importer.py
+# Purpose:          Imports small CSV files into a database made by datagen.generate and checks which
+#                   rows are inserted, which are rejected (with their line numbers) and how they are
+#                   batched.
+
+import csv
+import sqlite3
+
+import pytest
+
+import datagen
+import importer
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "import.sqlite")
+    datagen.generate(path, datagen.DatasetSpec.for_items(40, users=3), search_index=False)
+    return path
+
+
+def collection_of(database, user):
+    conn = sqlite3.connect(database)
+    name = conn.execute("SELECT CollectionName FROM Collection WHERE User = ? ORDER BY CollectionName",
+                        (user,)).fetchone()[0]
+    existing = conn.execute("SELECT ItemName FROM Item LIMIT 1").fetchone()[0]
+    conn.close()
+    return name, existing
+
+
+def write_csv(path, rows, header=("ItemName", "Collection", "PricePaid", "CurrentValue", "Status")):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_bad_rows_are_reported_by_line_and_skipped(database, tmp_path):
+    mine, existing = collection_of(database, "user00001")
+    theirs, _ = collection_of(database, "user00002")
+    path = write_csv(tmp_path / "items.csv", [
+        ("Good one", mine, "12.50", "$20", "active"),      # line 2
+        ("", mine, "1", "1", ""),                         # 3: no name
+        ("Bad price", mine, "twelve", "1", ""),           # 4
+        ("Bad status", mine, "1", "1", "Lost"),           # 5
+        ("Good one", mine, "1", "1", ""),                 # 6: repeated in the file
+        (existing, mine, "1", "1", ""),                   # 7: already in the table
+        ("Not mine", theirs, "1", "1", ""),               # 8: another user's collection
+        ("Nowhere", "No Such Collection", "1", "1", ""),  # 9
+        ("Good two", mine.upper(), "", "", ""),           # 10: collection matched case-insensitively
+    ])
+    result = importer.import_items(path, "user00001", database=database, notify=False)
+
+    assert result.inserted == 2
+    assert [error.line for error in result.errors] == [3, 4, 5, 6, 7, 8, 9]
+    conn = sqlite3.connect(database)
+    rows = conn.execute("SELECT ItemName, Collection, User, PricePaidCents, CurrentValueCents, Status FROM Item "
+                        "WHERE ItemName IN ('Good one', 'Good two') ORDER BY ItemName").fetchall()
+    conn.close()
+    assert rows == [("Good one", mine, "user00001", 1250, 2000, "Active"),
+                    ("Good two", mine, "user00001", None, None, "Active")]
+
+
+def test_rows_are_inserted_in_chunks(database, tmp_path):
+    mine, existing = collection_of(database, "user00001")
+    rows = [(f"Bulk {n}", mine, "1", "2", "") for n in range(25)]
+    rows[12] = (existing, mine, "1", "2", "")
+    path = write_csv(tmp_path / "bulk.csv", rows)
+    progress = []
+    result = importer.import_items(path, "user00001", database=database, notify=False, chunk_size=10,
+                                   progress=lambda inserted, skipped: progress.append((inserted, skipped)))
+    # one flush (and progress call) per chunk; the clash only costs its own row
+    assert progress == [(10, 0), (19, 1), (24, 1)]
+    assert result.inserted == 24 and [error.line for error in result.errors] == [14]
+
+
+def test_missing_required_column_is_refused(database, tmp_path):
+    path = write_csv(tmp_path / "bad.csv", [("x",)], header=("ItemName",))
+    with pytest.raises(ValueError, match="Collection"):
+        importer.import_items(path, "user00001", database=database, notify=False)
@@ -0,0 +1,157 @@
+# Program:          Item filter tests
+# Associated file:  tests/test_item_filters.py
+# Purpose:          Checks the My Items filter against a small database made by datagen.generate: the
+#                   SQL and Python forms of a filter agree, cached pages and facet counts are dropped on
+#                   change events, and cached footer totals follow Item changes without re-aggregating.
+
+import sqlite3
+
+import pytest
+
+import datagen
+import item_filters
+import paging
+from item_filters import ItemFilter, facet_counts, item_totals, page_source_for, totals_cache
+from models import INSERT, STATUS, UPDATE, ChangeEvent, publish, tracked_insert, tracked_write
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    database = str(tmp_path / "filters.sqlite")
+    datagen.generate(database, datagen.DatasetSpec.for_items(300, users=3), search_index=False)
+    conn = sqlite3.connect(database)
+    conn.row_factory = sqlite3.Row
+    monkeypatch.setattr(item_filters, "connect", lambda: conn)
+    monkeypatch.setattr(paging, "DATABASE", database)
+    for cache in (item_filters.result_cache, item_filters.facet_cache, totals_cache):
+        cache.clear()
+    yield conn
+    for cache in (item_filters.result_cache, item_filters.facet_cache, totals_cache):
+        cache.clear()
+    conn.close()
+
+
+def aggregate(conn, item_filter):
+    """What item_totals would return on a cold cache."""
+    totals_cache.clear()
+    return item_totals(item_filter)
+
+
+def cached(item_filter):
+    """item_totals, failing if it would have to query."""
+    def build():
+        raise AssertionError("totals were re-aggregated")
+    return totals_cache.get(item_filter, build)
+
+
+def assert_totals_current(conn):
+    warm = [cached(item_filter) for item_filter in FILTERS]
+    assert warm == [aggregate(conn, item_filter) for item_filter in FILTERS]
+
+
+def change(conn, operation, where, params, sql, sql_params):
+    rows = tracked_write(conn, "Item", where, params, lambda: conn.execute(sql, sql_params))
+    conn.commit()
+    publish(ChangeEvent("Item", None, operation, rows=rows))
+
+
+def ordinary_item(conn, where):
+    """An item matching where whose amounts are no cached filter's minimum or maximum."""
+    extremes = set()
+    for _, totals in totals_cache.items():
+        extremes.update((totals.price_min, totals.price_max, totals.value_min, totals.value_max))
+    for row in conn.execute(f"SELECT ItemID, PricePaidCents, CurrentValueCents FROM Item WHERE {where}"):
+        if row[1] is not None and row[2] is not None and not extremes & {row[1], row[2]}:
+            return row[0]
+
+
+FILTERS = (ItemFilter(), ItemFilter(user="user00001"), ItemFilter(value_min=5000), ItemFilter(show_inactive=True))
+
+
+def test_totals_follow_value_update(conn):
+    for item_filter in FILTERS:
+        item_totals(item_filter)
+    item_id = ordinary_item(conn, "Status = 'Active' AND User = 'user00001' AND CurrentValueCents < 8000")
+    change(conn, UPDATE, "ItemID = ?", (item_id,),
+           "UPDATE Item SET CurrentValueCents = 987654321, PricePaidCents = NULL WHERE ItemID = ?", (item_id,))
+    assert_totals_current(conn)
+
+
+def test_totals_follow_status_change(conn):
+    for item_filter in FILTERS:
+        item_totals(item_filter)
+    item_id = ordinary_item(conn, "Status = 'Active' AND User = 'user00001' AND CurrentValueCents > 5000")
+    change(conn, STATUS, "ItemID = ?", (item_id,), "UPDATE Item SET Status = 'Inactive' WHERE ItemID = ?", (item_id,))
+    assert_totals_current(conn)
+
+
+def test_totals_follow_insert(conn):
+    for item_filter in FILTERS:
+        item_totals(item_filter)
+    _, rows = tracked_insert(conn, "Item", "INSERT INTO Item (ItemName, User, Status, PricePaidCents, CurrentValueCents, "
+                             "DateAdded) VALUES ('New', 'user00001', 'Active', 1, 999999999, '2026-01-01')", ())
+    conn.commit()
+    publish(ChangeEvent("Item", None, INSERT, rows=rows))
+    assert_totals_current(conn)
+
+
+def test_removing_an_extreme_drops_the_totals(conn):
+    item_filter = ItemFilter()
+    before = item_totals(item_filter)
+    item_id = conn.execute("SELECT ItemID FROM Item WHERE Status = 'Active' AND CurrentValueCents = ?",
+                           (before.value_max,)).fetchone()[0]
+    change(conn, STATUS, "ItemID = ?", (item_id,), "UPDATE Item SET Status = 'Inactive' WHERE ItemID = ?", (item_id,))
+    assert totals_cache.items() == []
+    assert item_totals(item_filter).value_max < before.value_max
+
+
+def test_events_without_rows_clear_the_totals(conn):
+    item_totals(ItemFilter())
+    publish(ChangeEvent("Item", None, UPDATE))
+    assert totals_cache.items() == []
+
+
+@pytest.mark.parametrize("item_filter", [
+    ItemFilter(price_min=1000, price_max=20000),
+    ItemFilter(added_from="2023-01-01", added_to="2024-06-30"),
+    ItemFilter(status="Inactive"),
+])
+def test_matches_agrees_with_where(conn, item_filter):
+    clause, params = item_filter.where()
+    wanted = {row[0] for row in conn.execute(f"SELECT ItemID FROM Item{clause}", params)}
+    found = {row["ItemID"] for row in map(dict, conn.execute("SELECT * FROM Item")) if item_filter.matches(row)}
+    assert found == wanted
+
+
+def test_page_sources_are_cached_until_a_change_event(conn):
+    item_filter = ItemFilter(user="user00001")
+    source = page_source_for(item_filter)
+    rows = source.rows(0, source.count())
+    assert page_source_for(ItemFilter(user="user00001")) is source
+
+    item_id = rows[0][item_filters.ITEM_COLUMNS.index("ItemID")]
+    conn.execute("UPDATE Item SET Status = 'Inactive' WHERE ItemID = ?", (item_id,))
+    conn.commit()
+    assert page_source_for(item_filter).count() == len(rows)  # still the cached pages
+    publish(ChangeEvent("Item", item_id, STATUS))
+    fresh = page_source_for(item_filter)
+    assert fresh is not source and source._conn is None  # the old one was closed
+    assert fresh.count() == len(rows) - 1
+
+
+def test_facet_counts_follow_collection_events(conn):
+    before = dict(facet_counts(ItemFilter(), "Location"))
+    location, count = next(iter(before.items()))
+    conn.execute("UPDATE Item SET Location = 'Vault 9' WHERE Location = ? AND Status = 'Active'", (location,))
+    conn.commit()
+    assert dict(facet_counts(ItemFilter(), "Location")) == before
+    publish(ChangeEvent("Collection", None, UPDATE))
+    after = dict(facet_counts(ItemFilter(), "Location"))
+    assert location not in after and after["Vault 9"] == count
+
+
+def test_facets_ignore_their_own_criterion(conn):
+    status_counts = dict(facet_counts(ItemFilter(status="Active"), "Status"))
+    assert set(status_counts) == {"Active", "Inactive"}
+    clause, params = ItemFilter(show_inactive=True).where()
+    assert sum(status_counts.values()) == conn.execute(f"SELECT COUNT(*) FROM Item{clause}", params).fetchone()[0]
@@ -0,0 +1,106 @@
+# Program:          Maintenance tests
+# Associated file:  tests/test_maintenance.py
+# Purpose:          Runs the maintenance steps on scratch databases and checks that they do their job,
+#                   give up instead of failing on locks or an empty budget, and that the scheduler only
+#                   runs them while the user is idle.
+
+import os
+import sqlite3
+import time
+
+import pytest
+
+import maintenance
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "maintain.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("CREATE TABLE Item (ItemID INTEGER PRIMARY KEY, ItemName TEXT, Notes TEXT)")
+    conn.execute("CREATE INDEX idx_item_name ON Item (ItemName)")
+    conn.executemany("INSERT INTO Item (ItemName, Notes) VALUES (?, ?)",
+                     [(f"item {n}", "x" * 200) for n in range(5000)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def run(database, name, budget=5.0):
+    return maintenance.run_step(name, database, budget)
+
+
+def test_analyze_only_reruns_when_row_counts_drift(database):
+    first = run(database, "analyze")
+    assert first.finished and "Item (never -> 5,000 rows)" in first.detail
+    assert run(database, "analyze").detail == "statistics are current"
+
+    conn = sqlite3.connect(database)
+    conn.execute("DELETE FROM Item WHERE ItemID % 2 = 0")
+    conn.commit()
+    conn.close()
+    assert "Item (5,000 -> 2,500 rows)" in run(database, "analyze").detail
+
+
+def test_vacuum_reclaims_free_pages_within_its_budget(database):
+    conn = sqlite3.connect(database)
+    conn.execute("DELETE FROM Item")
+    conn.commit()
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    assert free > maintenance.VACUUM_PAGES
+
+    assert not run(database, "vacuum", budget=0).finished  # no time: nothing done, retried later
+    assert conn.execute("PRAGMA freelist_count").fetchone()[0] == free
+    result = run(database, "vacuum")
+    assert result.finished and f"{free} pages reclaimed" in result.detail
+    assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    conn.close()
+
+
+def test_checkpoint_copies_the_wal_back(database):
+    conn = sqlite3.connect(database)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA wal_autocheckpoint = 0")
+    conn.execute("UPDATE Item SET Notes = 'changed'")
+    conn.commit()  # kept open: closing the last connection would checkpoint by itself
+    assert os.path.getsize(database + "-wal") > 0
+    result = run(database, "checkpoint")
+    wal_size = os.path.getsize(database + "-wal")
+    conn.close()
+    assert result.finished and not result.detail.startswith("0 ")
+    assert wal_size == 0  # truncated once everything was copied
+
+
+def test_a_locked_database_is_a_retry_not_an_error(database):
+    holder = sqlite3.connect(database, isolation_level=None)
+    holder.execute("BEGIN EXCLUSIVE")
+    try:
+        result = run(database, "analyze")
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+    assert not result.finished and "locked" in result.detail
+
+
+def test_scheduler_waits_for_idle_and_runs_each_step_once_per_pass(database):
+    scheduler = maintenance.MaintenanceScheduler(database, budget=5.0, idle_seconds=60, pass_interval=3600)
+    assert scheduler.tick() is None  # the user was just active
+
+    scheduler.last_activity = time.monotonic() - 61
+    started = []
+    while True:
+        name = scheduler.tick()
+        if name is None and not (scheduler.running and scheduler.running.is_alive()):
+            break
+        if name:
+            started.append(name)
+        scheduler.running.join(timeout=10)
+    assert started == list(maintenance.STEPS)
+    assert all(result.finished for result in scheduler.results)
+
+    scheduler.last_activity = time.monotonic() - 61
+    assert scheduler.tick() is None  # the next pass isn't due yet
+    scheduler.note_activity()
+    scheduler.last_pass -= 3600
+    assert scheduler.tick() is None  # due, but the user is back
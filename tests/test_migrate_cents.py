@@ -0,0 +1,46 @@
+import sqlite3
+
+import datagen
+import db
+
+# Item as it was before money moved to integer cents
+LEGACY_SCHEMA = (datagen.SCHEMA
+                 .replace('"PricePaidCents" INTEGER', '"PricePaid" REAL')
+                 .replace('"CurrentValueCents" INTEGER', '"CurrentValue" REAL'))
+
+
+def legacy_database(path, rows):
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany("INSERT INTO Item (ItemName, PricePaid, CurrentValue, Notes) VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    return conn
+
+
+def test_amounts_become_cents_and_junk_is_kept_in_notes(tmp_path):
+    conn = legacy_database(str(tmp_path / "legacy.sqlite"), [
+        ("real", 12.34, 0.1, None),
+        ("text", "$1,234.5", "", None),
+        ("junk", "abc", 5, None),
+        ("junk with notes", 1, "n/a", "boxed"),
+    ])
+    db.migrate(conn)
+
+    rows = conn.execute("SELECT ItemName, PricePaidCents, CurrentValueCents, Notes FROM Item ORDER BY ItemID").fetchall()
+    assert rows == [
+        ("real", 1234, 10, None),
+        ("text", 123450, None, None),
+        ("junk", None, 500, "PricePaid before the cents migration: 'abc'"),
+        ("junk with notes", 100, None, "boxed\nCurrentValue before the cents migration: 'n/a'"),
+    ]
+    messages = [message for (message,) in conn.execute("SELECT Message FROM Log")]
+    assert sum("not an amount" in message for message in messages) == 2
+    assert sum("converted Item." in message for message in messages) == 2
+
+
+def test_migrated_database_is_left_alone(tmp_path):
+    conn = legacy_database(str(tmp_path / "legacy.sqlite"), [("item", 1.5, 2, None)])
+    db.migrate(conn)
+    db.migrate(conn)
+    assert conn.execute("SELECT PricePaidCents, CurrentValueCents FROM Item").fetchall() == [(150, 200)]
+    assert conn.execute("SELECT COUNT(*) FROM Log").fetchone()[0] == 2
@@ -0,0 +1,94 @@
+# Program:          Paging tests
+# Associated file:  tests/test_paging.py
+# Purpose:          Checks that QueryPageSource pages always come back in one total order, whether
+#                   they are read in sequence (keyset paging) or jumped to (OFFSET), including ties,
+#                   NULLs and case-insensitive text.
+
+import random
+import sqlite3
+
+import pytest
+
+from paging import QueryPageSource
+
+COLUMN_TYPES = {"ItemID": "numeric", "Name": "text", "Value": "numeric", "Location": "text"}
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("paging") / "paging.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Item (ItemID INTEGER PRIMARY KEY, Name TEXT, Value INTEGER, Location TEXT)")
+    generator = random.Random(7)
+    conn.executemany("INSERT INTO Item VALUES (?, ?, ?, ?)", [
+        (item_id, generator.choice(["lamp", "Lamp", "vase", None, "Clock"]),
+         generator.choice([None, 5, 10, 10, 250]), generator.choice(["Attic", "attic", None]))
+        for item_id in range(1, 1038)
+    ])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def source(database, order_by=()):
+    pages = QueryPageSource("SELECT * FROM Item", database=database, page_size=50, column_types=COLUMN_TYPES,
+                            key_columns=("ItemID",))
+    pages.set_order(list(order_by))
+    return pages
+
+
+def expected(database, order_by):
+    """Python's ordering of the table: the sort columns (NULL first, text case-insensitive), then ItemID."""
+    conn = sqlite3.connect(database)
+    rows = conn.execute("SELECT * FROM Item").fetchall()
+    conn.close()
+    names = ("ItemID", "Name", "Value", "Location")
+    rows.sort(key=lambda row: row[0])
+    for column, descending in reversed(order_by):
+        index = names.index(column)
+
+        def key(row):
+            value = row[index]
+            return (value is not None, value.lower() if isinstance(value, str) else value or 0)
+        rows.sort(key=key, reverse=descending)
+    return rows
+
+
+ORDERS = (
+    [],
+    [("Name", False)],
+    [("Name", True)],
+    [("Value", True), ("Location", False)],
+    [("Location", True), ("Value", False), ("Name", True)],
+    [("ItemID", True)],
+)
+
+
+@pytest.mark.parametrize("order_by", ORDERS)
+def test_sequential_pages_follow_the_sort(database, order_by):
+    pages = source(database, order_by)
+    assert pages.rows(0, pages.count()) == expected(database, order_by)
+
+
+@pytest.mark.parametrize("order_by", ORDERS)
+def test_jumping_around_gives_the_same_pages(database, order_by):
+    wanted = expected(database, order_by)
+    pages = source(database, order_by)
+    for start in (900, 130, 990, 0, 470, 1030, 480):
+        assert pages.rows(start, start + 40) == wanted[start:start + 40]
+
+
+def test_unsorted_source_is_ordered_by_its_key(database):
+    pages = source(database)
+    assert pages.order_clause() == ' ORDER BY "ItemID" ASC'
+    assert [row[0] for row in pages.rows(0, 1037)] == list(range(1, 1038))
+
+
+def test_pages_after_a_read_page_seek_instead_of_offset(database):
+    pages = source(database, [("Name", False)])
+    statements = []
+    pages._connection().set_trace_callback(statements.append)
+    pages.get_page(0)
+    pages.get_page(1)
+    assert "WHERE" not in statements[0] and "WHERE" in statements[1]
+    assert statements[1].endswith("OFFSET 0")
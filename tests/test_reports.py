@@ -0,0 +1,55 @@
+# Program:          Report tests
+# Associated file:  tests/test_reports.py
+# Purpose:          Builds collection reports from a small database made by datagen.generate and checks
+#                   how unknown amounts are totalled and shown.
+
+import sqlite3
+
+import pytest
+
+import datagen
+import reports
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("reports") / "reports.sqlite")
+    datagen.generate(path, datagen.DatasetSpec.for_items(120, users=2), search_index=False)
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE Item SET CurrentValueCents = NULL WHERE ItemID % 3 = 0")
+    conn.execute("UPDATE Item SET PricePaidCents = NULL WHERE ItemID % 5 = 0")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_unknown_amounts_are_left_out_of_gains_and_totals(database):
+    report = reports.build_report(admin=True, include_inactive=True, database=database)
+    for section in report.sections:
+        items = section.items
+        known_values = [value for *_, paid, value, gain in items if value is not None]
+        known_prices = [paid for *_, paid, value, gain in items if paid is not None]
+        assert section.totals.current_value == (sum(known_values) if known_values else None)
+        assert section.totals.price_paid == (sum(known_prices) if known_prices else None)
+        for *_, paid, value, gain in items:
+            assert gain == (None if paid is None or value is None else value - paid)
+        gains = [gain for *_, gain in items if gain is not None]
+        assert section.totals.gain == (sum(gains) if gains else None)
+
+
+def test_unknown_amounts_show_a_dash(database, tmp_path):
+    path = str(tmp_path / "report.html")
+    reports.write_report(path, admin=True, include_inactive=True, database=database, workers=1)
+    with open(path, encoding="utf-8") as file:
+        assert reports.UNKNOWN in file.read()
+
+    section = reports.ReportSection("Empty", None, reports.Totals(items=2))
+    assert f"now worth {reports.UNKNOWN}" in reports.render_section_html(section)
+    assert b"\x97" in reports.pdf_document([(reports.TEXT, reports.money(None))])
+
+
+def test_sections_render_the_same_in_spawned_workers(database):
+    report = reports.build_report(admin=True, include_inactive=True, database=database)
+    sections = (report.sections * reports.PARALLEL_MIN_SECTIONS)[:reports.PARALLEL_MIN_SECTIONS * 2]
+    expected = [reports.render_section_lines(section) for section in sections]
+    assert reports.render_sections(reports.render_section_lines, sections, workers=2) == expected
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import collectionmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# imported on first use, after the login window is up
+DEFERRED = ("main_window", "crud_windows", "reports")
+
+
+def loaded_modules(statement, names):
+    """Runs statement in a fresh interpreter and returns which of names ended up in sys.modules."""
+    script = f"import sys\n{statement}\nprint(' '.join(m for m in {tuple(names)!r} if m in sys.modules))\n"
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+    if output.returncode and "tkinter" in output.stderr:
+        pytest.skip("tkinter is not available")
+    assert output.returncode == 0, output.stderr
+    return output.stdout.split()
+
+
+def test_gui_defers_heavy_windows():
+    assert loaded_modules("import gui", DEFERRED) == []
+
+
+def test_data_layer_has_no_gui_imports():
+    assert loaded_modules("import models, db, log", collectionmanager.GUI_MODULES) == []
+
+
+def test_data_layer_skips_heavy_stdlib_modules():
+    # dataclasses (with inspect), typing and decimal cost more than the rest of the data layer
+    assert loaded_modules("import models, db, log", ("dataclasses", "typing", "decimal", "queue", "random")) == []
+
+
+def test_data_layer_imports_within_budget():
+    elapsed, gui_modules = collectionmanager.core_import_time()
+    assert gui_modules == []
+    assert elapsed < collectionmanager.CORE_IMPORT_BUDGET_MS
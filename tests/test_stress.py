@@ -0,0 +1,40 @@
+import multiprocessing
+import sqlite3
+
+import pytest
+
+import collectionmanager
+
+PROCESSES = 3
+SECONDS = 1.0
+
+
+def stored_rows(database):
+    """{worker: (rows, distinct counters)} actually in the StressTest table."""
+    conn = sqlite3.connect(database)
+    try:
+        query = "SELECT Worker, COUNT(*), COUNT(DISTINCT Counter) FROM StressTest GROUP BY Worker"
+        return {worker: (rows, distinct) for worker, rows, distinct in conn.execute(query)}
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("journal", ["delete", "wal"])
+@pytest.mark.parametrize("mode", ["retry", "writer"])
+def test_concurrent_writes_are_neither_lost_nor_busy(tmp_path, mode, journal):
+    database = str(tmp_path / "stress.sqlite")
+    collectionmanager.create_stress_table(database, journal)
+
+    # separate processes, so the writers really contend for the file lock
+    with multiprocessing.get_context("spawn").Pool(PROCESSES) as pool:
+        results = pool.starmap(collectionmanager.stress_worker, [
+            (database, mode, worker, SECONDS, 2) for worker in range(PROCESSES)
+        ])
+
+    # stress_worker re-raises anything but SQLITE_BUSY and counts SQLITE_BUSY as an error
+    assert [errors for _, errors, _ in results] == [0] * PROCESSES
+    stored = stored_rows(database)
+    for worker, (commits, _, _) in enumerate(results):
+        assert commits > 0
+        # every reported commit is in the table exactly once
+        assert stored[worker] == (commits, commits)
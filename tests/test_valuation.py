@@ -0,0 +1,115 @@
+# Program:          Valuation history tests
+# Associated file:  tests/test_valuation.py
+# Purpose:          Checks that the ItemValue triggers record exactly the value changes, and that the
+#                   series functions downsample a known history to the right totals per period.
+
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+import valuation
+from item_filters import ItemFilter
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE Item (ItemID INTEGER PRIMARY KEY, User TEXT, Status TEXT, Notes TEXT, "
+                 "CurrentValueCents INTEGER)")
+    valuation.ensure_value_history(conn)
+    yield conn
+    conn.close()
+
+
+def history(conn, item_id):
+    return [cents for _, cents in reversed(valuation.value_changes(conn, item_id))]
+
+
+##### TRIGGERS #####
+
+def start_of_second():
+    """Waits for a fresh second, so the next few statements share one 'now'."""
+    while time.time() % 1 > 0.2:
+        time.sleep(0.05)
+
+
+def test_triggers_record_value_changes_only(conn):
+    start_of_second()
+    conn.execute("INSERT INTO Item VALUES (1, 'bob', 'Active', '', 500)")
+    conn.execute("INSERT INTO Item VALUES (2, 'bob', 'Active', '', NULL)")
+    assert history(conn, 1) == [500] and history(conn, 2) == []
+
+    conn.execute("UPDATE Item SET Notes = 'polished', CurrentValueCents = 500 WHERE ItemID = 1")
+    assert history(conn, 1) == [500]  # nothing about the value changed
+
+    conn.execute("UPDATE Item SET CurrentValueCents = 750 WHERE ItemID = 1")
+    conn.execute("UPDATE Item SET CurrentValueCents = 800 WHERE ItemID = 1")
+    # both changes fall in the same second as the insert, so the last one wins
+    assert history(conn, 1) == [800]
+
+    conn.execute("DELETE FROM ItemValue WHERE ItemID = 1")
+    conn.execute("UPDATE Item SET CurrentValueCents = NULL WHERE ItemID = 1")
+    assert history(conn, 1) == [None]  # a cleared value is recorded too
+
+    conn.execute("DELETE FROM Item WHERE ItemID = 1")
+    assert history(conn, 1) == []
+
+
+def test_history_is_seeded_once_from_current_values():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE Item (ItemID INTEGER PRIMARY KEY, CurrentValueCents INTEGER)")
+    conn.executemany("INSERT INTO Item VALUES (?, ?)", [(1, 100), (2, None), (3, 300)])
+    valuation.ensure_value_history(conn)
+    valuation.ensure_value_history(conn)
+    assert conn.execute("SELECT ItemID, Cents FROM ItemValue ORDER BY ItemID").fetchall() == [(1, 100), (3, 300)]
+    assert not valuation.value_history_missing(conn)
+    conn.close()
+
+
+##### DOWNSAMPLING #####
+
+def epoch(text):
+    """Unix time of a local 'YYYY-MM-DD HH:MM' (the series bucket by local date)."""
+    return int(time.mktime(datetime.strptime(text, "%Y-%m-%d %H:%M").timetuple()))
+
+
+@pytest.fixture
+def known_history(conn):
+    conn.executemany("INSERT INTO Item (ItemID, User, Status, CurrentValueCents) VALUES (?, ?, ?, NULL)",
+                     [(1, "bob", "Active"), (2, "bob", "Active"), (3, "eve", "Active")])
+    conn.executemany("INSERT INTO ItemValue (ItemID, Epoch, Cents) VALUES (?, ?, ?)", [
+        (1, epoch("2024-01-05 10:00"), 100),
+        (1, epoch("2024-01-20 23:30"), 150),
+        (2, epoch("2024-02-10 08:00"), 50),
+        (1, epoch("2024-03-03 12:00"), 120),
+        (2, epoch("2024-03-04 12:00"), None),   # value cleared
+        (3, epoch("2024-02-01 09:00"), 999),
+    ])
+    return conn
+
+
+def test_monthly_series_carries_unchanged_items_forward(known_history):
+    series = valuation.filter_value_series(known_history, ItemFilter(user="bob"), "month")
+    assert series == [("2024-01-01", 150), ("2024-02-01", 200), ("2024-03-01", 120)]
+
+
+@pytest.mark.parametrize("period, expected", [
+    ("day", [("2024-01-05", 100), ("2024-01-20", 150), ("2024-03-03", 120)]),
+    ("week", [("2024-01-01", 100), ("2024-01-15", 150), ("2024-02-26", 120)]),  # weeks start on Monday
+    ("year", [("2024-01-01", 120)]),
+])
+def test_one_item_per_period(known_history, period, expected):
+    # the item's last value in each period in which it changed
+    assert valuation.item_value_series(known_history, 1, period) == expected
+
+
+def test_since_and_until_fold_and_cut_the_history(known_history):
+    bob = ItemFilter(user="bob")
+    assert valuation.filter_value_series(known_history, bob, "month", since="2024-02-15") == [
+        ("2024-02-01", 200), ("2024-03-01", 120)]
+    assert valuation.filter_value_series(known_history, bob, "month", until="2024-03-03") == [
+        ("2024-01-01", 150), ("2024-02-01", 200), ("2024-03-01", 170)]
+    with pytest.raises(ValueError):
+        valuation.item_value_series(known_history, 1, "fortnight")
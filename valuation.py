@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+# Program:          valuation history module
+# Associated file:  valuation.py
+# Purpose:          Item.CurrentValueCents is overwritten in place, so this module keeps the history next to
+#                   it: every insert or change of an item's value appends (ItemID, Epoch, Cents) to
+#                   ItemValue. The rows are written by SQLite triggers, so the GUI forms, the importer, the
+#                   API and plain SQL all record history without knowing about it. ItemValue is a WITHOUT
+#                   ROWID table clustered on (ItemID, Epoch), so one item's history is a single range read.
+#
+#                   The series functions downsample the history to one point per day, week, month or year
+#                   for an item or for every item matching an item_filters.ItemFilter (a collection, a
+#                   user's items):
+#
+#                       python -m collectionmanager history --user bob --collection Coins --period month
+
+from datetime import datetime
+
+# period -> date() modifiers that turn a local date into the first day of its period
+PERIODS = {
+    "day": "",
+    "week": ", 'weekday 0', '-6 days'",     # weeks start on Monday
+    "month": ", 'start of month'",
+    "year": ", 'start of year'",
+}
+
+DEFAULT_PERIOD = "month"
+
+VALUE_HISTORY_TABLE = """
+    CREATE TABLE IF NOT EXISTS ItemValue (
+        ItemID INTEGER NOT NULL,
+        Epoch INTEGER NOT NULL,     -- Unix time of the change
+        Cents INTEGER,              -- the new CurrentValueCents (NULL when it was cleared)
+        PRIMARY KEY (ItemID, Epoch)
+    ) WITHOUT ROWID
+"""
+
+NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+# INSERT OR REPLACE: several changes within one second keep the last value
+VALUE_HISTORY_TRIGGERS = {
+    "ItemValue_ai": f"""
+        CREATE TRIGGER ItemValue_ai AFTER INSERT ON Item WHEN new.CurrentValueCents IS NOT NULL BEGIN
+            INSERT OR REPLACE INTO ItemValue (ItemID, Epoch, Cents) VALUES (new.ItemID, {NOW}, new.CurrentValueCents);
+        END
+    """,
+    "ItemValue_au": f"""
+        CREATE TRIGGER ItemValue_au AFTER UPDATE OF CurrentValueCents ON Item
+        WHEN old.CurrentValueCents IS NOT new.CurrentValueCents BEGIN
+            INSERT OR REPLACE INTO ItemValue (ItemID, Epoch, Cents) VALUES (new.ItemID, {NOW}, new.CurrentValueCents);
+        END
+    """,
+    "ItemValue_ad": """
+        CREATE TRIGGER ItemValue_ad AFTER DELETE ON Item BEGIN
+            DELETE FROM ItemValue WHERE ItemID = old.ItemID;
+        END
+    """,
+}
+
+
+def schema_names(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+
+
+def value_history_missing(conn, existing=None):
+    """True if ItemValue or one of its triggers has not been created yet."""
+    existing = schema_names(conn) if existing is None else existing
+    return "ItemValue" not in existing or not existing.issuperset(VALUE_HISTORY_TRIGGERS)
+
+
+def ensure_value_history(conn, seed=True):
+    """Creates ItemValue and its triggers.
+
+    When the table is new and seed is set, every item's current value is recorded as of now, so
+    series start from the values the database had when history was switched on.
+    """
+    existing = schema_names(conn)
+    if not value_history_missing(conn, existing):
+        return
+    with conn:
+        if "ItemValue" not in existing:
+            conn.execute(VALUE_HISTORY_TABLE)
+            if seed:
+                conn.execute(f"INSERT INTO ItemValue (ItemID, Epoch, Cents) "
+                             f"SELECT ItemID, {NOW}, CurrentValueCents FROM Item WHERE CurrentValueCents IS NOT NULL")
+        for name, definition in VALUE_HISTORY_TRIGGERS.items():
+            if name not in existing:
+                conn.execute(definition)
+
+
+def period_start(expression, period):
+    """SQL for the first day ('YYYY-MM-DD') of the period containing a local date expression."""
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}'. Use one of: {', '.join(PERIODS)}.")
+    return f"date({expression}{PERIODS[period]})"
+
+
+def check_date(value, name):
+    """None or a 'YYYY-MM-DD' date; anything else raises ValueError (date() would turn it into NULL)."""
+    if value is not None:
+        try:
+            datetime.strptime(value, '%Y-%m-%d')
+        except ValueError:
+            raise ValueError(f"{name} must be a date, YYYY-MM-DD.")
+    return value
+
+
+def value_series(conn, condition, params=(), period=DEFAULT_PERIOD, since=None, until=None):
+    """Total value of the items matching condition (over ItemValue v) at the end of each period.
+
+    Returns [(period_start, cents)] oldest first. LAG() turns each history row into the change from the
+    item's previous value, reading the rows in clustered-key order so nothing is sorted per item; the
+    changes are summed per period and a running SUM() over the periods gives the total. An item that
+    did not change in a period still counts with its earlier value, and a period in which nothing
+    changed is left out (its value is the previous point's). since/until are 'YYYY-MM-DD' local dates;
+    older changes are folded into the first period, so it starts from the value they add up to.
+    """
+    bucket = period_start("v.Epoch, 'unixepoch', 'localtime'", period)
+    since, until = check_date(since, "since"), check_date(until, "until")
+    values = []
+    if since:
+        bucket = f"max({bucket}, {period_start('?', period)})"
+        values.append(since)
+    values.extend(params)
+    if until:
+        condition += " AND v.Epoch < CAST(strftime('%s', ?, '+1 day', 'utc') AS INTEGER)"
+        values.append(until)
+    query = f"""
+        SELECT period, SUM(SUM(change)) OVER (ORDER BY period)
+        FROM (
+            SELECT {bucket} AS period,
+                COALESCE(v.Cents, 0) - COALESCE(LAG(v.Cents) OVER (PARTITION BY v.ItemID ORDER BY v.Epoch), 0) AS change
+            FROM ItemValue v
+            WHERE {condition}
+        )
+        GROUP BY period
+        ORDER BY period
+    """
+    return [(period, cents) for period, cents in conn.execute(query, values)]
+
+
+def item_value_series(conn, item_id, period=DEFAULT_PERIOD, since=None, until=None):
+    """One item's value at the end of each period; a single range read of the clustered key."""
+    return value_series(conn, "v.ItemID = ?", (item_id,), period, since, until)
+
+
+def filter_value_series(conn, item_filter, period=DEFAULT_PERIOD, since=None, until=None):
+    """Combined value of the items matching an item_filters.ItemFilter at the end of each period."""
+    clause, params = item_filter.where()
+    # every item (an admin with inactive items shown): no need to look the ids up
+    condition = f"v.ItemID IN (SELECT ItemID FROM Item{clause})" if clause else "1 = 1"
+    return value_series(conn, condition, params, period, since, until)
+
+
+def value_changes(conn, item_id, limit=None):
+    """An item's raw history, newest first: [(epoch, cents)]."""
+    query = "SELECT Epoch, Cents FROM ItemValue WHERE ItemID = ? ORDER BY Epoch DESC"
+    params = (item_id,)
+    if limit:
+        query += " LIMIT ?"
+        params += (limit,)
+    return [(epoch, cents) for epoch, cents in conn.execute(query, params)]